@@ -0,0 +1,122 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The post-processing of `FaissIndexer.apply`, i.e. the label lookup and thresholding
+of a batch of search results, against the per-id loop over a dict id map it
+replaced. The search result is computed once on a synthetic Flat index and reused,
+so that only the post-processing is timed. Run with paddlex installed, e.g. by
+`pip install -e .`:
+
+    python benchmarks/bench_faiss_indexer.py --batch-size 256 --k 10
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from paddlex.inference.components.retrieval.faiss import FaissIndexer, IndexData
+from paddlex.inference.components.retrieval.id_map import IdMap
+
+
+class _FixedSearch(object):
+    """return the same search result for any query"""
+
+    def __init__(self, scores_list, ids_list):
+        self.scores_list = scores_list
+        self.ids_list = ids_list
+
+    def search(self, features, k):
+        return self.scores_list, self.ids_list
+
+
+def _apply_by_loop(indexer, id_map, score_thres, return_k, feature):
+    """the per-id loop `FaissIndexer.apply` used before vectorization"""
+    scores_list, ids_list = indexer.search(np.array(feature), return_k)
+    preds = []
+    for scores, ids in zip(scores_list, ids_list):
+        labels = []
+        for id in ids:
+            if id > 0:
+                labels.append(id_map[id])
+        preds.append({"score": scores, "label": labels})
+    idxs = np.where(scores_list[:, 0] < score_thres)[0]
+    for idx in idxs:
+        preds[idx] = {"score": None, "label": None}
+    return preds
+
+
+def _time(func, num_iters):
+    func()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-ids", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--score-thres", type=float, default=0.3)
+    parser.add_argument("--num-iters", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    gallery = rng.standard_normal((args.num_ids, args.dim)).astype(np.float32)
+    gallery /= np.linalg.norm(gallery, axis=1, keepdims=True)
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(args.dim))
+    index.add_with_ids(gallery, np.arange(args.num_ids))
+    labels = [f"label_{i // 5}" for i in range(args.num_ids)]
+    id_map = IdMap.from_labels(np.arange(args.num_ids), labels)
+    data = IndexData(
+        index, {"id_map": id_map, "metric_type": "IP", "index_type": "Flat"}
+    )
+    queries = gallery[rng.integers(0, args.num_ids, args.batch_size)]
+    queries += 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    start = time.perf_counter()
+    fixed = _FixedSearch(*index.search(queries, args.k))
+    print(
+        f"faiss search, batch {args.batch_size} x k {args.k}: {(time.perf_counter() - start) * 1e3:.2f} ms"
+    )
+
+    dict_id_map = {np.int64(i): label for i, label in enumerate(labels)}
+    # a copy of the IdMap, so that the labels decoded by the loop are not reused by
+    # the first call below
+    loop_id_maps = (("dict", dict_id_map), ("IdMap", IdMap.from_dict(dict_id_map)))
+    for name, loop_id_map in loop_id_maps:
+        ms = _time(
+            lambda: _apply_by_loop(
+                fixed, loop_id_map, args.score_thres, args.k, queries
+            ),
+            args.num_iters,
+        )
+        print(f"per-id loop, {name} id map: {ms:.2f} ms")
+
+    indexer = FaissIndexer(data, return_k=args.k, score_thres=args.score_thres)
+    indexer._indexer = fixed
+    start = time.perf_counter()
+    indexer.apply(queries)
+    print(f"vectorized, first call: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    ms = _time(lambda: indexer.apply(queries), args.num_iters)
+    print(f"vectorized: {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Load time of the faiss id map of a synthetic gallery, 3 images per label: the binary
+id map (memory-mapped and in memory) against the YAML one of the older versions.
+Run with paddlex installed, e.g. by `pip install -e .`:
+
+    python benchmarks/bench_id_map.py --num-ids 5000000 --num-yaml-ids 100000
+
+YAML loading is linear in the number of ids, and costs several GB of RAM for
+millions of ids, so it is measured on `--num-yaml-ids` ids only.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from paddlex.inference.components.retrieval.id_map import IdMap
+from paddlex.inference.utils.io import YAMLReader, YAMLWriter
+
+
+def _make_labels(num_ids):
+    return [f"sku_{i // 3:07d}" for i in range(num_ids)]
+
+
+def _get_dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_binary(save_dir, num_ids, num_lookups):
+    id_map_dir = os.path.join(save_dir, "id_map")
+    IdMap.from_labels(np.arange(num_ids), _make_labels(num_ids)).save(id_map_dir)
+    print(f"binary id map of {num_ids} ids: {_get_dir_size(id_map_dir) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    id_map = IdMap.load(id_map_dir, mmap=True)
+    print(f"  mmap load: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    ids = np.random.default_rng(0).integers(0, num_ids, num_lookups)
+    start = time.perf_counter()
+    for id_ in ids.tolist():
+        id_map[id_]
+    print(f"  {num_lookups} lookups: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    del id_map
+
+    start = time.perf_counter()
+    IdMap.load(id_map_dir, mmap=False)
+    print(f"  in-memory load: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+def bench_yaml(save_dir, num_ids):
+    yaml_path = os.path.join(save_dir, "id_map.yaml")
+    YAMLWriter().write(
+        yaml_path,
+        {
+            "index_type": "Flat",
+            "metric_type": "IP",
+            "id_map": dict(enumerate(_make_labels(num_ids))),
+        },
+        default_flow_style=False,
+        allow_unicode=True,
+    )
+    print(f"YAML id map of {num_ids} ids: {os.path.getsize(yaml_path) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    IdMap.from_dict(YAMLReader().read(yaml_path)["id_map"])
+    print(f"  load: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-ids", type=int, default=5_000_000)
+    parser.add_argument("--num-yaml-ids", type=int, default=100_000)
+    parser.add_argument("--num-lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        bench_binary(save_dir, args.num_ids, args.num_lookups)
+        if args.num_yaml_ids > 0:
+            bench_yaml(save_dir, args.num_yaml_ids)
+
+
+if __name__ == "__main__":
+    main()
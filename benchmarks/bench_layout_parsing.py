@@ -0,0 +1,190 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The OCR cost of `LayoutParsingPipeline` with recovery on a synthetic 1700x2200 page
+of 40 paragraph blocks and a line of text outside them. The OCR pipeline is a stub
+whose text detection resizes and blurs the image as a real one does, and finds the
+text lines as the dark boxes drawn on the page; the layout model is a stub returning
+the blocks. The number of OCR calls, the pixels recognized and the time per page
+are reported.
+
+With `--baseline-rev`, the pipeline of that git revision, e.g. the one before the
+page was recognized once, is run on the same page, and the parsing results are
+checked to be the same. Run from the repo root with paddlex installed, e.g. by
+`pip install -e .`:
+
+    python benchmarks/bench_layout_parsing.py --baseline-rev <rev>
+"""
+
+import argparse
+import subprocess
+import time
+import types
+
+import cv2
+import numpy as np
+
+from paddlex.inference.components import CropByBoxes
+from paddlex.inference.pipelines.base import BasePipeline
+from paddlex.inference.pipelines.layout_parsing import layout_parsing
+
+PAGE_HEIGHT, PAGE_WIDTH = 2200, 1700
+LAYOUT_PARSING_PATH = "paddlex/inference/pipelines/layout_parsing/layout_parsing.py"
+
+
+def _make_page():
+    """draw the text lines of 40 blocks in 2 columns, and one line out of them"""
+    rng = np.random.default_rng(0)
+    page = np.full((PAGE_HEIGHT, PAGE_WIDTH, 3), 255, dtype=np.uint8)
+    boxes = []
+    for col in range(2):
+        for row in range(20):
+            x0, y0 = 60 + col * 820, 60 + row * 105
+            boxes.append(
+                {
+                    "cls_id": 0,
+                    "label": "text",
+                    "score": 0.9,
+                    "coordinate": [x0, y0, x0 + 760, y0 + 90],
+                }
+            )
+            for line in range(2):
+                y = y0 + 10 + line * 40
+                x1 = x0 + 700 - int(rng.integers(0, 300))
+                cv2.rectangle(page, (x0 + 20, y), (x1, y + 22), (0, 0, 0), -1)
+    cv2.rectangle(page, (100, 2150), (900, 2180), (0, 0, 0), -1)
+    return page, boxes
+
+
+class _StubOCR(object):
+    def __init__(self):
+        self.num_calls = 0
+        self.num_pixels = 0
+
+    def __call__(self, imgs):
+        for img in imgs if isinstance(imgs, list) else [imgs]:
+            self.num_calls += 1
+            self.num_pixels += img.shape[0] * img.shape[1]
+            # the cost of a real text detection, which resizes and filters the image
+            scale = 960 / max(img.shape[:2])
+            small = cv2.resize(img, None, fx=scale, fy=scale) if scale < 1 else img
+            for _ in range(3):
+                small = cv2.GaussianBlur(small, (9, 9), 0)
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            _, binary = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY_INV)
+            contours, _ = cv2.findContours(
+                binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+            )
+            polys = []
+            for contour in contours:
+                x, y, w, h = cv2.boundingRect(contour)
+                polys.append(np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]))
+            polys.sort(key=lambda poly: (poly[0][1], poly[0][0]))
+            yield {
+                "input_path": "page.png",
+                "dt_polys": polys,
+                "dt_scores": [1.0] * len(polys),
+                "rec_text": [f"text_{poly[0][0]}_{poly[0][1]}" for poly in polys],
+                "rec_score": [1.0] * len(polys),
+            }
+
+
+def _load_baseline(rev):
+    """load the layout_parsing module of the git revision, in the same package"""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{LAYOUT_PARSING_PATH}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    module = types.ModuleType(f"{layout_parsing.__package__}._baseline")
+    module.__package__ = layout_parsing.__package__
+    # the pipeline of the revision is registered under the same name as the current
+    # one, which is set aside meanwhile
+    registry = getattr(BasePipeline, "__registered_map")
+    entities = layout_parsing.LayoutParsingPipeline.entities
+    current = registry.pop(entities)
+    try:
+        exec(compile(source, f"{rev}:{LAYOUT_PARSING_PATH}", "exec"), module.__dict__)
+    finally:
+        registry[entities] = current
+    return module
+
+
+def _run(module, page, boxes):
+    # the stubs are set as the models, instead of creating predictors
+    pipeline = object.__new__(module.LayoutParsingPipeline)
+    pipeline.ocr_pipeline = _StubOCR()
+    pipeline.curve_pipeline = None
+    pipeline.oricls_predictor = None
+    pipeline.uvdoc_predictor = None
+    pipeline.img_reader = lambda inputs: iter(
+        [[{"img": page.copy(), "input_path": "page.png"}]]
+    )
+    pipeline.layout_predictor = lambda imgs: (
+        {"input_path": "page.png", "boxes": boxes, "ori_img": page.copy()} for _ in imgs
+    )
+    pipeline.formula_predictor = lambda imgs: iter([])
+    pipeline.get_table_result = lambda subs: ([], None)
+    pipeline.set_predictor = lambda **kwargs: None
+    pipeline._crop_by_boxes = CropByBoxes()
+    pipeline.recovery = True
+    pipeline.max_inflight_pages = 2
+
+    start = time.perf_counter()
+    result = next(pipeline.predict("page.png"))
+    elapsed = time.perf_counter() - start
+    ocr = pipeline.ocr_pipeline
+    print(
+        f"  {ocr.num_calls} OCR calls, {ocr.num_pixels / 1e6:.1f} Mpx, {elapsed * 1e3:.0f} ms per page"
+    )
+    return result
+
+
+def _get_parsing_key(result):
+    def _normalize(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, dict):
+            return {k: _normalize(v) for k, v in value.items()}
+        return value
+
+    return [
+        {k: _normalize(v) for k, v in block.items() if k != "input_path"}
+        for block in result["layout_parsing_result"]["parsing_result"]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--baseline-rev", default=None)
+    args = parser.parse_args()
+
+    page, boxes = _make_page()
+    print("current:")
+    result = _run(layout_parsing, page, boxes)
+    if args.baseline_rev:
+        print(f"{args.baseline_rev}:")
+        baseline_result = _run(_load_baseline(args.baseline_rev), page, boxes)
+        same = _get_parsing_key(result) == _get_parsing_key(baseline_result)
+        same &= (
+            result["ocr_result"]["rec_text"]
+            == baseline_result["ocr_result"]["rec_text"]
+        )
+        print(f"same parsing and OCR results: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Latency of concurrent single-image requests served by `PipelineWrapper`, with and
+without dynamic batching. The pipeline is a stub costing a fixed time per call plus
+a time per input, as a model on an accelerator does. Run with paddlex and its
+serving dependencies installed, e.g. by `pip install -e .`:
+
+    python benchmarks/bench_serving_batching.py --num-requests 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from paddlex.inference.pipelines.serving.app import PipelineWrapper
+
+
+class _StubPipeline(object):
+    def __init__(self, call_cost, input_cost):
+        self.call_cost = call_cost
+        self.input_cost = input_cost
+        self.num_calls = 0
+
+    def __call__(self, input):
+        inputs = input if isinstance(input, list) else [input]
+        self.num_calls += 1
+        time.sleep(self.call_cost + self.input_cost * len(inputs))
+        for img in inputs:
+            yield {"mean": float(img.mean())}
+
+
+async def _serve(args, max_batch_size):
+    pipeline = _StubPipeline(args.call_cost, args.input_cost)
+    wrapper = PipelineWrapper(
+        pipeline, max_batch_size=max_batch_size, max_queue_delay=args.max_queue_delay
+    )
+    imgs = [np.full((32, 32, 3), i, dtype=np.uint8) for i in range(args.num_requests)]
+
+    async def _request(img):
+        start = time.perf_counter()
+        result = await wrapper.infer(img)
+        return result, time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = await asyncio.gather(*(_request(img) for img in imgs))
+    elapsed = time.perf_counter() - start
+    wrapper.close()
+    assert [result[0]["mean"] for result, _ in outputs] == list(
+        range(args.num_requests)
+    )
+    latencies = sorted(latency for _, latency in outputs)
+    print(
+        f"max_batch_size={max_batch_size}: {pipeline.num_calls} pipeline calls, {elapsed * 1e3:.0f} ms in total, p50 latency {np.percentile(latencies, 50) * 1e3:.0f} ms, p99 latency {np.percentile(latencies, 99) * 1e3:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-requests", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-queue-delay", type=float, default=0.005)
+    parser.add_argument("--call-cost", type=float, default=0.05)
+    parser.add_argument("--input-cost", type=float, default=0.0)
+    args = parser.parse_args()
+
+    for max_batch_size in (1, args.max_batch_size):
+        asyncio.run(_serve(args, max_batch_size))
+
+
+if __name__ == "__main__":
+    main()
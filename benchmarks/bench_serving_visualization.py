@@ -0,0 +1,129 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Latency and response size of the OCR serving app with and without the result
+image, on a synthetic 1200x1600 page with 180 text boxes, through the FastAPI test
+client. The pipeline is a stub returning the same OCR result, so that only the
+serving and visualization costs are measured. Also times the first and the later
+accesses of `result.img`. Run with paddlex and its serving dependencies installed,
+e.g. by `pip install -e .`:
+
+    python benchmarks/bench_serving_visualization.py --num-requests 40
+"""
+
+import argparse
+import base64
+import time
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+from paddlex.inference.pipelines.serving._pipeline_apps.ocr import (
+    create_pipeline_app,
+)
+from paddlex.inference.pipelines.serving.app import AppConfig
+from paddlex.inference.results import OCRResult
+
+PAGE_HEIGHT, PAGE_WIDTH = 1600, 1200
+
+
+def _make_page():
+    """draw 60 rows x 3 columns of text lines"""
+    page = np.full((PAGE_HEIGHT, PAGE_WIDTH, 3), 255, dtype=np.uint8)
+    polys, texts = [], []
+    for row in range(60):
+        for col in range(3):
+            x, y = 40 + col * 380, 20 + row * 26
+            polys.append(
+                np.array([[x, y], [x + 340, y], [x + 340, y + 22], [x, y + 22]])
+            )
+            texts.append(f"示例文本 sample text {row}-{col}")
+            cv2.putText(
+                page,
+                texts[-1][-12:],
+                (x, y + 18),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.6,
+                (0, 0, 0),
+                1,
+            )
+    return page, polys, texts
+
+
+class _StubPipeline(object):
+    def __init__(self, polys, texts):
+        self.polys = polys
+        self.texts = texts
+
+    def __call__(self, image):
+        yield OCRResult(
+            {
+                "input_path": None,
+                "ori_img": image,
+                "dt_polys": self.polys,
+                "rec_text": self.texts,
+                "rec_score": [0.99] * len(self.texts),
+            }
+        )
+
+
+def _bench_app(pipeline, config, body, num_requests):
+    app = create_pipeline_app(pipeline, AppConfig(**config))
+    latencies = []
+    with TestClient(app) as client:
+        client.post("/ocr", json=body)
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            response = client.post("/ocr", json=body)
+            latencies.append(time.perf_counter() - start)
+            assert response.json()["errorCode"] == 0, response.json()
+    latencies = np.array(latencies) * 1e3
+    return (
+        np.percentile(latencies, 50),
+        np.percentile(latencies, 99),
+        len(response.content),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-requests", type=int, default=40)
+    args = parser.parse_args()
+
+    page, polys, texts = _make_page()
+    _, buf = cv2.imencode(".jpg", page)
+    image = base64.b64encode(buf.tobytes()).decode("ascii")
+    pipeline = _StubPipeline(polys, texts)
+    settings = [
+        ("visualization on (default)", {}, {"image": image}),
+        ("off by the request", {}, {"image": image, "returnVisualization": False}),
+        ("off by the config", {"visualize": False}, {"image": image}),
+    ]
+    for name, config, body in settings:
+        p50, p99, size = _bench_app(pipeline, config, body, args.num_requests)
+        print(
+            f"{name}: p50 {p50:.1f} ms, p99 {p99:.1f} ms, response {size / 1024:.0f} KB"
+        )
+
+    result = next(pipeline(page))
+    for access in ("first", "second"):
+        start = time.perf_counter()
+        result.img
+        print(f"{access} result.img: {(time.perf_counter() - start) * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
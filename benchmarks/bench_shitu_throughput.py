@@ -0,0 +1,176 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Throughput of PP-ShiTuV2 and face recognition over a folder of synthetic images
+with 0-10 boxes each, per image and with `batch_across_images`. The det and rec
+models are stubs, the rec one costing a fixed time per forward plus a time per crop
+as an accelerator does, and the index is a real faiss Flat index. Run with paddlex
+installed, e.g. by `pip install -e .`:
+
+    python benchmarks/bench_shitu_throughput.py --num-imgs 200
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+from unittest import mock
+
+import cv2
+import faiss
+import numpy as np
+
+from paddlex.inference.components.retrieval.faiss import IndexData
+from paddlex.inference.components.retrieval.id_map import IdMap
+from paddlex.inference.pipelines.face_recognition import FaceRecPipeline
+from paddlex.inference.pipelines.pp_shitu_v2 import ShiTuV2Pipeline
+
+FEATURE_DIM = 128
+
+
+class _StubDet(object):
+    """yield 0-10 random boxes for each image in the folder, the same in every run"""
+
+    def set_predictor(self, **kwargs):
+        pass
+
+    def __call__(self, input):
+        for img_path in sorted(glob.glob(os.path.join(input, "*.jpg"))):
+            rng = np.random.default_rng(int(os.path.basename(img_path)[:4]))
+            boxes = []
+            for _ in range(rng.choice([0, 1, 2, 3, 6, 10])):
+                x, y = rng.integers(0, 260), rng.integers(0, 180)
+                w, h = rng.integers(20, 60, 2)
+                boxes.append(
+                    {
+                        "cls_id": 0,
+                        "label": "obj",
+                        "score": 0.9,
+                        "coordinate": [float(x), float(y), float(x + w), float(y + h)],
+                    }
+                )
+            yield {
+                "input_path": img_path,
+                "ori_img": cv2.imread(img_path),
+                "boxes": boxes,
+            }
+
+
+class _StubRec(object):
+    """project the crops to features, taking `forward_cost + crop_cost * batch_size`
+    seconds per forward of `batch_size` crops"""
+
+    def __init__(self, forward_cost, crop_cost):
+        self.forward_cost = forward_cost
+        self.crop_cost = crop_cost
+        self.batch_size = 1
+        self.num_forwards = 0
+        self._proj = np.random.default_rng(1).standard_normal((192, FEATURE_DIM))
+        self._proj = self._proj.astype(np.float32)
+
+    def set_predictor(self, batch_size=None, **kwargs):
+        if batch_size:
+            self.batch_size = batch_size
+
+    def __call__(self, imgs):
+        for start in range(0, len(imgs), self.batch_size):
+            batch = imgs[start : start + self.batch_size]
+            self.num_forwards += 1
+            time.sleep(self.forward_cost + self.crop_cost * len(batch))
+            for img in batch:
+                feature = cv2.resize(img, (8, 8)).astype(np.float32).reshape(-1)
+                feature = feature @ self._proj
+                yield {"feature": feature / np.linalg.norm(feature)}
+
+
+def _make_imgs(img_dir, num_imgs):
+    rng = np.random.default_rng(0)
+    for i in range(num_imgs):
+        img = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        cv2.imwrite(os.path.join(img_dir, f"{i:04d}.jpg"), img)
+
+
+def _make_index(num_ids):
+    gallery = np.random.default_rng(2).standard_normal((num_ids, FEATURE_DIM))
+    gallery = gallery.astype(np.float32)
+    gallery /= np.linalg.norm(gallery, axis=1, keepdims=True)
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(FEATURE_DIM))
+    index.add_with_ids(gallery, np.arange(num_ids))
+    id_map = IdMap.from_labels(
+        np.arange(num_ids), [f"sku{i // 10}" for i in range(num_ids)]
+    )
+    return IndexData(
+        index, {"id_map": id_map, "metric_type": "IP", "index_type": "Flat"}
+    )
+
+
+def _run(pipeline_cls, img_dir, index, args, **kwargs):
+    # the stubs are used as the models, instead of creating predictors
+    with mock.patch.object(pipeline_cls, "_create", lambda self, model: model):
+        pipeline = pipeline_cls(
+            _StubDet(),
+            _StubRec(args.forward_cost, args.crop_cost),
+            index=index,
+            return_k=5,
+            score_thres=0.0,
+        )
+    num_searches = 0
+    apply = pipeline._indexer.apply
+
+    def _counting_apply(feature):
+        nonlocal num_searches
+        num_searches += 1
+        return apply(feature)
+
+    pipeline._indexer.apply = _counting_apply
+    start = time.perf_counter()
+    results = list(pipeline.predict(img_dir, **kwargs))
+    elapsed = time.perf_counter() - start
+    labels = [[box["labels"] for box in res["boxes"]] for res in results]
+    return labels, len(results) / elapsed, pipeline.rec_model.num_forwards, num_searches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-imgs", type=int, default=200)
+    parser.add_argument("--num-ids", type=int, default=50_000)
+    parser.add_argument("--rec-batch-size", type=int, default=32)
+    parser.add_argument("--forward-cost", type=float, default=0.004)
+    parser.add_argument("--crop-cost", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    index = _make_index(args.num_ids)
+    settings = [
+        {"rec_batch_size": 1},
+        {"rec_batch_size": args.rec_batch_size},
+        {"rec_batch_size": args.rec_batch_size, "batch_across_images": True},
+    ]
+    with tempfile.TemporaryDirectory() as img_dir:
+        _make_imgs(img_dir, args.num_imgs)
+        for pipeline_cls in (ShiTuV2Pipeline, FaceRecPipeline):
+            base_labels = None
+            for kwargs in settings:
+                labels, imgs_per_sec, num_forwards, num_searches = _run(
+                    pipeline_cls, img_dir, index, args, **kwargs
+                )
+                base_labels = base_labels or labels
+                print(
+                    f"{pipeline_cls.__name__} {kwargs}: {imgs_per_sec:.1f} img/s, {num_forwards} rec forwards, {num_searches} searches, same labels: {labels == base_labels}"
+                )
+
+
+if __name__ == "__main__":
+    main()
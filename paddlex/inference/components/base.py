@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import inspect
+import queue
+import threading
 from abc import ABC, abstractmethod
 from copy import deepcopy
 from types import GeneratorType
@@ -290,3 +292,96 @@ class ComponentsEngine(object):
                 yield from self.__call__(data, i + 1)
         else:
             yield from data_gen
+
+
+class _StageError(object):
+    def __init__(self, exc):
+        self.exc = exc
+
+
+class PipelinedComponentsEngine(ComponentsEngine):
+    """
+    Run every component in its own worker thread, and connect them by bounded
+    queues, so that e.g. the reading and preprocessing of the next batch
+    overlap with the inference of the current batch. The order of the output
+    is preserved, as each component handles its input in order.
+    """
+
+    _END = object()
+
+    def __init__(self, ops, queue_size=2):
+        super().__init__(ops)
+        self.queue_size = queue_size
+        self._run_lock = threading.Lock()
+
+    def __call__(self, data):
+        # the components are not thread-safe, so only one run may be live at a time
+        if not self._run_lock.acquire(blocking=False):
+            raise RuntimeError(
+                "The components are being run by another call, whose output must be consumed or closed first."
+            )
+        try:
+            yield from self._run(data)
+        finally:
+            self._run_lock.release()
+
+    def _run(self, data):
+        stop_event = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.keys]
+
+        def _put(q, item):
+            while not stop_event.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _get(q):
+            while not stop_event.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return self._END
+
+        def _iter_queue(q):
+            while True:
+                item = _get(q)
+                if item is self._END:
+                    return
+                if isinstance(item, _StageError):
+                    raise item.exc
+                yield item
+
+        def _work(op, in_q, out_q):
+            try:
+                inputs = [data] if in_q is None else _iter_queue(in_q)
+                for item in inputs:
+                    for output in op(item):
+                        if not _put(out_q, output):
+                            return
+            except BaseException as e:
+                _put(out_q, _StageError(e))
+                return
+            _put(out_q, self._END)
+
+        workers = []
+        for i, key in enumerate(self.keys):
+            in_q = queues[i - 1] if i > 0 else None
+            worker = threading.Thread(
+                target=_work, args=(self.ops[key], in_q, queues[i]), daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+
+        try:
+            yield from _iter_queue(queues[-1])
+        finally:
+            # stop the workers, e.g. when the caller stops iterating early, and wait
+            # for the batches they are handling, so that the next run does not share
+            # the components with them
+            stop_event.set()
+            for worker in workers:
+                worker.join()
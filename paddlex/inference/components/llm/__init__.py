@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from .base import BaseLLM
+from .client import LLMClient
 from .erniebot import ErnieBot
 
 
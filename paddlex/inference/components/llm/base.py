@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import base64
+import asyncio
+import hashlib
+import functools
 from ..base import BaseComponent
+from .client import LLMClient
 from ....utils.subclass_register import AutoRegisterABCMetaClass
 
 __all__ = ["BaseLLM"]
@@ -24,9 +29,20 @@ class BaseLLM(BaseComponent, metaclass=AutoRegisterABCMetaClass):
 
     ERROR_MASSAGE = ""
     VECTOR_STORE_PREFIX = "PADDLEX_VECTOR_STORE"
+    CLIENT_PARAMS = [
+        "max_concurrency",
+        "requests_per_second",
+        "cache_size",
+        "cache_ttl",
+    ]
 
     def __init__(self):
         super().__init__()
+        self.client = None
+
+    def set_client(self, **kwargs):
+        """set the client to send prompts concurrently, see `LLMClient` for kwargs"""
+        self.client = LLMClient(self, **kwargs)
 
     def pre_process(self, inputs):
         return inputs
@@ -37,6 +53,32 @@ class BaseLLM(BaseComponent, metaclass=AutoRegisterABCMetaClass):
     def pred(self, inputs):
         raise NotImplementedError("The method `pred` has not been implemented yet.")
 
+    async def apred(self, prompt, temperature=0.001):
+        """predict without blocking the event loop, by `pred()` in a thread by default"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.pred, prompt, temperature=temperature)
+        )
+
+    def batch_pred(self, prompts, temperature=0.001):
+        """predict prompts concurrently, and return the results in order"""
+        if self.client is None:
+            self.set_client()
+        return self.client.batch_pred(prompts, temperature=temperature)
+
+    @property
+    def cache_scope(self):
+        """
+        The digest of the client config, e.g. the API type, base URL and credentials,
+        that scopes the cached responses, so that the LLMs of different configs do not
+        share them. No credential is kept in the cache keys.
+        """
+        config = getattr(self, "config", None)
+        if config is None:
+            return None
+        content = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
     def get_vector(self):
         raise NotImplementedError(
             "The method `get_vector` has not been implemented yet."
@@ -53,13 +95,16 @@ class BaseLLM(BaseComponent, metaclass=AutoRegisterABCMetaClass):
         post_process_results = self.post_process(pred_results)
         return post_process_results
 
-    def is_vector_store(self, s):
-        return s.startswith(self.VECTOR_STORE_PREFIX)
+    @classmethod
+    def is_vector_store(cls, s):
+        return isinstance(s, str) and s.startswith(cls.VECTOR_STORE_PREFIX)
 
-    def encode_vector_store(self, vector_store_bytes):
-        return self.VECTOR_STORE_PREFIX + base64.b64encode(vector_store_bytes).decode(
+    @classmethod
+    def encode_vector_store(cls, vector_store_bytes):
+        return cls.VECTOR_STORE_PREFIX + base64.b64encode(vector_store_bytes).decode(
             "ascii"
         )
 
-    def decode_vector_store(self, vector_store_str):
-        return base64.b64decode(vector_store_str[len(self.VECTOR_STORE_PREFIX) :])
+    @classmethod
+    def decode_vector_store(cls, vector_store_str):
+        return base64.b64decode(vector_store_str[len(cls.VECTOR_STORE_PREFIX) :])
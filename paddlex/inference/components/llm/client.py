@@ -0,0 +1,209 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ["TokenBucket", "ResponseCache", "LLMClient"]
+
+
+def run_coroutine(coro):
+    """run the coroutine to the end, also when called from a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class TokenBucket(object):
+    """
+    Token-bucket rate limiter. Tokens are refilled at `rate` per second up to
+    `capacity`, and every request takes one, waiting for it if the bucket is empty.
+    It is thread-safe, and can be shared by threads and event loops.
+    """
+
+    def __init__(self, rate, capacity=1):
+        assert rate > 0, f"rate must be positive, but got {rate}."
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """take a token, and return the seconds to wait until it is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class ResponseCache(object):
+    """
+    Content-addressed cache of LLM responses, keyed on (model, prompt, temperature)
+    and the scope of the client config (see `BaseLLM.cache_scope`). Entries expire
+    after `ttl` seconds, and the least recently used ones are evicted beyond
+    `max_size`.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_size=256, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, max_size=256, ttl=3600):
+        """get the cache shared in the process, e.g. by the LLMs created per request"""
+        with cls._shared_lock:
+            if (max_size, ttl) not in cls._shared:
+                cls._shared[(max_size, ttl)] = cls(max_size, ttl)
+            return cls._shared[(max_size, ttl)]
+
+    @staticmethod
+    def make_key(model, prompt, temperature, scope=None):
+        content = json.dumps(
+            [model, prompt, float(temperature), scope], ensure_ascii=False
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (self.ttl and item[0] < time.monotonic()):
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl or 0), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LLMClient(object):
+    """
+    Send prompts to a LLM concurrently, with at most `max_concurrency` requests in
+    flight, at most `requests_per_second` requests started per second, and the
+    responses cached.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_concurrency=4,
+        requests_per_second=None,
+        cache_size=256,
+        cache_ttl=3600,
+    ):
+        """
+        Args:
+            llm (BaseLLM): the LLM to send prompts to, by its `apred()`.
+            max_concurrency (int, optional): the max number of requests in flight.
+                Default: 4.
+            requests_per_second (float, optional): the max rate to start requests.
+                Default: None, meaning no limit.
+            cache_size (int, optional): the max number of cached responses, 0 to disable
+                the cache. The clients with the same cache settings share the cache.
+                Default: 256.
+            cache_ttl (float, optional): the seconds a cached response lives.
+                Default: 3600.
+        """
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = (
+            TokenBucket(requests_per_second) if requests_per_second else None
+        )
+        self.cache = (
+            ResponseCache.get_shared(cache_size, cache_ttl) if cache_size else None
+        )
+
+    @property
+    def model_name(self):
+        return getattr(self.llm, "model_name", self.llm.__class__.__name__)
+
+    async def apred(self, prompt, temperature=0.001, semaphore=None):
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.make_key(
+                self.model_name,
+                prompt,
+                temperature,
+                scope=getattr(self.llm, "cache_scope", None),
+            )
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            result = await self.llm.apred(prompt, temperature=temperature)
+        # failed requests are not cached, so that they are retried next time
+        if result is not None and key is not None:
+            self.cache.put(key, result)
+        return result
+
+    async def abatch_pred(self, prompts, temperature=0.001):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique_prompts = list(dict.fromkeys(prompts))
+        results = await asyncio.gather(
+            *[self.apred(prompt, temperature, semaphore) for prompt in unique_prompts]
+        )
+        results = dict(zip(unique_prompts, results))
+        return [results[prompt] for prompt in prompts]
+
+    def pred(self, prompt, temperature=0.001):
+        return self.batch_pred([prompt], temperature=temperature)[0]
+
+    def batch_pred(self, prompts, temperature=0.001):
+        """get the responses of prompts in order, None for the failed ones"""
+        if len(prompts) == 0:
+            return []
+        return run_coroutine(self.abatch_pred(prompts, temperature=temperature))
@@ -0,0 +1,150 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing, contextmanager
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from ....utils.cache import EMBEDDING_CACHE_DIR
+
+__all__ = ["EmbeddingCache", "CachedEmbeddings"]
+
+
+class EmbeddingCache(object):
+    """
+    On-disk cache of text embeddings, keyed on the hash of (embedding model, text).
+    The embeddings are kept in a sqlite database, so that the cache can be shared by
+    processes, e.g. the workers of a server.
+    """
+
+    DB_FILE_NAME = "embeddings.db"
+    # the max number of variables in a sqlite statement is 999 in old versions
+    QUERY_BATCH_SIZE = 900
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, cache_dir=EMBEDDING_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, self.DB_FILE_NAME)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+
+    @classmethod
+    def get_default(cls):
+        """get the cache in `EMBEDDING_CACHE_DIR` shared in the process"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def make_key(model, text):
+        content = json.dumps([model, text], ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    @contextmanager
+    def _connect(self):
+        # the connection as a context manager only commits, so close it explicitly
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def get_many(self, keys):
+        """get the cached embeddings of keys, as a dict from the found keys to vectors"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[i : i + self.QUERY_BATCH_SIZE]
+                rows = conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """cache the embeddings of a dict from keys to vectors"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embed documents by the cache first, and only the cache misses by `embeddings`,
+    in batches of `batch_size`. The queries are not cached.
+    """
+
+    def __init__(self, embeddings, model, cache, batch_size=16, rate_limiter=None):
+        """
+        Args:
+            embeddings (Embeddings): the embeddings to embed the cache misses.
+            model (str): the name of the embedding model, as a part of the cache key.
+            cache (EmbeddingCache): the cache of embeddings.
+            batch_size (int, optional): the number of texts to embed per request. Default: 16.
+            rate_limiter (TokenBucket, optional): the rate limiter of the requests. Default: None.
+        """
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter
+
+    def embed_documents(self, texts):
+        keys = [self.cache.make_key(self.model, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        missed = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        missed_keys = list(missed)
+        for i in range(0, len(missed_keys), self.batch_size):
+            batch_keys = missed_keys[i : i + self.batch_size]
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            batch_vectors = self.embeddings.embed_documents(
+                [missed[key] for key in batch_keys]
+            )
+            batch_vectors = dict(zip(batch_keys, batch_vectors))
+            # cache every batch, so that the embedded ones are kept if a later one fails
+            self.cache.put_many(batch_vectors)
+            vectors.update(batch_vectors)
+        return [np.asarray(vectors[key], dtype=np.float32).tolist() for key in keys]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
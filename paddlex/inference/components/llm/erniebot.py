@@ -13,19 +13,20 @@
 # limitations under the License.
 
 import os
-import time
 import json
 import erniebot
 
 from pathlib import Path
 from .base import BaseLLM
+from .client import TokenBucket
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
 from ....utils import logging
 from ....utils.func_register import FuncRegister
 
-from langchain.docstore.document import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from langchain_community.embeddings import QianfanEmbeddingsEndpoint
+from langchain_core.embeddings import Embeddings
 from langchain_community.vectorstores import FAISS
 from langchain_community import vectorstores
 from erniebot_agent.extensions.langchain.embeddings import ErnieEmbeddings
@@ -33,6 +34,16 @@ from erniebot_agent.extensions.langchain.embeddings import ErnieEmbeddings
 __all__ = ["ErnieBot"]
 
 
+class _UnboundEmbeddings(Embeddings):
+    """the embeddings of a deserialized store, which are bound per query"""
+
+    def embed_documents(self, texts):
+        raise RuntimeError("The embeddings of the vector store are not set.")
+
+    def embed_query(self, text):
+        raise RuntimeError("The embeddings of the vector store are not set.")
+
+
 class ErnieBot(BaseLLM):
 
     INPUT_KEYS = ["prompts"]
@@ -62,6 +73,8 @@ class ErnieBot(BaseLLM):
         sk = params.get("sk")
         api_type = params.get("api_type")
         max_retries = params.get("max_retries")
+        api_base_url = params.get("api_base_url")
+        use_embedding_cache = params.get("use_embedding_cache", True)
         assert model_name in self.entities, f"model_name must be in {self.entities}"
         assert any([access_token, ak, sk]), "access_token or ak and sk must be set"
         self.model_name = model_name
@@ -74,6 +87,13 @@ class ErnieBot(BaseLLM):
         else:
             self.config["ak"] = ak
             self.config["sk"] = sk
+        # e.g. a local server for test
+        if api_base_url:
+            self.config["api_base_url"] = api_base_url
+        self.use_embedding_cache = use_embedding_cache
+        self.set_client(
+            **{key: params[key] for key in self.CLIENT_PARAMS if key in params}
+        )
 
     def pred(self, prompt, temperature=0.001):
         """
@@ -89,24 +109,42 @@ class ErnieBot(BaseLLM):
             llm_result = chat_completion.get_result()
             return llm_result
         except Exception as e:
-            if len(e.args) < 1:
-                self.ERROR_MASSAGE = (
-                    "当前选择后端为AI Studio，千帆调用失败，请检查token"
-                )
-            elif (
-                e.args[-1]
-                == "暂无权限使用，请在 AI Studio 正确获取访问令牌(access token)使用"
-            ):
-                self.ERROR_MASSAGE = (
-                    "当前选择后端为AI Studio，请正确获取访问令牌(access token)使用"
-                )
-            elif e.args[-1] == "the max length of current question is 4800":
-                self.ERROR_MASSAGE = "大模型调用失败"
-            else:
-                logging.error(e)
-                self.ERROR_MASSAGE = "大模型调用失败"
+            self._set_error_massage(e)
         return None
 
+    async def apred(self, prompt, temperature=0.001):
+        """
+        llm predict asynchronously
+        """
+        try:
+            chat_completion = await erniebot.ChatCompletion.acreate(
+                _config_=self.config,
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=float(temperature),
+            )
+            llm_result = chat_completion.get_result()
+            return llm_result
+        except Exception as e:
+            self._set_error_massage(e)
+        return None
+
+    def _set_error_massage(self, e):
+        if len(e.args) < 1:
+            self.ERROR_MASSAGE = "当前选择后端为AI Studio，千帆调用失败，请检查token"
+        elif (
+            e.args[-1]
+            == "暂无权限使用，请在 AI Studio 正确获取访问令牌(access token)使用"
+        ):
+            self.ERROR_MASSAGE = (
+                "当前选择后端为AI Studio，请正确获取访问令牌(access token)使用"
+            )
+        elif e.args[-1] == "the max length of current question is 4800":
+            self.ERROR_MASSAGE = "大模型调用失败"
+        else:
+            logging.error(e)
+            self.ERROR_MASSAGE = "大模型调用失败"
+
     def get_vector(
         self,
         ocr_result,
@@ -126,45 +164,65 @@ class ErnieBot(BaseLLM):
         )
         texts = text_splitter.split_text("\t".join(all_items))
 
-        all_splits = [Document(page_content=text) for text in texts]
-
         api_type = self.config["api_type"]
+        rate_limiter = None
         if api_type == "qianfan":
             os.environ["QIANFAN_AK"] = os.environ.get("EB_AK", self.config["ak"])
             os.environ["QIANFAN_SK"] = os.environ.get("EB_SK", self.config["sk"])
-            user_ak = os.environ.get("EB_AK", self.config["ak"])
-            user_id = hash(user_ak)
-            vectorstore = FAISS.from_documents(
-                documents=all_splits, embedding=QianfanEmbeddingsEndpoint()
-            )
-
+            embeddings = QianfanEmbeddingsEndpoint()
         elif api_type == "aistudio":
             token = self.config["access_token"]
-            vectorstore = FAISS.from_documents(
-                documents=all_splits[0:1],
-                embedding=ErnieEmbeddings(aistudio_access_token=token),
-            )
-
-            #### ErnieEmbeddings.chunk_size = 16
-            step = min(16, len(all_splits) - 1)
-            for shot_splits in [
-                all_splits[i : i + step] for i in range(1, len(all_splits), step)
-            ]:
-                time.sleep(sleep_time)
-                vectorstore_slice = FAISS.from_documents(
-                    documents=shot_splits,
-                    embedding=ErnieEmbeddings(aistudio_access_token=token),
-                )
-                vectorstore.merge_from(vectorstore_slice)
+            embeddings = ErnieEmbeddings(aistudio_access_token=token)
+            #### ErnieEmbeddings.chunk_size = 16, and the requests are rate limited
+            if sleep_time > 0:
+                rate_limiter = TokenBucket(1.0 / sleep_time)
         else:
             raise ValueError(f"Unsupported api_type: {api_type}")
 
+        if self.use_embedding_cache:
+            # only the chunks not embedded before are sent to the embedding model
+            embedding_cache = EmbeddingCache.get_default()
+            hits, misses = embedding_cache.hits, embedding_cache.misses
+            embeddings = CachedEmbeddings(
+                embeddings,
+                model=f"{api_type}/{embeddings.model}",
+                cache=embedding_cache,
+                rate_limiter=rate_limiter,
+            )
+            vectors = embeddings.embed_documents(texts)
+            hits = embedding_cache.hits - hits
+            misses = embedding_cache.misses - misses
+            logging.info(
+                f"Embedding cache: {hits} hits, {misses} misses in this document, "
+                f"hit rate {embedding_cache.hit_rate:.2%} in total."
+            )
+        else:
+            vectors = []
+            for i in range(0, len(texts), 16):
+                if rate_limiter:
+                    rate_limiter.acquire()
+                vectors.extend(embeddings.embed_documents(texts[i : i + 16]))
+        # build the vector store from all vectors at once
+        vectorstore = FAISS.from_embeddings(
+            text_embeddings=list(zip(texts, vectors)), embedding=embeddings
+        )
+
         vectorstore = self.encode_vector_store(vectorstore.serialize_to_bytes())
         return vectorstore
 
+    @staticmethod
+    def serialize_vector_store(vectorstore):
+        """serialize the FAISS store built by `get_vector()` to bytes"""
+        return vectorstore.serialize_to_bytes()
+
+    @staticmethod
+    def deserialize_vector_store(vector_store_bytes):
+        """deserialize a FAISS store, which gets the embeddings in `caculate_similar()`"""
+        return FAISS.deserialize_from_bytes(vector_store_bytes, _UnboundEmbeddings())
+
     def caculate_similar(self, vector, key_list, llm_params=None, sleep_time=0.5):
         """caculate similar with key and doc"""
-        if not self.is_vector_store(vector):
+        if not isinstance(vector, FAISS) and not self.is_vector_store(vector):
             logging.warning(
                 "The retrieved vectorstore is not for PaddleX and will return the visual results of the query image"
             )
@@ -187,9 +245,22 @@ class ErnieBot(BaseLLM):
         else:
             raise ValueError(f"Unsupported api_type: {api_type}")
 
-        vectorstore = vectorstores.FAISS.deserialize_from_bytes(
-            self.decode_vector_store(vector), embeddings
-        )
+        if isinstance(vector, FAISS):
+            # a store kept by the caller, e.g. the server, which is shared and
+            # not modified here
+            vectorstore = FAISS(
+                embedding_function=embeddings,
+                index=vector.index,
+                docstore=vector.docstore,
+                index_to_docstore_id=vector.index_to_docstore_id,
+            )
+        else:
+            vectorstore = vectorstores.FAISS.deserialize_from_bytes(
+                self.decode_vector_store(vector), embeddings
+            )
+
+        # the requests to embed the questions are rate limited
+        rate_limiter = TokenBucket(1.0 / sleep_time) if sleep_time > 0 else None
 
         # 根据提问匹配上下文
         Q = []
@@ -198,7 +269,8 @@ class ErnieBot(BaseLLM):
             QUESTION = f"抽取关键信息:{key}"
             # c_str = ""
             Q.append(QUESTION)
-            time.sleep(sleep_time)
+            if rate_limiter:
+                rate_limiter.acquire()
             docs = vectorstore.similarity_search_with_relevance_scores(QUESTION, k=2)
             context = [(document.page_content, score) for document, score in docs]
             context = sorted(context, key=lambda x: x[1])
@@ -23,6 +23,29 @@ from ...utils.pp_option import PaddlePredictorOption
 from ..base import BaseComponent
 
 
+def _stack_imgs(imgs):
+    # the images may be the consecutive slices of one batch tensor already, e.g.
+    # the output of `NormalizeToCHWImage`, and then the tensor is used as is
+    base = imgs[0].base
+    if (
+        isinstance(base, np.ndarray)
+        and base.dtype == np.float32
+        and base.ndim == imgs[0].ndim + 1
+        and base.shape[0] >= len(imgs)
+        and base.shape[1:] == imgs[0].shape
+        and base.flags.c_contiguous
+    ):
+        batch = base[: len(imgs)]
+        if all(
+            im.base is base
+            and im.__array_interface__["data"][0]
+            == batch[i].__array_interface__["data"][0]
+            for i, im in enumerate(imgs)
+        ):
+            return batch
+    return np.stack(imgs, axis=0).astype(dtype=np.float32, copy=False)
+
+
 class Copy2GPU(BaseComponent):
 
     def __init__(self, input_handlers):
@@ -214,12 +237,34 @@ class BasePaddlePredictor(BaseComponent):
     def apply(self, **kwargs):
         if self.option.changed:
             self._reset()
+        # inputs of different shapes can not be stacked into one batch, so
+        # run each group of the same shape separately and restore the order
+        groups = self._group_by_shape(kwargs.get("img", None))
+        if len(groups) <= 1:
+            return self._run(**kwargs)
+        output = [None] * sum(len(indices) for indices in groups)
+        for indices in groups:
+            sub_kwargs = {k: [v[i] for i in indices] for k, v in kwargs.items()}
+            for idx, res in zip(indices, self._run(**sub_kwargs)):
+                output[idx] = res
+        return output
+
+    def _run(self, **kwargs):
         batches = self.to_batch(**kwargs)
         self.copy2gpu.apply(batches)
         self.infer.apply()
         pred = self.copy2cpu.apply()
         return self.format_output(pred)
 
+    @staticmethod
+    def _group_by_shape(imgs):
+        if imgs is None:
+            return []
+        groups = {}
+        for idx, img in enumerate(imgs):
+            groups.setdefault(np.shape(img), []).append(idx)
+        return list(groups.values())
+
     @property
     def sub_cmps(self):
         return {
@@ -244,7 +289,7 @@ class ImagePredictor(BasePaddlePredictor):
     DEAULT_OUTPUTS = {"pred": "pred"}
 
     def to_batch(self, img):
-        return [np.stack(img, axis=0).astype(dtype=np.float32, copy=False)]
+        return [_stack_imgs(img)]
 
     def format_output(self, pred):
         return [{"pred": res} for res in zip(*pred)]
@@ -265,14 +310,14 @@ class ImageDetPredictor(BasePaddlePredictor):
         scale_factors = [scale_factor[::-1] for scale_factor in scale_factors]
         if img_size is None:
             return [
-                np.stack(img, axis=0).astype(dtype=np.float32, copy=False),
+                _stack_imgs(img),
                 np.stack(scale_factors, axis=0).astype(dtype=np.float32, copy=False),
             ]
         else:
             img_size = [img_size[::-1] for img_size in img_size]
             return [
                 np.stack(img_size, axis=0).astype(dtype=np.float32, copy=False),
-                np.stack(img, axis=0).astype(dtype=np.float32, copy=False),
+                _stack_imgs(img),
                 np.stack(scale_factors, axis=0).astype(dtype=np.float32, copy=False),
             ]
 
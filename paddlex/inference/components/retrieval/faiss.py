@@ -13,14 +13,20 @@
 # limitations under the License.
 
 import os
+import time
 import pickle
+import tempfile
+import itertools
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import faiss
 import numpy as np
 
 from ....utils import logging
 from ...utils.io import YAMLWriter, YAMLReader
 from ..base import BaseComponent
+from .feature_store import FeatureChunks, ReservoirSampler
+from .id_map import IdMap
 
 
 class IndexData:
@@ -28,11 +34,13 @@ class IndexData:
     VECTOR_SUFFIX = ".index"
     IDMAP_FN = "id_map"
     IDMAP_SUFFIX = ".yaml"
+    INFO_FN = "index_info"
+    INFO_SUFFIX = ".yaml"
 
     def __init__(self, index, index_info):
         self._index = index
         self._index_info = index_info
-        self._id_map = index_info["id_map"]
+        self._id_map = IdMap.from_dict(index_info["id_map"])
         self._metric_type = index_info["metric_type"]
         self._index_type = index_info["index_type"]
 
@@ -61,62 +69,108 @@ class IndexData:
         return {
             "index_type": self.index_type,
             "metric_type": self.metric_type,
-            "id_map": self._convert_int(self.id_map),
+            "id_map": self.id_map.to_dict(),
         }
 
-    def _convert_int(self, id_map):
-        return {int(k): str(v) for k, v in id_map.items()}
-
-    @staticmethod
-    def _convert_int64(id_map):
-        return {np.int64(k): str(v) for k, v in id_map.items()}
-
     def save(self, save_dir):
         save_dir = Path(save_dir)
         save_dir.mkdir(parents=True, exist_ok=True)
         vector_path = (save_dir / f"{self.VECTOR_FN}{self.VECTOR_SUFFIX}").as_posix()
-        index_info_path = (save_dir / f"{self.IDMAP_FN}{self.IDMAP_SUFFIX}").as_posix()
+        tmp_vector_path = (
+            save_dir / f"{self.VECTOR_FN}.tmp{self.VECTOR_SUFFIX}"
+        ).as_posix()
+        index_info_path = (save_dir / f"{self.INFO_FN}{self.INFO_SUFFIX}").as_posix()
 
+        # the index may be memory-mapped from the file to overwrite, which is replaced
+        # by a new file instead of being written in place
         if self.metric_type in FaissBuilder.BINARY_METRIC_TYPE:
-            faiss.write_index_binary(self.index, vector_path)
+            faiss.write_index_binary(self.index, tmp_vector_path)
         else:
-            faiss.write_index(self.index, vector_path)
+            faiss.write_index(self.index, tmp_vector_path)
+        os.replace(tmp_vector_path, vector_path)
 
+        # the id_map is saved in binary files which can be memory-mapped, instead of
+        # YAML which is slow to load for large galleries
+        self.id_map.save(save_dir / self.IDMAP_FN)
         yaml_writer = YAMLWriter()
         yaml_writer.write(
             index_info_path,
-            self.index_info,
+            {"index_type": self.index_type, "metric_type": self.metric_type},
             default_flow_style=False,
             allow_unicode=True,
         )
 
     @classmethod
-    def load(cls, index):
+    def _get_mmap_io_flags(cls, index_type):
+        if index_type == "IVF":
+            # the inverted lists are memory-mapped
+            return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        # the vectors of the Flat and HNSW indexes, supported by the newer faiss only
+        io_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+        if io_flag is None:
+            logging.warning(
+                f"The installed faiss does not support memory-mapping the {index_type} index, which is loaded into memory."
+            )
+            return 0
+        return io_flag | faiss.IO_FLAG_READ_ONLY
+
+    @classmethod
+    def load(cls, index, mmap=False):
+        """
+        Load the index, from the directory it is saved in, or an IndexData.
+
+        Args:
+            index (str|IndexData): the index.
+            mmap (bool, optional): whether to memory-map the index and id_map files
+                instead of reading them into memory, so that the processes loading the
+                same index share the pages. The index loaded can not be modified. It has
+                no effect on an IndexData. Default: False.
+        """
         if isinstance(index, str):
             index_root = Path(index)
             vector_path = index_root / f"{cls.VECTOR_FN}{cls.VECTOR_SUFFIX}"
-            index_info_path = index_root / f"{cls.IDMAP_FN}{cls.IDMAP_SUFFIX}"
+            index_info_path = index_root / f"{cls.INFO_FN}{cls.INFO_SUFFIX}"
+            yaml_id_map_path = index_root / f"{cls.IDMAP_FN}{cls.IDMAP_SUFFIX}"
 
             assert (
                 vector_path.exists()
             ), f"Not found the {cls.VECTOR_FN}{cls.VECTOR_SUFFIX} file in {index}!"
-            assert (
-                index_info_path.exists()
-            ), f"Not found the {cls.IDMAP_FN}{cls.IDMAP_SUFFIX} file in {index}!"
 
             yaml_reader = YAMLReader()
-            index_info = yaml_reader.read(index_info_path)
-            assert (
-                "id_map" in index_info
-                and "metric_type" in index_info
-                and "index_type" in index_info
-            ), f"The index_info file({index_info_path}) may have been damaged, `id_map` or `metric_type` or `index_type` not found in `index_info`."
-            id_map = IndexData._convert_int64(index_info["id_map"])
+            if index_info_path.exists():
+                index_info = yaml_reader.read(index_info_path)
+                assert (
+                    "metric_type" in index_info and "index_type" in index_info
+                ), f"The index_info file({index_info_path}) may have been damaged, `metric_type` or `index_type` not found in `index_info`."
+                id_map = IdMap.load(index_root / cls.IDMAP_FN, mmap=mmap)
+            else:
+                # the index saved by the older versions, with the id_map in YAML
+                assert (
+                    yaml_id_map_path.exists()
+                ), f"Not found the {cls.INFO_FN}{cls.INFO_SUFFIX} or {cls.IDMAP_FN}{cls.IDMAP_SUFFIX} file in {index}!"
+                index_info = yaml_reader.read(yaml_id_map_path)
+                assert (
+                    "id_map" in index_info
+                    and "metric_type" in index_info
+                    and "index_type" in index_info
+                ), f"The index_info file({yaml_id_map_path}) may have been damaged, `id_map` or `metric_type` or `index_type` not found in `index_info`."
+                id_map = IdMap.from_dict(index_info["id_map"])
+                if len(id_map) > 100000:
+                    logging.warning(
+                        f"Loading the id_map of {len(id_map)} ids from YAML is slow. Save the index again to convert it to the binary format, which loads much faster."
+                    )
 
             if index_info["metric_type"] in FaissBuilder.BINARY_METRIC_TYPE:
+                if mmap:
+                    logging.warning(
+                        "Memory-mapping the binary index is not supported, which is loaded into memory."
+                    )
                 index = faiss.read_index_binary(vector_path.as_posix())
             else:
-                index = faiss.read_index(vector_path.as_posix())
+                io_flags = (
+                    cls._get_mmap_io_flags(index_info["index_type"]) if mmap else 0
+                )
+                index = faiss.read_index(vector_path.as_posix(), io_flags)
             assert index.ntotal == len(
                 id_map
             ), "data number in index is not equal in in id_map"
@@ -142,32 +196,94 @@ class FaissIndexer(BaseComponent):
         return_k=1,
         score_thres=None,
         hamming_radius=None,
+        mmap=False,
     ):
+        """
+        Args:
+            index (str|IndexData|list): the index, or a list of indexes searched as the
+                shards of one, e.g. the indexes built from the parts of a large gallery.
+                The shards are searched in parallel, and the top-k results of them are
+                merged.
+            mmap (bool, optional): whether to memory-map the index files. See
+                `IndexData.load()`. Default: False.
+        """
         super().__init__()
-        self._indexer, self.id_map, self.metric_type, index_type = IndexData.load(index)
+        indexes = index if isinstance(index, (list, tuple)) else [index]
+        assert len(indexes) > 0, "No index is given!"
+        self._shards = [IndexData.load(index, mmap=mmap) for index in indexes]
+        metric_types = set(shard[2] for shard in self._shards)
+        assert (
+            len(metric_types) == 1
+        ), f"The shards of the index are of different metric types: {metric_types}!"
+        self._indexer, self.id_map, self.metric_type, index_type = self._shards[0]
+        self._executor = (
+            ThreadPoolExecutor(max_workers=len(self._shards))
+            if len(self._shards) > 1
+            else None
+        )
         self.return_k = return_k
         if self.metric_type in FaissBuilder.BINARY_METRIC_TYPE:
             self.hamming_radius = hamming_radius
         else:
             self.score_thres = score_thres
 
+    def _search(self, indexer, id_map, features):
+        scores_list, ids_list = indexer.search(features, self.return_k)
+        # faiss returns the id -1 when less than `return_k` results are found
+        _, found = id_map.find(ids_list)
+        labels_list = id_map.get_labels(ids_list)
+        return scores_list, labels_list, found
+
+    def _merge(self, results):
+        """merge the top-k results of the shards, which are sorted in each shard"""
+        scores_list, labels_list, found = (
+            np.concatenate(arrays, axis=1) for arrays in zip(*results)
+        )
+        # the larger the inner product, the closer, and the opposite for distances
+        keys = -scores_list if self.metric_type == "IP" else scores_list
+        keys = np.where(found, keys, np.inf)
+        order = np.argsort(keys, axis=1, kind="stable")[:, : self.return_k]
+        return (
+            np.take_along_axis(scores_list, order, axis=1),
+            np.take_along_axis(labels_list, order, axis=1),
+            np.take_along_axis(found, order, axis=1),
+        )
+
     def apply(self, feature):
         """apply"""
-        scores_list, ids_list = self._indexer.search(np.array(feature), self.return_k)
-        preds = []
-        for scores, ids in zip(scores_list, ids_list):
-            labels = []
-            for id in ids:
-                if id > 0:
-                    labels.append(self.id_map[id])
-            preds.append({"score": scores, "label": labels})
+        features = np.array(feature)
+        if self._executor is None:
+            scores_list, labels_list, found = self._search(
+                self._indexer, self.id_map, features
+            )
+        else:
+            results = self._executor.map(
+                lambda shard: self._search(shard[0], shard[1], features), self._shards
+            )
+            scores_list, labels_list, found = self._merge(list(results))
 
+        # reject the rows without any result, or with the top-1 result beyond the
+        # threshold
+        rejected = ~found.any(axis=1)
         if self.metric_type in FaissBuilder.BINARY_METRIC_TYPE:
-            idxs = np.where(scores_list[:, 0] > self.hamming_radius)[0]
-        else:
-            idxs = np.where(scores_list[:, 0] < self.score_thres)[0]
-        for idx in idxs:
-            preds[idx] = {"score": None, "label": None}
+            if self.hamming_radius is not None:
+                rejected |= scores_list[:, 0] > self.hamming_radius
+        elif self.score_thres is not None:
+            rejected |= scores_list[:, 0] < self.score_thres
+
+        preds = []
+        all_found = found.all()
+        for scores, labels, row_found, row_rejected in zip(
+            scores_list, labels_list, found, rejected
+        ):
+            if row_rejected:
+                preds.append({"score": None, "label": None})
+            elif all_found:
+                preds.append({"score": scores, "label": labels.tolist()})
+            else:
+                preds.append(
+                    {"score": scores[row_found], "label": labels[row_found].tolist()}
+                )
         return preds
 
 
@@ -177,12 +293,31 @@ class FaissBuilder:
     SUPPORT_INDEX_TYPE = ("Flat", "IVF", "HNSW32")
     BINARY_METRIC_TYPE = ("hamming",)
     BINARY_SUPPORT_INDEX_TYPE = ("Flat", "IVF", "BinaryHash")
+    # the number of gallery images whose features are extracted and added at a time
+    CHUNK_SIZE = 10000
+    # the number of vectors sampled per IVF list to train the index
+    TRAIN_SIZE_PER_LIST = 64
+    # the max number of vectors sampled to train the index
+    TRAIN_SIZE_MAX = 100000
+
+    @classmethod
+    def _get_nlist(cls, num):
+        return min(int(num // 8), 65536)
+
+    @classmethod
+    def _get_train_size(cls, num, train_size=None):
+        nlist = cls._get_nlist(num)
+        train_size = min(
+            cls.TRAIN_SIZE_PER_LIST * nlist, train_size or cls.TRAIN_SIZE_MAX
+        )
+        # k-means needs at least one training vector per IVF list
+        return max(train_size, nlist)
 
     @classmethod
     def _get_index_type(cls, metric_type, index_type, num=None):
         # if IVF method, cal ivf number automaticlly
         if index_type == "IVF":
-            index_type = index_type + str(min(int(num // 8), 65536))
+            index_type = index_type + str(cls._get_nlist(num))
             if metric_type in cls.BINARY_METRIC_TYPE:
                 index_type += ",BFlat"
             else:
@@ -223,7 +358,25 @@ class FaissBuilder:
         predict_func,
         metric_type="IP",
         index_type="HNSW32",
+        chunk_size=None,
+        checkpoint_dir=None,
+        train_size=None,
     ):
+        """
+        Build the index of the gallery. The features are extracted and added to the
+        index chunk by chunk, instead of all at once, to bound the memory used.
+
+        Args:
+            chunk_size (int, optional): the number of images per chunk. Default: None,
+                meaning `CHUNK_SIZE`.
+            checkpoint_dir (str, optional): the directory to save the features of each
+                chunk in, so that an interrupted build can be resumed by calling again
+                with the same gallery and directory. Default: None, meaning no
+                checkpoint.
+            train_size (int, optional): the max number of vectors sampled to train
+                the IVF index, which is raised to the number of IVF lists if less.
+                Default: None, meaning `TRAIN_SIZE_MAX`.
+        """
         assert (
             index_type in cls.SUPPORT_INDEX_TYPE
         ), f"Supported index types only: {cls.SUPPORT_INDEX_TYPE}!"
@@ -237,10 +390,20 @@ class FaissBuilder:
         else:
             gallery_docs, gallery_list = gallery_label, gallery_imgs
 
-        features = [res["feature"] for res in predict_func(gallery_list)]
-        dtype = np.uint8 if metric_type in cls.BINARY_METRIC_TYPE else np.float32
-        features = np.array(features).astype(dtype)
-        vector_num, vector_dim = features.shape
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        checkpoint = (
+            FeatureChunks(checkpoint_dir, gallery_list, chunk_size)
+            if checkpoint_dir
+            else None
+        )
+        chunks = cls._extract_features(
+            metric_type, gallery_list, predict_func, chunk_size, checkpoint
+        )
+        # the index is created once the dim of the features is known
+        first_chunk = next(chunks, None)
+        assert first_chunk is not None, "The gallery is empty!"
+        chunks = itertools.chain([first_chunk], chunks)
+        vector_num, vector_dim = len(gallery_list), first_chunk[1].shape[1]
 
         if metric_type in cls.BINARY_METRIC_TYPE:
             index = faiss.index_binary_factory(
@@ -255,11 +418,17 @@ class FaissBuilder:
                 cls._get_metric_type(metric_type),
             )
             index = faiss.IndexIDMap2(index)
-        ids = {}
+        ids = IdMap.from_labels([], [])
 
         # calculate id for new data
         index, ids = cls._add_gallery(
-            metric_type, index, ids, features, gallery_docs, mode="new"
+            metric_type,
+            index,
+            ids,
+            chunks,
+            gallery_docs,
+            train_size=cls._get_train_size(vector_num, train_size),
+            checkpoint=checkpoint,
         )
         return IndexData(
             index, {"id_map": ids, "metric_type": metric_type, "index_type": index_type}
@@ -290,13 +459,25 @@ class FaissBuilder:
 
         # remove ids in id_map, remove index data in faiss index
         index.remove_ids(remove_ids)
-        ids = {k: v for k, v in ids.items() if k not in remove_ids}
+        ids = ids.remove(remove_ids)
         return IndexData(
             index, {"id_map": ids, "metric_type": metric_type, "index_type": index_type}
         )
 
     @classmethod
-    def append(cls, gallery_imgs, gallery_label, predict_func, index):
+    def append(
+        cls,
+        gallery_imgs,
+        gallery_label,
+        predict_func,
+        index,
+        chunk_size=None,
+        checkpoint_dir=None,
+    ):
+        """
+        Append the gallery to the index chunk by chunk. `chunk_size` and
+        `checkpoint_dir` are as in `build()`.
+        """
         index, ids, metric_type, index_type = IndexData.load(index)
         assert (
             metric_type in cls.SUPPORT_METRIC_TYPE
@@ -307,42 +488,119 @@ class FaissBuilder:
         else:
             gallery_docs, gallery_list = gallery_label, gallery_imgs
 
-        features = [res["feature"] for res in predict_func(gallery_list)]
-        dtype = np.uint8 if metric_type in cls.BINARY_METRIC_TYPE else np.float32
-        features = np.array(features).astype(dtype)
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        checkpoint = (
+            FeatureChunks(checkpoint_dir, gallery_list, chunk_size)
+            if checkpoint_dir
+            else None
+        )
+        chunks = cls._extract_features(
+            metric_type, gallery_list, predict_func, chunk_size, checkpoint
+        )
 
         # calculate id for new data
         index, ids = cls._add_gallery(
-            metric_type, index, ids, features, gallery_docs, mode="append"
+            metric_type, index, ids, chunks, gallery_docs, checkpoint=checkpoint
         )
         return IndexData(
             index, {"id_map": ids, "metric_type": metric_type, "index_type": index_type}
         )
 
     @classmethod
-    def _add_gallery(
-        cls, metric_type, index, ids, gallery_features, gallery_docs, mode
+    def _extract_features(
+        cls, metric_type, gallery_list, predict_func, chunk_size, checkpoint=None
     ):
-        start_id = max(ids.keys()) + 1 if ids else 0
-        ids_now = (np.arange(0, len(gallery_docs)) + start_id).astype(np.int64)
-
-        # only train when new index file
-        if mode == "new":
-            if metric_type in cls.BINARY_METRIC_TYPE:
-                index.add(gallery_features)
+        """
+        Extract the features of the gallery chunk by chunk, and yield the start of
+        each chunk and the features. The chunks in `checkpoint` are loaded instead.
+        """
+        dtype = np.uint8 if metric_type in cls.BINARY_METRIC_TYPE else np.float32
+        num = len(gallery_list)
+        tic = time.perf_counter()
+        for start in range(0, num, chunk_size):
+            end = min(start + chunk_size, num)
+            if checkpoint is not None and start in checkpoint:
+                features = checkpoint.load(start)
             else:
-                index.train(gallery_features)
+                features = [
+                    res["feature"] for res in predict_func(gallery_list[start:end])
+                ]
+                features = np.array(features).astype(dtype)
+                if checkpoint is not None:
+                    checkpoint.save(start, features)
+            assert (
+                len(features) == end - start
+            ), f"Got {len(features)} features for {end - start} images!"
+            yield start, features
+            elapsed = time.perf_counter() - tic
+            logging.info(
+                f"Processed {end}/{num} gallery images in {elapsed:.1f}s ({end / elapsed:.1f} images/s)."
+            )
 
-        if metric_type not in cls.BINARY_METRIC_TYPE:
-            index.add_with_ids(gallery_features, ids_now)
-        # TODO(gaotingquan): how append when using hamming metric type
-        # else:
-        #   pass
+    @classmethod
+    def _add_gallery(
+        cls,
+        metric_type,
+        index,
+        ids,
+        chunks,
+        gallery_docs,
+        train_size=None,
+        checkpoint=None,
+    ):
+        start_id = ids.max_id + 1 if len(ids) > 0 else 0
+        ids_now = (np.arange(0, len(gallery_docs)) + start_id).astype(np.int64)
 
-        for i, d in zip(list(ids_now), gallery_docs):
-            ids[i] = d
+        if index.is_trained:
+            for start, features in chunks:
+                cls._add_features(
+                    metric_type,
+                    index,
+                    features,
+                    ids_now[start : start + len(features)],
+                )
+        else:
+            # the features can only be added after training, which is done on a
+            # sample of them, so they are kept on disk meanwhile
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                if checkpoint is None:
+                    checkpoint = FeatureChunks(tmp_dir)
+                if train_size is None or train_size > len(ids_now):
+                    train_size = len(ids_now)
+                sampler = ReservoirSampler(train_size)
+                starts = []
+                for start, features in chunks:
+                    sampler.add(features)
+                    if start not in checkpoint:
+                        checkpoint.save(start, features)
+                    starts.append(start)
+                tic = time.perf_counter()
+                index.train(sampler.data)
+                logging.info(
+                    f"Trained the index with {len(sampler.data)} vectors in {time.perf_counter() - tic:.1f}s."
+                )
+                del sampler
+                for start in starts:
+                    features = checkpoint.load(start)
+                    cls._add_features(
+                        metric_type,
+                        index,
+                        features,
+                        ids_now[start : start + len(features)],
+                    )
+
+        ids = ids.append(ids_now, gallery_docs)
         return index, ids
 
+    @classmethod
+    def _add_features(cls, metric_type, index, features, ids):
+        if metric_type in cls.BINARY_METRIC_TYPE:
+            # the binary indexes are not wrapped with the ids, which are the
+            # positions of the vectors
+            index.add(features)
+        else:
+            index.add_with_ids(features, ids)
+
     @classmethod
     def load_gallery(cls, gallery_label_path, gallery_imgs_root="", delimiter=" "):
         lines = []
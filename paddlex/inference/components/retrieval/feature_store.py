@@ -0,0 +1,120 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from ....utils import logging
+from ...utils.io import YAMLWriter, YAMLReader
+
+
+class FeatureChunks(object):
+    """
+    The features of a gallery saved chunk by chunk in a directory, so that a build
+    interrupted can be resumed without extracting the saved chunks again. The
+    directory is bound to the gallery images and the chunk size, and the chunks of
+    another gallery in it are removed. Without `gallery_list`, it is a scratch
+    directory bound to nothing.
+    """
+
+    INFO_FN = "info.yaml"
+    CHUNK_PREFIX = "features_"
+    CHUNK_SUFFIX = ".npy"
+
+    def __init__(self, root, gallery_list=None, chunk_size=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if gallery_list is not None:
+            self._check_info(gallery_list, chunk_size)
+
+    def _check_info(self, gallery_list, chunk_size):
+        info = {
+            "num": len(gallery_list),
+            "chunk_size": chunk_size,
+            "gallery_hash": self._hash_gallery(gallery_list),
+        }
+        info_path = self.root / self.INFO_FN
+        if info_path.exists():
+            saved_info = YAMLReader().read(info_path)
+            if saved_info != info:
+                logging.warning(
+                    f"The features saved in {self.root} are of another gallery or chunk size, and are removed."
+                )
+                self._clear()
+        YAMLWriter().write(info_path.as_posix(), info, default_flow_style=False)
+
+    @staticmethod
+    def _hash_gallery(gallery_list):
+        md5 = hashlib.md5()
+        for item in gallery_list:
+            md5.update(str(item).encode("utf-8"))
+            md5.update(b"\n")
+        return md5.hexdigest()
+
+    def _clear(self):
+        for path in self.root.glob(f"{self.CHUNK_PREFIX}*{self.CHUNK_SUFFIX}"):
+            path.unlink()
+
+    def _get_path(self, start):
+        return self.root / f"{self.CHUNK_PREFIX}{start:012d}{self.CHUNK_SUFFIX}"
+
+    def __contains__(self, start):
+        return self._get_path(start).exists()
+
+    def load(self, start):
+        return np.load(self._get_path(start))
+
+    def save(self, start, features):
+        path = self._get_path(start)
+        tmp_path = path.with_name(f"{path.stem}.tmp{self.CHUNK_SUFFIX}")
+        np.save(tmp_path, features)
+        # a chunk is either saved completely or not at all, even if interrupted
+        os.replace(tmp_path, path)
+
+
+class ReservoirSampler(object):
+    """Uniformly sample at most `size` rows from chunks of rows in a single pass."""
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.num_seen = 0
+        self._data = None
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, rows):
+        if self._data is None:
+            self._data = np.empty((self.size,) + rows.shape[1:], dtype=rows.dtype)
+        # fill the reservoir first
+        num_fill = min(max(self.size - self.num_seen, 0), len(rows))
+        self._data[self.num_seen : self.num_seen + num_fill] = rows[:num_fill]
+        # then the t-th row seen replaces a random one with probability size / (t + 1)
+        seen = self.num_seen + np.arange(num_fill, len(rows))
+        slots = self._rng.integers(0, seen + 1)
+        replaced = np.flatnonzero(slots < self.size) + num_fill
+        if len(replaced) > 0:
+            # the later rows win if the same slot is drawn more than once
+            slots = slots[replaced - num_fill]
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = len(slots) - 1 - last
+            self._data[slots[keep]] = rows[replaced[keep]]
+        self.num_seen += len(rows)
+
+    @property
+    def data(self):
+        if self._data is None:
+            return None
+        return self._data[: min(self.num_seen, self.size)]
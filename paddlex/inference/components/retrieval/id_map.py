@@ -0,0 +1,264 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+
+class IdMap(Mapping):
+    """
+    The map from the ids in a faiss index to the labels, stored in arrays that can
+    be saved as `.npy` files and memory-mapped on load:
+
+        ids.npy: the ids in ascending order, int64.
+        label_codes.npy: the index of the label of each id in the label table, int32.
+        label_offsets.npy: the offsets of the labels in `label_data`, int64.
+        label_data.npy: the UTF-8 encoded labels one after another, uint8.
+
+    An id is found by its position when the ids are consecutive, e.g. for an index
+    that nothing is removed from, and by binary search otherwise.
+    """
+
+    IDS_FN = "ids.npy"
+    LABEL_CODES_FN = "label_codes.npy"
+    LABEL_OFFSETS_FN = "label_offsets.npy"
+    LABEL_DATA_FN = "label_data.npy"
+
+    def __init__(self, ids, label_codes, label_offsets, label_data):
+        assert len(ids) == len(
+            label_codes
+        ), f"The number of ids({len(ids)}) and labels({len(label_codes)}) are not equal!"
+        self._ids = ids
+        self._label_codes = label_codes
+        self._label_offsets = label_offsets
+        self._label_data = label_data
+        # the ids are consecutive if the first and the last ids are `len - 1` apart,
+        # as they are unique and sorted
+        self._consecutive = len(ids) == 0 or int(ids[-1]) - int(ids[0]) == len(ids) - 1
+        # the labels decoded so far, filled on demand
+        self._label_table = None
+        self._label_decoded = None
+
+    @classmethod
+    def from_labels(cls, ids, labels):
+        """create the map from the ids and the labels of them"""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        table = {}
+        label_codes = np.fromiter(
+            (table.setdefault(str(label), len(table)) for label in labels),
+            dtype=np.int32,
+            count=len(ids),
+        )
+        order = np.argsort(ids, kind="stable")
+        ids, label_codes = ids[order], label_codes[order]
+        assert np.all(ids[1:] != ids[:-1]), "The ids are not unique!"
+        return cls(ids, label_codes, *cls._encode_labels(list(table)))
+
+    @classmethod
+    def from_dict(cls, id_map):
+        """create the map from a dict of {id: label}, e.g. one loaded from YAML"""
+        if isinstance(id_map, cls):
+            return id_map
+        ids = np.fromiter((int(k) for k in id_map.keys()), dtype=np.int64)
+        return cls.from_labels(ids, id_map.values())
+
+    @staticmethod
+    def _encode_labels(labels):
+        encoded = [label.encode("utf-8") for label in labels]
+        label_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=label_offsets[1:])
+        label_data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return label_offsets, label_data
+
+    def save(self, save_dir):
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        for fn, array in (
+            (self.IDS_FN, self._ids),
+            (self.LABEL_CODES_FN, self._label_codes),
+            (self.LABEL_OFFSETS_FN, self._label_offsets),
+            (self.LABEL_DATA_FN, self._label_data),
+        ):
+            path = save_dir / fn
+            tmp_path = path.with_name(f"{path.stem}.tmp{path.suffix}")
+            # the arrays may be memory-mapped from the files to overwrite, so they are
+            # read into memory and written to new files which then replace the old ones
+            np.save(tmp_path, np.array(array))
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, load_dir, mmap=True):
+        """load the map saved by `save()`, memory-mapped by default"""
+        load_dir = Path(load_dir)
+        mmap_mode = "r" if mmap else None
+        arrays = []
+        for fn in (
+            cls.IDS_FN,
+            cls.LABEL_CODES_FN,
+            cls.LABEL_OFFSETS_FN,
+            cls.LABEL_DATA_FN,
+        ):
+            path = load_dir / fn
+            assert path.exists(), f"Not found the {fn} file in {load_dir}!"
+            arrays.append(np.load(path, mmap_mode=mmap_mode))
+        return cls(*arrays)
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def max_id(self):
+        return int(self._ids[-1]) if len(self._ids) > 0 else None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return (int(i) for i in self._ids)
+
+    def __contains__(self, id_):
+        try:
+            self._find(id_)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __getitem__(self, id_):
+        return self._get_label(self._label_codes[self._find(id_)])
+
+    def _find(self, id_):
+        """get the position of the id"""
+        id_ = int(id_)
+        if len(self._ids) == 0:
+            raise KeyError(id_)
+        if self._consecutive:
+            pos = id_ - int(self._ids[0])
+            if 0 <= pos < len(self._ids):
+                return pos
+            raise KeyError(id_)
+        pos = int(np.searchsorted(self._ids, id_))
+        if pos < len(self._ids) and self._ids[pos] == id_:
+            return pos
+        raise KeyError(id_)
+
+    def _get_label(self, code):
+        return self._lookup_labels(np.asarray([code]))[0]
+
+    def _lookup_labels(self, codes):
+        """get the labels of an array of codes, decoding the ones not decoded yet"""
+        if self._label_table is None:
+            num_labels = len(self._label_offsets) - 1
+            self._label_table = np.full(num_labels, None, dtype=object)
+            self._label_decoded = np.zeros(num_labels, dtype=bool)
+        new_codes = codes[~self._label_decoded[codes]]
+        if len(new_codes) > 0:
+            new_codes = np.unique(new_codes)
+            # slicing the memoryview is much cheaper than slicing the array per label
+            data = memoryview(self._label_data)
+            starts = self._label_offsets[new_codes].tolist()
+            ends = self._label_offsets[new_codes + 1].tolist()
+            self._label_table[new_codes] = [
+                str(data[s:e], "utf-8") for s, e in zip(starts, ends)
+            ]
+            self._label_decoded[new_codes] = True
+        return self._label_table[codes]
+
+    def find(self, ids):
+        """
+        Get the positions of ids.
+
+        Args:
+            ids (np.ndarray): the ids, in any shape.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the positions of the ids, and whether the
+                ids are found. The positions of the ids not found are undefined.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self._ids) == 0:
+            return np.zeros(ids.shape, dtype=np.int64), np.zeros(ids.shape, dtype=bool)
+        if self._consecutive:
+            pos = ids - self._ids[0]
+            found = (pos >= 0) & (pos < len(self._ids))
+            return np.where(found, pos, 0), found
+        pos = np.searchsorted(self._ids, ids)
+        pos = np.minimum(pos, len(self._ids) - 1)
+        return pos, self._ids[pos] == ids
+
+    def get_labels(self, ids, default=None):
+        """
+        Get the labels of ids, in an array of objects in the same shape.
+
+        Args:
+            ids (np.ndarray): the ids, in any shape.
+            default (any, optional): the label of the ids not found. Default: None.
+        """
+        pos, found = self.find(ids)
+        labels = np.full(pos.shape, default, dtype=object)
+        labels[found] = self._lookup_labels(self._label_codes[pos[found]])
+        return labels
+
+    def remove(self, ids):
+        """return a new map without the ids"""
+        keep = ~np.isin(self._ids, np.asarray(ids, dtype=np.int64))
+        # the new map does not share the label table with the memory-mapped files
+        return IdMap(
+            self._ids[keep],
+            self._label_codes[keep],
+            np.array(self._label_offsets),
+            np.array(self._label_data),
+        )
+
+    def append(self, ids, labels):
+        """return a new map with the ids, which must be larger than the existing ones"""
+        new = IdMap.from_labels(ids, labels)
+        if len(new) == 0:
+            return self
+        if len(self) > 0:
+            assert (
+                new.ids[0] > self._ids[-1]
+            ), "The ids to append must be larger than the existing ones!"
+        # the labels of the new map are after the existing ones in the label table
+        num_labels = len(self._label_offsets) - 1
+        label_offsets = np.concatenate(
+            [self._label_offsets, new._label_offsets[1:] + self._label_offsets[-1]]
+        )
+        return IdMap(
+            np.concatenate([self._ids, new.ids]),
+            np.concatenate([self._label_codes, new._label_codes + num_labels]),
+            label_offsets,
+            np.concatenate([self._label_data, new._label_data]),
+        )
+
+    def to_dict(self):
+        return dict(zip(self, self.get_labels(self._ids).tolist()))
+
+    def __reduce__(self):
+        # the memory-mapped arrays are pickled as in-memory ones
+        return (
+            IdMap,
+            (
+                np.asarray(self._ids),
+                np.asarray(self._label_codes),
+                np.asarray(self._label_offsets),
+                np.asarray(self._label_data),
+            ),
+        )
+
+    def __repr__(self):
+        return f"IdMap({len(self)} ids)"
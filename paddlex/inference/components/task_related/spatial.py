@@ -0,0 +1,149 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+
+def _to_rects(boxes):
+    """convert boxes of points or rectangles to axis-aligned rectangles in shape (N, 4)"""
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=np.float64)
+    try:
+        points = np.asarray(boxes, dtype=np.float64).reshape(len(boxes), -1, 2)
+    except ValueError:
+        # boxes with different numbers of points, e.g. curved text
+        return np.array(
+            [_to_rects([box])[0] for box in boxes], dtype=np.float64
+        ).reshape(-1, 4)
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+
+
+class SpatialIndex(object):
+    """
+    A uniform grid over the axis-aligned bounds of boxes, e.g. the `dt_polys` of a
+    page. It is built once, and finds the boxes related to each of a batch of
+    regions from the grid cells the region covers, instead of checking every box.
+    """
+
+    def __init__(self, boxes, cell_size=None):
+        """
+        Args:
+            boxes (list|np.ndarray): boxes of points, eg. [[x1, y1, x2, y2, x3, y3, x4, y4]]
+                or [[[x1, y1], [x2, y2], ...]], or rectangles, eg. [[x1, y1, x2, y2]].
+            cell_size (float, optional): side length of the grid cells. Defaults to
+                twice the median size of the boxes.
+        """
+        self.rects = _to_rects(boxes)
+        num_boxes = len(self.rects)
+        if num_boxes == 0:
+            self.cell_size = cell_size or 1.0
+            self._origin = np.zeros(2, dtype=np.float64)
+            self._num_cols = self._num_rows = 0
+            self._cell_ids = np.zeros(0, dtype=np.int64)
+            self._box_ids = np.zeros(0, dtype=np.int64)
+            return
+
+        if cell_size is None:
+            sizes = np.maximum(
+                self.rects[:, 2] - self.rects[:, 0], self.rects[:, 3] - self.rects[:, 1]
+            )
+            cell_size = max(float(np.median(sizes)) * 2, 1.0)
+        self.cell_size = cell_size
+        self._origin = self.rects[:, :2].min(axis=0)
+        x1, y1, x2, y2 = self._get_cell_range(self.rects)
+        self._num_cols = int(x2.max()) + 1
+        self._num_rows = int(y2.max()) + 1
+
+        # register every box to all the cells its bounds cover
+        num_x = x2 - x1 + 1
+        num_cells = num_x * (y2 - y1 + 1)
+        box_ids = np.repeat(np.arange(num_boxes), num_cells)
+        offsets = np.arange(len(box_ids)) - np.repeat(
+            np.cumsum(num_cells) - num_cells, num_cells
+        )
+        cell_x = x1[box_ids] + offsets % num_x[box_ids]
+        cell_y = y1[box_ids] + offsets // num_x[box_ids]
+        cell_ids = cell_y * self._num_cols + cell_x
+        order = np.argsort(cell_ids, kind="stable")
+        self._cell_ids = cell_ids[order]
+        self._box_ids = box_ids[order]
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _get_cell_range(self, rects):
+        cells = np.floor((rects - np.tile(self._origin, 2)) / self.cell_size)
+        cells = cells.astype(np.int64)
+        return cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3]
+
+    def _get_candidates(self, rect):
+        """get the ids of boxes in the grid cells covered by rect"""
+        x1, y1, x2, y2 = [int(i[0]) for i in self._get_cell_range(rect[None])]
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, self._num_cols - 1), min(y2, self._num_rows - 1)
+        if x1 > x2 or y1 > y2:
+            return np.zeros(0, dtype=np.int64)
+        row_starts = np.arange(y1, y2 + 1) * self._num_cols
+        starts = np.searchsorted(self._cell_ids, row_starts + x1, side="left")
+        ends = np.searchsorted(self._cell_ids, row_starts + x2, side="right")
+        return np.unique(
+            np.concatenate([self._box_ids[s:e] for s, e in zip(starts, ends)])
+        )
+
+    def query_inside(self, regions):
+        """
+        Find the boxes whose centers are inside each region, borders included.
+
+        Args:
+            regions (list|np.ndarray): regions in any format of the boxes.
+
+        Returns:
+            list[np.ndarray]: the ascending ids of the boxes for each region.
+        """
+        results = []
+        for region in _to_rects(regions):
+            ids = self._get_candidates(region)
+            rects = self.rects[ids]
+            centers_x = (rects[:, 0] + rects[:, 2]) / 2
+            centers_y = (rects[:, 1] + rects[:, 3]) / 2
+            inside = (
+                (centers_x >= region[0])
+                & (centers_x <= region[2])
+                & (centers_y >= region[1])
+                & (centers_y <= region[3])
+            )
+            results.append(ids[inside])
+        return results
+
+    def query_overlap(self, regions):
+        """
+        Find the boxes whose intersection with each region has a positive area.
+
+        Args:
+            regions (list|np.ndarray): regions in any format of the boxes.
+
+        Returns:
+            list[np.ndarray]: the ascending ids of the boxes for each region.
+        """
+        results = []
+        for region in _to_rects(regions):
+            ids = self._get_candidates(region)
+            rects = self.rects[ids]
+            overlap = (
+                np.maximum(rects[:, 0], region[0]) < np.minimum(rects[:, 2], region[2])
+            ) & (
+                np.maximum(rects[:, 1], region[1]) < np.minimum(rects[:, 3], region[3])
+            )
+            results.append(ids[overlap])
+        return results
@@ -24,7 +24,6 @@ from numpy.linalg import norm
 from PIL import Image
 from shapely.geometry import Polygon
 
-from ...utils.io import ImageReader
 from ....utils import logging
 from ..base import BaseComponent
 from .seal_det_warp import AutoRectifier
@@ -425,20 +424,17 @@ class DBPostProcess(BaseComponent):
 class CropByPolys(BaseComponent):
     """Crop Image by Polys"""
 
-    INPUT_KEYS = ["input_path", "dt_polys"]
+    INPUT_KEYS = ["img", "dt_polys"]
     OUTPUT_KEYS = ["img"]
-    DEAULT_INPUTS = {"input_path": "input_path", "dt_polys": "dt_polys"}
+    DEAULT_INPUTS = {"img": "ori_img", "dt_polys": "dt_polys"}
     DEAULT_OUTPUTS = {"img": "img"}
 
     def __init__(self, det_box_type="quad"):
         super().__init__()
         self.det_box_type = det_box_type
-        self._reader = ImageReader(backend="opencv")
 
-    def apply(self, input_path, dt_polys):
+    def apply(self, img, dt_polys):
         """apply"""
-        img = self._reader.read(input_path)
-
         if self.det_box_type == "quad":
             dt_boxes = np.array(dt_polys)
             output_list = []
@@ -39,6 +39,8 @@ __all__ = [
 class OCRReisizeNormImg(BaseComponent):
     """for ocr image resize and normalization"""
 
+    ENABLE_BATCH = True
+
     INPUT_KEYS = ["img", "img_size"]
     OUTPUT_KEYS = ["img"]
     DEAULT_INPUTS = {"img": "img", "img_size": "img_size"}
@@ -71,13 +73,13 @@ class OCRReisizeNormImg(BaseComponent):
 
     def apply(self, img, img_size):
         """apply"""
+        # pad all images of the batch to the widest one, so that they can be
+        # inferred together
         imgC, imgH, imgW = self.rec_image_shape
         max_wh_ratio = imgW / imgH
-        w, h = img_size[:2]
-        wh_ratio = w * 1.0 / h
-        max_wh_ratio = max(max_wh_ratio, wh_ratio)
-        img = self.resize_norm_img(img, max_wh_ratio)
-        return {"img": img}
+        for w, h in img_size:
+            max_wh_ratio = max(max_wh_ratio, w * 1.0 / h)
+        return [{"img": self.resize_norm_img(im, max_wh_ratio)} for im in img]
 
 
 class LaTeXOCRReisizeNormImg(BaseComponent):
@@ -208,6 +210,7 @@ class BaseRecLabelDecode(BaseComponent):
         for i, char in enumerate(character_list):
             self.dict[char] = i
         self.character = character_list
+        self._character_arr = np.array(character_list, dtype=object)
 
     def pred_reverse(self, pred):
         """pred_reverse"""
@@ -232,32 +235,33 @@ class BaseRecLabelDecode(BaseComponent):
 
     def decode(self, text_index, text_prob=None, is_remove_duplicate=False):
         """convert text-index into text-label."""
+        # build the selection masks of the whole batch at once, and split the
+        # selected chars and probs into rows by the count of each row
+        text_index = np.asarray(text_index)
+        selection = np.ones(text_index.shape, dtype=bool)
+        if is_remove_duplicate:
+            selection[:, 1:] = text_index[:, 1:] != text_index[:, :-1]
+        for ignored_token in self.get_ignored_tokens():
+            selection &= text_index != ignored_token
+
+        char_arr = self._character_arr[text_index[selection]]
+        offsets = np.concatenate([[0], np.cumsum(selection.sum(axis=1))]).tolist()
+        if text_prob is not None:
+            conf_arr = np.asarray(text_prob)[selection]
+
         result_list = []
-        ignored_tokens = self.get_ignored_tokens()
-        batch_size = len(text_index)
-        for batch_idx in range(batch_size):
-            selection = np.ones(len(text_index[batch_idx]), dtype=bool)
-            if is_remove_duplicate:
-                selection[1:] = text_index[batch_idx][1:] != text_index[batch_idx][:-1]
-            for ignored_token in ignored_tokens:
-                selection &= text_index[batch_idx] != ignored_token
-
-            char_list = [
-                self.character[text_id] for text_id in text_index[batch_idx][selection]
-            ]
+        for batch_idx in range(len(text_index)):
+            start, end = offsets[batch_idx], offsets[batch_idx + 1]
+            text = "".join(char_arr[start:end])
             if text_prob is not None:
-                conf_list = text_prob[batch_idx][selection]
+                conf = np.mean(conf_arr[start:end]).tolist() if end > start else 0.0
             else:
-                conf_list = [1] * len(selection)
-            if len(conf_list) == 0:
-                conf_list = [0]
-
-            text = "".join(char_list)
+                conf = 1.0 if text_index.shape[1] > 0 else 0.0
 
             if self.reverse:  # for arabic rec
                 text = self.pred_reverse(text)
 
-            result_list.append((text, np.mean(conf_list).tolist()))
+            result_list.append((text, conf))
         return result_list
 
     def get_ignored_tokens(self):
@@ -283,7 +287,7 @@ class CTCLabelDecode(BaseRecLabelDecode):
 
     def apply(self, pred):
         """apply"""
-        preds = np.array(pred[0])
+        preds = np.stack([res[0] for res in pred])
         preds_idx = preds.argmax(axis=2)
         preds_prob = preds.max(axis=2)
         text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
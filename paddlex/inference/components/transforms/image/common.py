@@ -14,7 +14,6 @@
 
 import ast
 import math
-from pathlib import Path
 from copy import deepcopy
 
 import numpy as np
@@ -24,9 +23,10 @@ from .....utils.flags import (
     INFER_BENCHMARK,
     INFER_BENCHMARK_ITER,
     INFER_BENCHMARK_DATA_SIZE,
+    PDF_READER_NUM_WORKERS,
 )
-from .....utils.cache import CACHE_DIR, temp_file_manager
-from ....utils.io import ImageReader, ImageWriter, PDFReader
+from .....utils.cache import CACHE_DIR, in_memory_file_manager
+from ....utils.io import ImageReader, PDFReader
 from ...base import BaseComponent
 from ..read_data import _BaseRead
 from . import funcs as F
@@ -41,6 +41,7 @@ __all__ = [
     "Pad",
     "Normalize",
     "ToCHWImage",
+    "NormalizeToCHWImage",
     "PadStride",
 ]
 
@@ -90,8 +91,7 @@ class ReadImage(_BaseRead):
         self.format = format
         flags = self._FLAGS_DICT[self.format]
         self._img_reader = ImageReader(backend="opencv", flags=flags)
-        self._pdf_reader = PDFReader()
-        self._writer = ImageWriter(backend="opencv")
+        self._pdf_reader = PDFReader(num_workers=PDF_READER_NUM_WORKERS)
 
     def apply(self, img):
         """apply"""
@@ -111,18 +111,19 @@ class ReadImage(_BaseRead):
             return np.random.randint(0, 256, (*size, 3), dtype=np.uint8)
 
         def process_ndarray(img):
-            with temp_file_manager.temp_file_context(suffix=".png") as temp_file:
-                img_path = Path(temp_file.name)
-                self._writer.write(img_path, img)
-                if self.format == "RGB":
-                    img = img[:, :, ::-1]
-                return {
-                    "input_path": img_path,
-                    "img": img,
-                    "img_size": [img.shape[1], img.shape[0]],
-                    "ori_img": deepcopy(img),
-                    "ori_img_size": deepcopy([img.shape[1], img.shape[0]]),
-                }
+            # the array is passed through without being written to disk, and
+            # readers resolve `input_path` to it while it is alive
+            img_path = in_memory_file_manager.register(img, suffix=".png")
+            ori_img = img
+            if self.format == "RGB":
+                img = img[:, :, ::-1]
+            return {
+                "input_path": img_path,
+                "img": img,
+                "img_size": [img.shape[1], img.shape[0]],
+                "ori_img": deepcopy(ori_img),
+                "ori_img_size": deepcopy([img.shape[1], img.shape[0]]),
+            }
 
         if INFER_BENCHMARK and img is None:
             for _ in range(INFER_BENCHMARK_ITER):
@@ -137,11 +138,12 @@ class ReadImage(_BaseRead):
             file_list = self._get_files_list(file_path)
             batch = []
             for file_path in file_list:
-                img = self._read(file_path)
-                batch.extend(img)
-                if len(batch) >= self.batch_size:
-                    yield batch
-                    batch = []
+                # the pages of pdf are read lazily, and batched as they come
+                for data in self._read(file_path):
+                    batch.append(data)
+                    if len(batch) >= self.batch_size:
+                        yield batch
+                        batch = []
             if len(batch) > 0:
                 yield batch
         else:
@@ -163,6 +165,7 @@ class ReadImage(_BaseRead):
         if blob is None:
             raise Exception("Image read Error")
 
+        ori_img = blob
         if self.format == "RGB":
             if blob.ndim != 3:
                 raise RuntimeError("Array is not 3-dimensional.")
@@ -173,23 +176,20 @@ class ReadImage(_BaseRead):
                 "input_path": img_path,
                 "img": blob,
                 "img_size": [blob.shape[1], blob.shape[0]],
-                "ori_img": deepcopy(blob),
+                "ori_img": deepcopy(ori_img),
                 "ori_img_size": deepcopy([blob.shape[1], blob.shape[0]]),
             }
         ]
 
     def _read_pdf(self, pdf_path):
-        img_list = self._pdf_reader.read(pdf_path)
-        return [
-            {
+        for img in self._pdf_reader.read(pdf_path):
+            yield {
                 "input_path": pdf_path,
                 "img": img,
                 "img_size": [img.shape[1], img.shape[0]],
                 "ori_img": deepcopy(img),
                 "ori_img_size": deepcopy([img.shape[1], img.shape[0]]),
             }
-            for img in img_list
-        ]
 
 
 class GetImageInfo(BaseComponent):
@@ -596,3 +596,72 @@ class ToCHWImage(BaseComponent):
         """apply"""
         img = img.transpose((2, 0, 1))
         return {"img": img}
+
+
+class NormalizeToCHWImage(BaseComponent):
+    """
+    Normalize the images of a batch and reorder them from HWC to CHW in one
+    pass, writing them into a reusable batch tensor, which is used in place of
+    `Normalize` followed by `ToCHWImage`.
+    """
+
+    ENABLE_BATCH = True
+
+    INPUT_KEYS = "img"
+    OUTPUT_KEYS = "img"
+    DEAULT_INPUTS = {"img": "img"}
+    DEAULT_OUTPUTS = {"img": "img"}
+
+    def __init__(self, scale=1.0 / 255, mean=0.5, std=0.5, num_buffers=1):
+        """
+        Initialize the instance.
+
+        Args:
+            scale (float, optional): Scaling factor to apply to the image before
+                applying normalization. Default: 1/255.
+            mean (float|tuple|list, optional): Means for each channel of the image.
+                Default: 0.5.
+            std (float|tuple|list, optional): Standard deviations for each channel
+                of the image. Default: 0.5.
+            num_buffers (int, optional): Number of batch tensors to reuse in turn.
+                It must be larger than the number of batches in flight between
+                this component and the consumer of its output. Default: 1.
+        """
+        super().__init__()
+        if isinstance(mean, float):
+            mean = [mean]
+        mean = np.asarray(mean, dtype="float32").reshape(-1, 1, 1)
+        if isinstance(std, float):
+            std = [std]
+        std = np.asarray(std, dtype="float32").reshape(-1, 1, 1)
+        # (img * scale - mean) / std == img * alpha + beta
+        self.alpha = np.float32(scale) / std
+        self.beta = -mean / std
+        self.num_buffers = num_buffers
+        self._buffers = [None] * num_buffers
+        self._buffer_idx = 0
+
+    def apply(self, img):
+        """apply"""
+        if len({im.shape for im in img}) == 1:
+            h, w, c = img[0].shape
+            batch = self._get_buffer((len(img), c, h, w))
+        else:
+            batch = [np.empty(np.roll(im.shape, 1), dtype="float32") for im in img]
+        for im, out in zip(img, batch):
+            np.multiply(im.transpose((2, 0, 1)), self.alpha, out=out)
+            out += self.beta
+        return [{"img": out} for out in batch]
+
+    def _get_buffer(self, shape):
+        idx = self._buffer_idx
+        self._buffer_idx = (idx + 1) % self.num_buffers
+        buffer = self._buffers[idx]
+        if (
+            buffer is None
+            or buffer.shape[1:] != shape[1:]
+            or buffer.shape[0] < shape[0]
+        ):
+            buffer = np.empty(shape, dtype="float32")
+            self._buffers[idx] = buffer
+        return buffer[: shape[0]]
@@ -16,7 +16,7 @@ import os
 from pathlib import Path
 
 from ....utils.download import download
-from ....utils.cache import CACHE_DIR
+from ....utils.cache import temp_file_manager
 from ..base import BaseComponent
 
 
@@ -40,13 +40,27 @@ class _BaseRead(BaseComponent):
             raise ValueError("Batch size must be positive.")
         self._batch_size = value
 
+    def __call__(self, input_list):
+        # gather the data read from multiple inputs (e.g. a list of
+        # `np.ndarray`) into full batches
+        batch = []
+        for data in super().__call__(input_list):
+            batch.extend(data)
+            while len(batch) >= self.batch_size:
+                yield batch[: self.batch_size]
+                batch = batch[self.batch_size :]
+        if len(batch) > 0:
+            yield batch
+
     # XXX: auto download for url
     def _download_from_url(self, in_path):
         if in_path.startswith("http"):
-            file_name = Path(in_path).name
-            save_path = Path(CACHE_DIR) / "predict_input" / file_name
+            # the downloaded file is deleted once the data and results read from
+            # it, which refer to the returned path, are all dropped
+            save_path = temp_file_manager.create_temp_path(Path(in_path).name)
             download(in_path, save_path, overwrite=True)
-            return save_path.as_posix()
+            temp_file_manager.update_size(save_path)
+            return save_path
         return in_path
 
     def _get_files_list(self, fp):
@@ -18,11 +18,9 @@ import joblib
 import numpy as np
 import pandas as pd
 
-from .....utils.cache import CACHE_DIR, temp_file_manager
+from .....utils.cache import CACHE_DIR, in_memory_file_manager
 from .....utils.download import download
-from .....utils.cache import CACHE_DIR
 from ....utils.io.readers import CSVReader
-from ....utils.io.writers import CSVWriter
 from ...base import BaseComponent
 from ..read_data import _BaseRead
 from .funcs import load_from_dataframe, time_feature
@@ -55,15 +53,11 @@ class ReadTS(_BaseRead):
     def __init__(self, batch_size=1):
         super().__init__(batch_size)
         self._reader = CSVReader(backend="pandas")
-        self._writer = CSVWriter(backend="pandas")
 
     def apply(self, ts):
         if isinstance(ts, pd.DataFrame):
-            with temp_file_manager.temp_file_context(suffix=".csv") as temp_file:
-                input_path = Path(temp_file.name)
-                ts_path = input_path.as_posix()
-                self._writer.write(ts_path, ts)
-                yield {"input_path": input_path, "ts": ts, "ori_ts": deepcopy(ts)}
+            input_path = in_memory_file_manager.register(ts, suffix=".csv")
+            yield {"input_path": input_path, "ts": ts, "ori_ts": deepcopy(ts)}
         elif isinstance(ts, str):
             ts_path = ts
             ts_path = self._download_from_url(ts_path)
@@ -45,6 +45,9 @@ class BasePredictor(BaseComponent):
 
     def __call__(self, input, **kwargs):
         self.set_predictor(**kwargs)
+        # pass the list of inputs as a whole, so that they can be batched together
+        if isinstance(input, list):
+            input = [input]
         for res in super().__call__(input):
             yield res["result"]
 
@@ -19,9 +19,17 @@ from ....utils.subclass_register import AutoRegisterABCMetaClass
 from ....utils.flags import (
     INFER_BENCHMARK,
     INFER_BENCHMARK_WARMUP,
+    INFER_PIPELINED,
+    INFER_PIPELINED_QUEUE_SIZE,
 )
 from ....utils import logging
-from ...components.base import BaseComponent, ComponentsEngine
+from ...components.base import (
+    BaseComponent,
+    ComponentsEngine,
+    PipelinedComponentsEngine,
+)
+from ...components.paddle_predictor import BasePaddlePredictor
+from ...components.transforms import Normalize, ToCHWImage, NormalizeToCHWImage
 from ...utils.pp_option import PaddlePredictorOption
 from ...utils.process_hook import generatorable_method
 from ...utils.benchmark import Benchmark
@@ -45,7 +53,13 @@ class BasicPredictor(
 
         self.components = {}
         self._build_components()
-        self.engine = ComponentsEngine(self.components)
+        self._fuse_components()
+        if INFER_PIPELINED:
+            self.engine = PipelinedComponentsEngine(
+                self.components, queue_size=INFER_PIPELINED_QUEUE_SIZE
+            )
+        else:
+            self.engine = ComponentsEngine(self.components)
         logging.debug(f"{self.__class__.__name__}: {self.model_dir}")
 
         if INFER_BENCHMARK:
@@ -67,6 +81,9 @@ class BasicPredictor(
                             f"There are only {warmup_num} batches in input data, but `INFER_BENCHMARK_WARMUP` has been set to {INFER_BENCHMARK_WARMUP}."
                         )
                         break
+                # stop the warmup run before the timed one, which would otherwise run
+                # the same components concurrently in pipelined mode
+                output.close()
                 self.benchmark.warmup_stop(warmup_num)
             output = list(super().__call__(input))
             self.benchmark.collect(len(output))
@@ -99,6 +116,38 @@ class BasicPredictor(
             ), f"The key ({key}) has been used: {self.components}!"
             self.components[key] = cmp
 
+    def _fuse_components(self):
+        # replace `Normalize` and `ToCHWImage` that feed the paddle predictor with
+        # `NormalizeToCHWImage`, which writes the batch tensor of the predictor
+        names = list(self.components.keys())
+        for idx in range(len(names) - 2):
+            norm, to_chw, predictor = [self.components[n] for n in names[idx : idx + 3]]
+            if (
+                isinstance(norm, Normalize)
+                and not norm.preserve_dtype
+                and isinstance(to_chw, ToCHWImage)
+                and isinstance(predictor, BasePaddlePredictor)
+                and norm.inputs == norm.outputs == {"img": "img"}
+                and to_chw.inputs == to_chw.outputs == {"img": "img"}
+            ):
+                break
+        else:
+            return
+
+        # the batch tensors in flight, e.g. in the queues of pipelined engine,
+        # must not be overwritten
+        num_buffers = INFER_PIPELINED_QUEUE_SIZE + 2 if INFER_PIPELINED else 1
+        fused = NormalizeToCHWImage(
+            scale=norm.scale, mean=norm.mean, std=norm.std, num_buffers=num_buffers
+        )
+        components = {}
+        for name in names:
+            if name == names[idx]:
+                components[fused.name] = fused
+            elif name != names[idx + 1]:
+                components[name] = self.components[name]
+        self.components = components
+
     def set_predictor(self, batch_size=None, device=None, pp_option=None):
         if batch_size:
             self.components["ReadCmp"].batch_size = batch_size
@@ -62,5 +62,5 @@ class InstanceSegPredictor(DetPredictor):
         self._add_component([predictor, postprecss])
 
     def _pack_res(self, single):
-        keys = ["input_path", "boxes", "masks"]
+        keys = ["input_path", "ori_img", "boxes", "masks"]
         return InstanceSegResult({key: single[key] for key in keys})
@@ -125,5 +125,5 @@ class DetPredictor(BasicPredictor):
         return WarpAffine(input_h=input_h, input_w=input_w, keep_res=keep_res)
 
     def _pack_res(self, single):
-        keys = ["input_path", "boxes"]
+        keys = ["input_path", "ori_img", "boxes"]
         return DetResult({key: single[key] for key in keys})
@@ -101,5 +101,5 @@ class TextDetPredictor(BasicPredictor):
         return None
 
     def _pack_res(self, single):
-        keys = ["input_path", "dt_polys", "dt_scores"]
+        keys = ["input_path", "ori_img", "dt_polys", "dt_scores"]
         return TextDetResult({key: single[key] for key in keys})
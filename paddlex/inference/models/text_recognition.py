@@ -28,6 +28,9 @@ class TextRecPredictor(BasicPredictor):
     _FUNC_MAP = {}
     register = FuncRegister(_FUNC_MAP)
 
+    # the number of batches whose images are sorted by aspect ratio together
+    SORT_WINDOW_BATCHES = 32
+
     def _build_components(self):
         for cfg in self.config["PreProcess"]["transform_ops"]:
             tf_key = list(cfg.keys())[0]
@@ -48,6 +51,40 @@ class TextRecPredictor(BasicPredictor):
         op = self.build_postprocess(**self.config["PostProcess"])
         self._add_component(op)
 
+    def apply(self, input):
+        """predict"""
+        if not isinstance(input, list) or len(input) <= 1:
+            yield from super().apply(input)
+            return
+
+        # sort the images by aspect ratio, so that each batch holds images of
+        # similar width and is only padded to its own widest image
+        wh_ratios = [self._get_wh_ratio(item) for item in input]
+        if None in wh_ratios:
+            yield from super().apply(input)
+            return
+
+        # sort within windows of batches, so that the results of a large input
+        # still come window by window
+        batch_size = self.components["ReadCmp"].batch_size
+        window_size = batch_size * self.SORT_WINDOW_BATCHES
+        for start in range(0, len(input), window_size):
+            window = input[start : start + window_size]
+            indices = np.argsort(wh_ratios[start : start + window_size], kind="stable")
+            output = [None] * len(window)
+            ori_indices = iter(indices)
+            for batch_res in super().apply([window[idx] for idx in indices]):
+                for res in batch_res:
+                    output[next(ori_indices)] = res
+            for idx in range(0, len(output), batch_size):
+                yield output[idx : idx + batch_size]
+
+    def _get_wh_ratio(self, item):
+        img = item.get("img") if isinstance(item, dict) else item
+        if not isinstance(img, np.ndarray) or img.ndim < 2 or img.shape[0] == 0:
+            return None
+        return img.shape[1] / img.shape[0]
+
     @register("DecodeImage")
     def build_readimg(self, channel_first, img_mode):
         assert channel_first == False
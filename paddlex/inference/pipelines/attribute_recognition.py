@@ -15,7 +15,6 @@
 from pathlib import Path
 import numpy as np
 
-from ..utils.io import ImageReader
 from ..components import CropByBoxes
 from ..results import AttributeRecResult
 from .base import BasePipeline
@@ -41,7 +40,6 @@ class AttributeRecPipeline(BasePipeline):
         self.det_model = self._create(model=det_model)
         self.cls_model = self._create(model=cls_model)
         self._crop_by_boxes = CropByBoxes()
-        self._img_reader = ImageReader(backend="opencv")
 
     def set_predictor(self, det_batch_size=None, cls_batch_size=None, device=None):
         if det_batch_size:
@@ -69,7 +67,11 @@ class AttributeRecPipeline(BasePipeline):
         return output
 
     def get_final_result(self, det_res, cls_res):
-        single_img_res = {"input_path": det_res["input_path"], "boxes": []}
+        single_img_res = {
+            "input_path": det_res["input_path"],
+            "ori_img": det_res["ori_img"],
+            "boxes": [],
+        }
         for i, obj in enumerate(det_res["boxes"]):
             cls_scores = cls_res["score"][i]
             labels = cls_res["label"][i]
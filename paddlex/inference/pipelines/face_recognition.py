@@ -20,21 +20,22 @@ class FaceRecPipeline(ShiTuV2Pipeline):
 
     entities = "face_recognition"
 
+    def _get_crops(self, det_res):
+        if len(det_res["boxes"]) == 0:
+            return []
+        return [img["img"] for img in self._crop_by_boxes(det_res)]
+
     def get_rec_result(self, det_res, indexer):
         if len(det_res["boxes"]) == 0:
             return {"label": [], "score": []}
-        subs_of_img = list(self._crop_by_boxes(det_res))
-        img_list = [img["img"] for img in subs_of_img]
-        all_rec_res = list(self.rec_model(img_list))
-        all_rec_res = next(indexer(all_rec_res))
-        output = {"label": [], "score": []}
-        for res in all_rec_res:
-            output["label"].append(res["label"])
-            output["score"].append(res["score"])
-        return output
+        return super().get_rec_result(det_res, indexer)
 
     def get_final_result(self, det_res, rec_res):
-        single_img_res = {"input_path": det_res["input_path"], "boxes": []}
+        single_img_res = {
+            "input_path": det_res["input_path"],
+            "ori_img": det_res["ori_img"],
+            "boxes": [],
+        }
         for i, obj in enumerate(det_res["boxes"]):
             rec_scores = rec_res["score"][i]
             labels = rec_res["label"][i]
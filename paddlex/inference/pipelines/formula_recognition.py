@@ -16,6 +16,7 @@ import numpy as np
 from ..components import CropByBoxes, ReadImage
 from ..results import FormulaResult, FormulaVisualResult
 from .base import BasePipeline
+from .ppchatocrv3.utils import stream_layout_results
 from ...utils import logging
 
 
@@ -59,9 +60,10 @@ class FormulaRecognitionPipeline(BasePipeline):
 
     def predict(self, inputs, **kwargs):
         self.set_predictor(**kwargs)
-        img_info_list = list(self.img_reader(inputs))[0]
-        img_list = [img_info["img"] for img_info in img_info_list]
-        for page_id, layout_pred in enumerate(self.layout_predictor(img_list)):
+        page_stream = stream_layout_results(
+            inputs, self.img_reader, self.layout_predictor
+        )
+        for page_id, (_, layout_pred, _, _) in enumerate(page_stream):
             single_img_res = {
                 "input_path": "",
                 "layout_result": {},
@@ -70,6 +72,7 @@ class FormulaRecognitionPipeline(BasePipeline):
             }
             # update layout result
             single_img_res["input_path"] = layout_pred["input_path"]
+            single_img_res["ori_img"] = layout_pred["ori_img"]
             single_img_res["layout_result"] = layout_pred
             single_img_res["dt_polys"] = []
             single_img_res["rec_formula"] = []
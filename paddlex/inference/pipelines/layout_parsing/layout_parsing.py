@@ -46,6 +46,7 @@ class LayoutParsingPipeline(_TableRecPipeline):
         seal_text_det_batch_size=1,
         formula_rec_batch_size=1,
         recovery=True,
+        max_inflight_pages=2,
         device=None,
         predictor_kwargs=None,
     ):
@@ -74,6 +75,7 @@ class LayoutParsingPipeline(_TableRecPipeline):
             formula_rec_batch_size=formula_rec_batch_size,
         )
         self.recovery = recovery
+        self.max_inflight_pages = max_inflight_pages
 
     def _build_predictor(
         self,
@@ -130,6 +132,7 @@ class LayoutParsingPipeline(_TableRecPipeline):
             )
         if layout_batch_size:
             self.layout_predictor.set_predictor(batch_size=layout_batch_size)
+            self.img_reader.batch_size = layout_batch_size
         if text_rec_batch_size:
             self.ocr_pipeline.text_rec_model.set_predictor(
                 batch_size=text_rec_batch_size
@@ -167,17 +170,21 @@ class LayoutParsingPipeline(_TableRecPipeline):
         **kwargs,
     ):
         self.set_predictor(**kwargs)
-        # get oricls and uvdoc results
-        img_info_list = list(self.img_reader(inputs))[0]
-        oricls_results = []
-        if self.oricls_predictor and use_doc_image_ori_cls_model:
-            oricls_results = get_oriclas_results(img_info_list, self.oricls_predictor)
-        unwarp_result = []
-        if self.uvdoc_predictor and use_doc_image_unwarp_model:
-            unwarp_result = get_unwarp_results(img_info_list, self.uvdoc_predictor)
-        img_list = [img_info["img"] for img_info in img_info_list]
-        for idx, (img_info, layout_pred) in enumerate(
-            zip(img_info_list, self.layout_predictor(img_list))
+        # read pages, get oricls, uvdoc and layout results in the background
+        page_stream = stream_layout_results(
+            inputs,
+            self.img_reader,
+            self.layout_predictor,
+            oricls_predictor=(
+                self.oricls_predictor if use_doc_image_ori_cls_model else None
+            ),
+            unwarp_predictor=(
+                self.uvdoc_predictor if use_doc_image_unwarp_model else None
+            ),
+            max_inflight_pages=self.max_inflight_pages,
+        )
+        for idx, (img_info, layout_pred, oricls_result, unwarp_result) in enumerate(
+            page_stream
         ):
             page_id = idx
             single_img_res = {
@@ -193,10 +200,10 @@ class LayoutParsingPipeline(_TableRecPipeline):
                 "curve_result": [],
             }
             # update oricls and uvdoc result
-            if oricls_results:
-                single_img_res["oricls_result"] = oricls_results[idx]
-            if unwarp_result:
-                single_img_res["unwarp_result"] = unwarp_result[idx]
+            if oricls_result is not None:
+                single_img_res["oricls_result"] = oricls_result
+            if unwarp_result is not None:
+                single_img_res["unwarp_result"] = unwarp_result
             # update layout result
             single_img_res["input_path"] = layout_pred["input_path"]
             single_img_res["layout_result"] = layout_pred
@@ -206,13 +213,17 @@ class LayoutParsingPipeline(_TableRecPipeline):
             formula_subs = []
             structure_res = []
             ocr_res_with_layout = []
+            # with recovery, the page is recognized once, and the text boxes are
+            # assigned to the text blocks they are in, instead of recognizing
+            # every text block on a page-sized canvas
+            use_page_ocr = self.recovery and recovery
+            text_blocks = []
             if len(layout_pred["boxes"]) > 0:
                 subs_of_img = list(self._crop_by_boxes(layout_pred))
                 # get cropped images
                 for sub in subs_of_img:
                     box = sub["box"]
                     xmin, ymin, xmax, ymax = [int(i) for i in box]
-                    mask_flag = True
                     if sub["label"].lower() == "table":
                         table_subs.append(sub)
                     elif sub["label"].lower() == "seal":
@@ -220,54 +231,69 @@ class LayoutParsingPipeline(_TableRecPipeline):
                     elif sub["label"].lower() == "formula":
                         formula_subs.append(sub)
                     else:
-                        if self.recovery and recovery:
-                            # TODO: Why use the entire image?
-                            wht_im = (
-                                np.ones(single_img.shape, dtype=single_img.dtype) * 255
-                            )
-                            wht_im[ymin:ymax, xmin:xmax, :] = sub["img"]
-                            sub_ocr_res = get_ocr_res(self.ocr_pipeline, wht_im)
-                        else:
+                        sub_ocr_res = None
+                        if not use_page_ocr:
                             sub_ocr_res = get_ocr_res(self.ocr_pipeline, sub)
                             sub_ocr_res["dt_polys"] = get_ori_coordinate_for_table(
                                 xmin, ymin, sub_ocr_res["dt_polys"]
                             )
-                        layout_label = sub["label"].lower()
-                        # Adapt the user label definition to specify behavior.
-                        if sub_ocr_res and sub["label"].lower() in [
-                            "image",
-                            "figure",
-                            "img",
-                            "fig",
-                        ]:
-                            get_text_in_image = kwargs.get("get_text_in_image", False)
-                            mask_flag = not get_text_in_image
-                            text_in_image = ""
-                            if get_text_in_image:
-                                text_in_image = "".join(sub_ocr_res["rec_text"])
-                                ocr_res_with_layout.append(sub_ocr_res)
-                            structure_res.append(
-                                {
-                                    "input_path": sub_ocr_res["input_path"],
-                                    "layout_bbox": box,
-                                    f"{layout_label}": {
-                                        "img": sub["img"],
-                                        f"{layout_label}_text": text_in_image,
-                                    },
-                                }
-                            )
-                        else:
-                            ocr_res_with_layout.append(sub_ocr_res)
-                            structure_res.append(
-                                {
-                                    "input_path": sub_ocr_res["input_path"],
-                                    "layout_bbox": box,
-                                    f"{layout_label}": "\n".join(
-                                        sub_ocr_res["rec_text"]
-                                    ),
-                                }
-                            )
-                    if mask_flag:
+                        text_blocks.append([sub, sub_ocr_res])
+                        continue
+                    single_img[ymin:ymax, xmin:xmax, :] = 255
+
+            use_ocr_without_layout = kwargs.get("use_ocr_without_layout", True)
+            page_ocr_res = None
+            if use_page_ocr and (text_blocks or use_ocr_without_layout):
+                page_ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
+                page_ocr_res["input_path"] = layout_pred["input_path"]
+                text_ids = SpatialIndex(page_ocr_res["dt_polys"]).query_inside(
+                    [sub["box"] for sub, _ in text_blocks]
+                )
+                for text_block, ids in zip(text_blocks, text_ids):
+                    text_block[1] = select_ocr_res(page_ocr_res, ids)
+                masked_text = np.zeros(len(page_ocr_res["dt_polys"]), dtype=bool)
+
+            for block_idx, (sub, sub_ocr_res) in enumerate(text_blocks):
+                box = sub["box"]
+                xmin, ymin, xmax, ymax = [int(i) for i in box]
+                mask_flag = True
+                layout_label = sub["label"].lower()
+                # Adapt the user label definition to specify behavior.
+                if sub_ocr_res and sub["label"].lower() in [
+                    "image",
+                    "figure",
+                    "img",
+                    "fig",
+                ]:
+                    get_text_in_image = kwargs.get("get_text_in_image", False)
+                    mask_flag = not get_text_in_image
+                    text_in_image = ""
+                    if get_text_in_image:
+                        text_in_image = "".join(sub_ocr_res["rec_text"])
+                        ocr_res_with_layout.append(sub_ocr_res)
+                    structure_res.append(
+                        {
+                            "input_path": sub_ocr_res["input_path"],
+                            "layout_bbox": box,
+                            f"{layout_label}": {
+                                "img": sub["img"],
+                                f"{layout_label}_text": text_in_image,
+                            },
+                        }
+                    )
+                else:
+                    ocr_res_with_layout.append(sub_ocr_res)
+                    structure_res.append(
+                        {
+                            "input_path": sub_ocr_res["input_path"],
+                            "layout_bbox": box,
+                            f"{layout_label}": "\n".join(sub_ocr_res["rec_text"]),
+                        }
+                    )
+                if mask_flag:
+                    if page_ocr_res is not None:
+                        masked_text[text_ids[block_idx]] = True
+                    else:
                         single_img[ymin:ymax, xmin:xmax, :] = 255
 
             curve_pipeline = self.ocr_pipeline
@@ -298,16 +324,23 @@ class LayoutParsingPipeline(_TableRecPipeline):
                     }
                 )
 
-            use_ocr_without_layout = kwargs.get("use_ocr_without_layout", True)
             ocr_res = {
                 "dt_polys": [],
                 "rec_text": [],
+                "rec_score": [],
                 "input_path": layout_pred["input_path"],
             }
 
             if use_ocr_without_layout:
-                ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
+                if page_ocr_res is not None:
+                    # the text boxes out of the masked blocks
+                    ocr_res = OCRResult(
+                        select_ocr_res(page_ocr_res, np.nonzero(~masked_text)[0])
+                    )
+                else:
+                    ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
                 ocr_res["input_path"] = layout_pred["input_path"]
+                ocr_res["ori_img"] = layout_pred["ori_img"]
                 for idx, single_dt_poly in enumerate(ocr_res["dt_polys"]):
                     structure_res.append(
                         {
@@ -12,12 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 from ..components import SortBoxes, CropByPolys
 from ..results import OCRResult
 from .base import BasePipeline
 from ...utils import logging
 
 
+# not to change `text_rec_batch_timeout`, as None turns the timeout off
+_UNSET = object()
+
+
 class OCRPipeline(BasePipeline):
     """OCR Pipeline"""
 
@@ -29,14 +35,20 @@ class OCRPipeline(BasePipeline):
         text_rec_model,
         text_det_batch_size=1,
         text_rec_batch_size=1,
+        text_rec_batch_window=1,
+        text_rec_batch_timeout=None,
         device=None,
         predictor_kwargs=None,
     ):
         super().__init__(device, predictor_kwargs)
         self._build_predictor(text_det_model, text_rec_model)
+        self.text_rec_batch_window = 1
+        self.text_rec_batch_timeout = None
         self.set_predictor(
             text_det_batch_size=text_det_batch_size,
             text_rec_batch_size=text_rec_batch_size,
+            text_rec_batch_window=text_rec_batch_window,
+            text_rec_batch_timeout=text_rec_batch_timeout,
         )
 
     def _build_predictor(self, text_det_model, text_rec_model):
@@ -52,7 +64,12 @@ class OCRPipeline(BasePipeline):
         )
 
     def set_predictor(
-        self, text_det_batch_size=None, text_rec_batch_size=None, device=None
+        self,
+        text_det_batch_size=None,
+        text_rec_batch_size=None,
+        text_rec_batch_window=None,
+        text_rec_batch_timeout=_UNSET,
+        device=None,
     ):
         if text_det_batch_size and text_det_batch_size > 1:
             logging.warning(
@@ -60,21 +77,66 @@ class OCRPipeline(BasePipeline):
             )
         if text_rec_batch_size:
             self.text_rec_model.set_predictor(batch_size=text_rec_batch_size)
+        if text_rec_batch_window:
+            self.text_rec_batch_window = text_rec_batch_window
+        if text_rec_batch_timeout is not _UNSET:
+            self.text_rec_batch_timeout = text_rec_batch_timeout
         if device:
             self.text_rec_model.set_predictor(device=device)
             self.text_det_model.set_predictor(device=device)
 
     def predict(self, input, **kwargs):
         self.set_predictor(**kwargs)
+        if self.text_rec_batch_window > 1:
+            yield from self._predict_by_window(input)
+            return
         for det_res in self.text_det_model(input):
-            single_img_res = (
-                det_res if self.is_curve else next(self._sort_boxes(det_res))
-            )
-            single_img_res["rec_text"] = []
-            single_img_res["rec_score"] = []
+            single_img_res = self._get_det_res(det_res)
             if len(single_img_res["dt_polys"]) > 0:
                 all_subs_of_img = list(self._crop_by_polys(single_img_res))
                 for rec_res in self.text_rec_model(all_subs_of_img):
                     single_img_res["rec_text"].append(rec_res["rec_text"])
                     single_img_res["rec_score"].append(rec_res["rec_score"])
             yield OCRResult(single_img_res)
+
+    def _get_det_res(self, det_res):
+        single_img_res = det_res if self.is_curve else next(self._sort_boxes(det_res))
+        single_img_res["rec_text"] = []
+        single_img_res["rec_score"] = []
+        return single_img_res
+
+    def _predict_by_window(self, input):
+        """collect the text crops of a window of images into full rec batches, and
+        scatter the rec results back to the images they come from. The window is
+        flushed when it holds `text_rec_batch_window` images, or when its oldest
+        image has waited longer than `text_rec_batch_timeout` seconds.
+        """
+        window = []
+        window_start = None
+        for det_res in self.text_det_model(input):
+            single_img_res = self._get_det_res(det_res)
+            if len(single_img_res["dt_polys"]) > 0:
+                all_subs_of_img = list(self._crop_by_polys(single_img_res))
+            else:
+                all_subs_of_img = []
+            if not window:
+                window_start = time.time()
+            window.append((single_img_res, all_subs_of_img))
+            if len(window) >= self.text_rec_batch_window or (
+                self.text_rec_batch_timeout is not None
+                and time.time() - window_start >= self.text_rec_batch_timeout
+            ):
+                yield from self._flush_window(window)
+                window = []
+        if window:
+            yield from self._flush_window(window)
+
+    def _flush_window(self, window):
+        all_subs = [sub for _, subs in window for sub in subs]
+        rec_results = iter(self.text_rec_model(all_subs)) if all_subs else iter([])
+        for single_img_res, subs in window:
+            for _ in range(len(subs)):
+                rec_res = next(rec_results)
+                single_img_res["rec_text"].append(rec_res["rec_text"])
+                single_img_res["rec_score"].append(rec_res["rec_score"])
+            yield OCRResult(single_img_res)
@@ -12,17 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import pickle
+from collections import deque
 from pathlib import Path
 import numpy as np
 
-from ..utils.io import ImageReader
 from ..components import CropByBoxes, FaissIndexer
 from ..components.retrieval.faiss import FaissBuilder
 from ..results import ShiTuResult
 from .base import BasePipeline
 
 
+# `rec_batch_timeout` left as is, since None means waiting for full batches
+_UNSET = object()
+
+
 class ShiTuV2Pipeline(BasePipeline):
     """ShiTuV2 Pipeline"""
 
@@ -34,7 +39,10 @@ class ShiTuV2Pipeline(BasePipeline):
         rec_model,
         det_batch_size=1,
         rec_batch_size=1,
+        batch_across_images=False,
+        rec_batch_timeout=None,
         index=None,
+        index_mmap=False,
         score_thres=None,
         hamming_radius=None,
         return_k=5,
@@ -43,12 +51,22 @@ class ShiTuV2Pipeline(BasePipeline):
     ):
         super().__init__(device, predictor_kwargs)
         self._build_predictor(det_model, rec_model)
-        self.set_predictor(det_batch_size, rec_batch_size, device)
+        self.rec_batch_size = 1
+        self.batch_across_images = False
+        self.rec_batch_timeout = None
+        self.set_predictor(
+            det_batch_size=det_batch_size,
+            rec_batch_size=rec_batch_size,
+            batch_across_images=batch_across_images,
+            rec_batch_timeout=rec_batch_timeout,
+            device=device,
+        )
         self._return_k, self._score_thres, self._hamming_radius = (
             return_k,
             score_thres,
             hamming_radius,
         )
+        self._index_mmap = index_mmap
         self._indexer = self._build_indexer(index=index) if index else None
 
     def _build_indexer(self, index):
@@ -57,19 +75,31 @@ class ShiTuV2Pipeline(BasePipeline):
             return_k=self._return_k,
             score_thres=self._score_thres,
             hamming_radius=self._hamming_radius,
+            mmap=self._index_mmap,
         )
 
     def _build_predictor(self, det_model, rec_model):
         self.det_model = self._create(model=det_model)
         self.rec_model = self._create(model=rec_model)
         self._crop_by_boxes = CropByBoxes()
-        self._img_reader = ImageReader(backend="opencv")
 
-    def set_predictor(self, det_batch_size=None, rec_batch_size=None, device=None):
+    def set_predictor(
+        self,
+        det_batch_size=None,
+        rec_batch_size=None,
+        batch_across_images=None,
+        rec_batch_timeout=_UNSET,
+        device=None,
+    ):
         if det_batch_size:
             self.det_model.set_predictor(batch_size=det_batch_size)
         if rec_batch_size:
             self.rec_model.set_predictor(batch_size=rec_batch_size)
+            self.rec_batch_size = rec_batch_size
+        if batch_across_images is not None:
+            self.batch_across_images = batch_across_images
+        if rec_batch_timeout is not _UNSET:
+            self.rec_batch_timeout = rec_batch_timeout
         if device:
             self.det_model.set_predictor(device=device)
             self.rec_model.set_predictor(device=device)
@@ -78,14 +108,58 @@ class ShiTuV2Pipeline(BasePipeline):
         indexer = self._build_indexer(index) if index is not None else self._indexer
         assert indexer
         self.set_predictor(**kwargs)
+        if self.batch_across_images:
+            yield from self._predict_across_images(input, indexer)
+            return
         for det_res in self.det_model(input):
             rec_res = self.get_rec_result(det_res, indexer)
             yield self.get_final_result(det_res, rec_res)
 
-    def get_rec_result(self, det_res, indexer):
+    def _predict_across_images(self, input, indexer):
+        """collect the crops of consecutive images into batches of `rec_batch_size`,
+        run the rec model and search the index once per batch, and scatter the
+        results back to the images they come from. The images are yielded in order,
+        as soon as all their crops are done. The crops pending are also batched when
+        the oldest image has waited longer than `rec_batch_timeout` seconds.
+        """
+        # (det_res, number of crops, rec_res) of the images not yielded yet
+        images = deque()
+        # (crop, rec_res of its image, time it is added) of the crops pending
+        crops = []
+        for det_res in self.det_model(input):
+            subs_of_img = self._get_crops(det_res)
+            rec_res = {"label": [], "score": []}
+            images.append((det_res, len(subs_of_img), rec_res))
+            now = time.time()
+            crops.extend((img, rec_res, now) for img in subs_of_img)
+            while len(crops) >= self.rec_batch_size:
+                self._rec_batch(crops[: self.rec_batch_size], indexer)
+                crops = crops[self.rec_batch_size :]
+            if (
+                crops
+                and self.rec_batch_timeout is not None
+                and now - crops[0][2] >= self.rec_batch_timeout
+            ):
+                self._rec_batch(crops, indexer)
+                crops = []
+            while images and len(images[0][2]["label"]) == images[0][1]:
+                det_res, _, rec_res = images.popleft()
+                yield self.get_final_result(det_res, rec_res)
+        if crops:
+            self._rec_batch(crops, indexer)
+        for det_res, _, rec_res in images:
+            yield self.get_final_result(det_res, rec_res)
+
+    def _rec_batch(self, crops, indexer):
+        all_rec_res = list(self.rec_model([crop[0] for crop in crops]))
+        all_rec_res = next(indexer(all_rec_res))
+        for (_, rec_res, _), res in zip(crops, all_rec_res):
+            rec_res["label"].append(res["label"])
+            rec_res["score"].append(res["score"])
+
+    def _get_crops(self, det_res):
         if len(det_res["boxes"]) == 0:
-            full_img = self._img_reader.read(det_res["input_path"])
-            w, h = full_img.shape[:2]
+            w, h = det_res["ori_img"].shape[:2]
             det_res["boxes"].append(
                 {
                     "cls_id": 0,
@@ -94,8 +168,10 @@ class ShiTuV2Pipeline(BasePipeline):
                     "coordinate": [0, 0, h, w],
                 }
             )
-        subs_of_img = list(self._crop_by_boxes(det_res))
-        img_list = [img["img"] for img in subs_of_img]
+        return [img["img"] for img in self._crop_by_boxes(det_res)]
+
+    def get_rec_result(self, det_res, indexer):
+        img_list = self._get_crops(det_res)
         all_rec_res = list(self.rec_model(img_list))
         all_rec_res = next(indexer(all_rec_res))
         output = {"label": [], "score": []}
@@ -105,7 +181,11 @@ class ShiTuV2Pipeline(BasePipeline):
         return output
 
     def get_final_result(self, det_res, rec_res):
-        single_img_res = {"input_path": det_res["input_path"], "boxes": []}
+        single_img_res = {
+            "input_path": det_res["input_path"],
+            "ori_img": det_res["ori_img"],
+            "boxes": [],
+        }
         for i, obj in enumerate(det_res["boxes"]):
             rec_scores = rec_res["score"][i]
             labels = rec_res["label"][i]
@@ -125,6 +205,9 @@ class ShiTuV2Pipeline(BasePipeline):
         gallery_label,
         metric_type="IP",
         index_type="HNSW32",
+        chunk_size=None,
+        checkpoint_dir=None,
+        train_size=None,
         **kwargs
     ):
         return FaissBuilder.build(
@@ -133,6 +216,9 @@ class ShiTuV2Pipeline(BasePipeline):
             self.rec_model.predict,
             metric_type=metric_type,
             index_type=index_type,
+            chunk_size=chunk_size,
+            checkpoint_dir=checkpoint_dir,
+            train_size=train_size,
         )
 
     def remove_index(self, remove_ids, index):
@@ -143,10 +229,14 @@ class ShiTuV2Pipeline(BasePipeline):
         gallery_imgs,
         gallery_label,
         index,
+        chunk_size=None,
+        checkpoint_dir=None,
     ):
         return FaissBuilder.append(
             gallery_imgs,
             gallery_label,
             self.rec_model.predict,
             index,
+            chunk_size=chunk_size,
+            checkpoint_dir=checkpoint_dir,
         )
@@ -57,6 +57,7 @@ class PPChatOCRPipeline(_TableRecPipeline):
         doc_image_unwarp_batch_size=1,
         seal_text_det_batch_size=1,
         recovery=True,
+        max_inflight_pages=2,
         device=None,
         predictor_kwargs=None,
         _build_models=True,
@@ -97,6 +98,7 @@ class PPChatOCRPipeline(_TableRecPipeline):
             self.user_prompt_dict = None
 
         self.recovery = recovery
+        self.max_inflight_pages = max_inflight_pages
         self.visual_info = None
         self.vector = None
         self.visual_flag = False
@@ -157,6 +159,7 @@ class PPChatOCRPipeline(_TableRecPipeline):
             )
         if layout_batch_size:
             self.layout_predictor.set_predictor(batch_size=layout_batch_size)
+            self.img_reader.batch_size = layout_batch_size
         if text_rec_batch_size:
             self.ocr_pipeline.text_rec_model.set_predictor(
                 batch_size=text_rec_batch_size
@@ -235,29 +238,28 @@ class PPChatOCRPipeline(_TableRecPipeline):
         use_seal_text_det_model=True,
         recovery=True,
     ):
-        # get oricls and unwarp results
-        if isinstance(inputs, str):
-            img_info_list = list(self.img_reader(inputs))[0]
-        elif isinstance(inputs, list):
+        if isinstance(inputs, list):
             assert not any(
                 isinstance(s, str) and s.endswith(".pdf") for s in inputs
             ), "List containing pdf is not supported; only a list of images or a single PDF is supported."
-            img_info_list = [x[0] for x in list(self.img_reader(inputs))]
 
-        oricls_results = []
-        if self.doc_image_ori_cls_predictor and use_doc_image_ori_cls_model:
-            oricls_results = get_oriclas_results(
-                img_info_list, self.doc_image_ori_cls_predictor
-            )
-        unwarp_results = []
-        if self.doc_image_unwarp_predictor and use_doc_image_unwarp_model:
-            unwarp_results = get_unwarp_results(
-                img_info_list, self.doc_image_unwarp_predictor
-            )
-        img_list = [img_info["img"] for img_info in img_info_list]
-
-        for idx, (img_info, layout_pred) in enumerate(
-            zip(img_info_list, self.layout_predictor(img_list))
+        # read pages, get oricls, unwarp and layout results in the background
+        page_stream = stream_layout_results(
+            inputs,
+            self.img_reader,
+            self.layout_predictor,
+            oricls_predictor=(
+                self.doc_image_ori_cls_predictor
+                if use_doc_image_ori_cls_model
+                else None
+            ),
+            unwarp_predictor=(
+                self.doc_image_unwarp_predictor if use_doc_image_unwarp_model else None
+            ),
+            max_inflight_pages=self.max_inflight_pages,
+        )
+        for idx, (img_info, layout_pred, oricls_result, unwarp_result) in enumerate(
+            page_stream
         ):
             page_id = idx
             single_img_res = {
@@ -272,10 +274,10 @@ class PPChatOCRPipeline(_TableRecPipeline):
                 "curve_result": [],
             }
             # update oricls and unwarp results
-            if oricls_results:
-                single_img_res["oricls_result"] = oricls_results[idx]
-            if unwarp_results:
-                single_img_res["unwarp_result"] = unwarp_results[idx]
+            if oricls_result is not None:
+                single_img_res["oricls_result"] = oricls_result
+            if unwarp_result is not None:
+                single_img_res["unwarp_result"] = unwarp_result
             # update layout result
             single_img_res["input_path"] = layout_pred["input_path"]
             single_img_res["layout_result"] = layout_pred
@@ -284,49 +286,67 @@ class PPChatOCRPipeline(_TableRecPipeline):
             curve_subs = []
             structure_res = []
             ocr_res_with_layout = []
+            # with recovery, the page is recognized once, and the text boxes are
+            # assigned to the text blocks they are in, instead of recognizing
+            # every text block on a page-sized canvas
+            use_page_ocr = self.recovery and recovery
+            text_blocks = []
             if len(layout_pred["boxes"]) > 0:
                 subs_of_img = list(self._crop_by_boxes(layout_pred))
                 # get cropped images
                 for sub in subs_of_img:
                     box = sub["box"]
                     xmin, ymin, xmax, ymax = [int(i) for i in box]
-                    mask_flag = True
                     if sub["label"].lower() == "table":
                         table_subs.append(sub)
                     elif sub["label"].lower() == "seal":
                         curve_subs.append(sub)
                     else:
-                        if self.recovery and recovery:
-                            # TODO: Why use the entire image?
-                            wht_im = (
-                                np.ones(single_img.shape, dtype=single_img.dtype) * 255
-                            )
-                            wht_im[ymin:ymax, xmin:xmax, :] = sub["img"]
-                            sub_ocr_res = get_ocr_res(self.ocr_pipeline, wht_im)
-                        else:
+                        sub_ocr_res = None
+                        if not use_page_ocr:
                             sub_ocr_res = get_ocr_res(self.ocr_pipeline, sub)
                             sub_ocr_res["dt_polys"] = get_ori_coordinate_for_table(
                                 xmin, ymin, sub_ocr_res["dt_polys"]
                             )
-                        layout_label = sub["label"].lower()
-                        if sub_ocr_res and sub["label"].lower() in [
-                            "image",
-                            "figure",
-                            "img",
-                            "fig",
-                        ]:
-                            mask_flag = False
-                        else:
-                            ocr_res_with_layout.append(sub_ocr_res)
-                            structure_res.append(
-                                {
-                                    "layout_bbox": box,
-                                    f"{layout_label}": "\n".join(
-                                        sub_ocr_res["rec_text"]
-                                    ),
-                                }
-                            )
-                    if mask_flag:
+                        text_blocks.append([sub, sub_ocr_res])
+                        continue
+                    single_img[ymin:ymax, xmin:xmax, :] = 255
+
+            page_ocr_res = None
+            if use_page_ocr:
+                page_ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
+                page_ocr_res["input_path"] = layout_pred["input_path"]
+                text_ids = SpatialIndex(page_ocr_res["dt_polys"]).query_inside(
+                    [sub["box"] for sub, _ in text_blocks]
+                )
+                for text_block, ids in zip(text_blocks, text_ids):
+                    text_block[1] = select_ocr_res(page_ocr_res, ids)
+                masked_text = np.zeros(len(page_ocr_res["dt_polys"]), dtype=bool)
+
+            for block_idx, (sub, sub_ocr_res) in enumerate(text_blocks):
+                box = sub["box"]
+                xmin, ymin, xmax, ymax = [int(i) for i in box]
+                mask_flag = True
+                layout_label = sub["label"].lower()
+                if sub_ocr_res and sub["label"].lower() in [
+                    "image",
+                    "figure",
+                    "img",
+                    "fig",
+                ]:
+                    mask_flag = False
+                else:
+                    ocr_res_with_layout.append(sub_ocr_res)
+                    structure_res.append(
+                        {
+                            "layout_bbox": box,
+                            f"{layout_label}": "\n".join(sub_ocr_res["rec_text"]),
+                        }
+                    )
+                if mask_flag:
+                    if page_ocr_res is not None:
+                        masked_text[text_ids[block_idx]] = True
+                    else:
                         single_img[ymin:ymax, xmin:xmax, :] = 255
 
             curve_pipeline = self.ocr_pipeline
@@ -353,8 +373,15 @@ class PPChatOCRPipeline(_TableRecPipeline):
                     }
                 )
 
-            ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
+            if page_ocr_res is not None:
+                # the text boxes out of the masked blocks
+                ocr_res = OCRResult(
+                    select_ocr_res(page_ocr_res, np.nonzero(~masked_text)[0])
+                )
+            else:
+                ocr_res = get_ocr_res(self.ocr_pipeline, single_img)
             ocr_res["input_path"] = layout_pred["input_path"]
+            ocr_res["ori_img"] = layout_pred["ori_img"]
             all_table_res, _ = self.get_table_result(table_subs)
             for idx, single_dt_poly in enumerate(ocr_res["dt_polys"]):
                 structure_res.append(
@@ -538,20 +565,48 @@ class PPChatOCRPipeline(_TableRecPipeline):
                 html_list, key_list, rules, few_shot
             )
             prompt_res["html_prompt"] = prompt_list
-            for prompt, table_text in zip(prompt_list, table_text_list):
+            prompt_list = prompt_list[: len(table_text_list)]
+            for prompt in prompt_list:
                 logging.debug(prompt)
-                res = self.get_llm_result(llm_api, prompt)
-                # TODO: why use one html but the whole table_text in next step
-                if list(res.values())[0] in failed_results:
-                    logging.debug(
-                        "table html sequence is too much longer, using ocr directly!"
+            # the prompts of all tables are sent concurrently
+            table_results = self.get_llm_results(llm_api, prompt_list)
+            fallback_ids = [
+                idx
+                for idx, res in enumerate(table_results)
+                if not res or list(res.values())[0] in failed_results
+            ]
+            if fallback_ids:
+                logging.debug(
+                    "table html sequence is too much longer, using ocr directly!"
+                )
+                # ask for the keys not found in the html of any table
+                fallback_key_list = [
+                    key
+                    for key in key_list
+                    if all(
+                        res.get(key, "") in failed_results
+                        for idx, res in enumerate(table_results)
+                        if idx not in fallback_ids
                     )
-                    prompt = self.get_prompt_for_ocr(
-                        table_text, key_list, rules, few_shot, user_task_description
+                ]
+                # TODO: why use one html but the whole table_text in next step
+                fallback_prompt_list = [
+                    self.get_prompt_for_ocr(
+                        table_text_list[idx],
+                        fallback_key_list,
+                        rules,
+                        few_shot,
+                        user_task_description,
                     )
+                    for idx in fallback_ids
+                ]
+                for prompt in fallback_prompt_list:
                     logging.debug(prompt)
-                    prompt_res["table_prompt"].append(prompt)
-                    res = self.get_llm_result(llm_api, prompt)
+                prompt_res["table_prompt"].extend(fallback_prompt_list)
+                fallback_results = self.get_llm_results(llm_api, fallback_prompt_list)
+                for idx, res in zip(fallback_ids, fallback_results):
+                    table_results[idx] = res
+            for res in table_results:
                 for key, value in res.items():
                     if value not in failed_results and key in key_list:
                         key_list.remove(key)
@@ -596,7 +651,17 @@ class PPChatOCRPipeline(_TableRecPipeline):
 
     def get_llm_result(self, llm_api, prompt):
         """get llm result and decode to dict"""
-        llm_result = llm_api.pred(prompt)
+        return self.get_llm_results(llm_api, [prompt])[0]
+
+    def get_llm_results(self, llm_api, prompts):
+        """get llm results of prompts concurrently and decode them to dicts"""
+        return [
+            self.decode_llm_result(llm_result)
+            for llm_result in llm_api.batch_pred(prompts)
+        ]
+
+    def decode_llm_result(self, llm_result):
+        """decode llm result to dict"""
         # when the llm pred failed, return None
         if not llm_result:
             return {}
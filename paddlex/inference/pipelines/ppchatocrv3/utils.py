@@ -15,6 +15,8 @@
 import re
 from scipy.ndimage import rotate
 
+from ...components.base import PipelinedComponentsEngine
+
 
 def get_ocr_res(pipeline, input):
     """get ocr res"""
@@ -52,6 +54,59 @@ def get_unwarp_results(inputs, predictor):
     return results
 
 
+def stream_layout_results(
+    inputs,
+    img_reader,
+    layout_predictor,
+    oricls_predictor=None,
+    unwarp_predictor=None,
+    max_inflight_pages=2,
+):
+    """
+    Read the pages of inputs and get their layout results in background threads,
+    so that they overlap with the processing of the previous pages by the caller.
+    At most `max_inflight_pages` pages, but at least one batch of `img_reader`, wait
+    between two stages.
+
+    Yields:
+        tuple: (img_info, layout_pred, oricls_result, unwarp_result) of each page.
+    """
+
+    def _read(inputs):
+        yield from img_reader(inputs)
+
+    def _layout(batch):
+        oricls_results = [None] * len(batch)
+        if oricls_predictor:
+            oricls_results = get_oriclas_results(batch, oricls_predictor)
+        unwarp_results = [None] * len(batch)
+        if unwarp_predictor:
+            unwarp_results = get_unwarp_results(batch, unwarp_predictor)
+        img_list = [img_info["img"] for img_info in batch]
+        yield from zip(
+            batch, layout_predictor(img_list), oricls_results, unwarp_results
+        )
+
+    # the pages are read in batches, which the queues hold as a whole
+    batch_size = getattr(img_reader, "batch_size", 1)
+    engine = PipelinedComponentsEngine(
+        {"read": _read, "layout": _layout},
+        queue_size=max(1, max_inflight_pages // batch_size),
+    )
+    yield from engine(inputs)
+
+
+def select_ocr_res(ocr_res, indices):
+    """get the ocr result of the text boxes at indices"""
+    return {
+        "input_path": ocr_res["input_path"],
+        "dt_polys": [ocr_res["dt_polys"][i] for i in indices],
+        "dt_scores": [ocr_res["dt_scores"][i] for i in indices],
+        "rec_text": [ocr_res["rec_text"][i] for i in indices],
+        "rec_score": [ocr_res["rec_score"][i] for i in indices],
+    }
+
+
 def get_predictor_res(predictor, input):
     """get ocr res"""
     result_list = []
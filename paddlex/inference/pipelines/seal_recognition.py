@@ -17,6 +17,7 @@ from .base import BasePipeline
 from .ocr import OCRPipeline
 from ..components import CropByBoxes, ReadImage
 from ..results import SealOCRResult, OCRResult
+from .ppchatocrv3.utils import stream_layout_results
 from ...utils import logging
 
 
@@ -47,6 +48,7 @@ class SealOCRPipeline(BasePipeline):
         layout_batch_size=1,
         text_det_batch_size=1,
         text_rec_batch_size=1,
+        max_inflight_pages=2,
         device=None,
         predictor_kwargs=None,
     ):
@@ -64,7 +66,7 @@ class SealOCRPipeline(BasePipeline):
             text_det_batch_size=text_det_batch_size,
             text_rec_batch_size=text_rec_batch_size,
         )
-        self.img_reader = ReadImage(format="BGR")
+        self.max_inflight_pages = max_inflight_pages
 
     def _build_predictor(
         self,
@@ -82,6 +84,7 @@ class SealOCRPipeline(BasePipeline):
             text_rec_model=text_rec_model,
         )
         self._crop_by_boxes = CropByBoxes()
+        self.img_reader = ReadImage(format="BGR")
 
     def set_predictor(
         self,
@@ -96,6 +99,7 @@ class SealOCRPipeline(BasePipeline):
             )
         if layout_batch_size:
             self.layout_predictor.set_predictor(batch_size=layout_batch_size)
+            self.img_reader.batch_size = layout_batch_size
         if text_rec_batch_size:
             self.ocr_pipeline.text_rec_model.set_predictor(
                 batch_size=text_rec_batch_size
@@ -106,9 +110,14 @@ class SealOCRPipeline(BasePipeline):
 
     def predict(self, inputs, **kwargs):
         self.set_predictor(**kwargs)
-        img_info_list = list(self.img_reader(inputs))[0]
-        img_list = [img_info["img"] for img_info in img_info_list]
-        for page_id, layout_pred in enumerate(self.layout_predictor(img_list)):
+        # read pages and get layout results in the background
+        page_stream = stream_layout_results(
+            inputs,
+            self.img_reader,
+            self.layout_predictor,
+            max_inflight_pages=self.max_inflight_pages,
+        )
+        for page_id, (_, layout_pred, _, _) in enumerate(page_stream):
             single_img_res = {
                 "input_path": "",
                 "layout_result": {},
@@ -145,6 +154,7 @@ class SealOCRPipeline(BasePipeline):
                     seal_res["rec_text"].extend(seal_ocr_res["rec_text"])
                     seal_res["rec_score"].extend(seal_ocr_res["rec_score"])
             seal_res["input_path"] = single_img_res["input_path"]
+            seal_res["ori_img"] = layout_pred["ori_img"]
             single_img_res["src_file_name"] = inputs
             single_img_res["ocr_result"] = OCRResult(seal_res)
             single_img_res["page_id"] = page_id
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import FastAPI
 
@@ -82,10 +82,12 @@ from .ts_fc import create_pipeline_app as create_ts_fc_app
 # on a specific pipeline class, and a pipeline name must be provided (in the
 # pipeline config) to specify the type of the pipeline.
 def create_pipeline_app(
-    pipeline: BasePipeline, pipeline_config: Dict[str, Any]
+    pipeline: BasePipeline,
+    pipeline_config: Dict[str, Any],
+    pipeline_factory: Optional[Callable[[], BasePipeline]] = None,
 ) -> FastAPI:
     pipeline_name = pipeline_config["Global"]["pipeline_name"]
-    app_config = create_app_config(pipeline_config)
+    app_config = create_app_config(pipeline_config, pipeline_factory=pipeline_factory)
     if pipeline_name == "image_classification":
         if not isinstance(pipeline, ImageClassification):
             raise TypeError(
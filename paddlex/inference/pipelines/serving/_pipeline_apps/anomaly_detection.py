@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
@@ -27,17 +27,21 @@ from ..models import Response, ResultResponse
 
 class InferRequest(BaseModel):
     image: str
+    returnVisualization: Optional[bool] = None
 
 
 class InferResult(BaseModel):
     labelMap: List[int]
     size: Annotated[List[int], Field(min_length=2, max_length=2)]
-    image: str
+    image: Optional[str] = None
 
 
 def create_pipeline_app(pipeline: AnomalyDetection, app_config: AppConfig) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -60,9 +64,12 @@ def create_pipeline_app(pipeline: AnomalyDetection, app_config: AppConfig) -> Fa
             pred = result["pred"][0].tolist()
             size = [len(pred), len(pred[0])]
             label_map = [item for sublist in pred for item in sublist]
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img.convert("RGB"))
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img.convert("RGB"))
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
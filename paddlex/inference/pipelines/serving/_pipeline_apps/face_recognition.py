@@ -65,6 +65,7 @@ class RemoveImagesFromIndexResult(BaseModel):
 class InferRequest(BaseModel):
     image: str
     indexKey: Optional[str] = None
+    returnVisualization: Optional[bool] = None
 
 
 BoundingBox: TypeAlias = Annotated[List[float], Field(min_length=4, max_length=4)]
@@ -83,7 +84,7 @@ class Face(BaseModel):
 
 class InferResult(BaseModel):
     faces: List[Face]
-    image: str
+    image: Optional[str] = None
 
 
 def _serialize_index_data(index_data: IndexData) -> bytes:
@@ -153,7 +154,9 @@ def create_pipeline_app(pipeline: FaceRecPipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=BuildIndexResult(indexKey=index_key, idMap=index_data.id_map),
+                result=BuildIndexResult(
+                    indexKey=index_key, idMap=index_data.id_map.to_dict()
+                ),
             )
 
         except Exception as e:
@@ -203,7 +206,7 @@ def create_pipeline_app(pipeline: FaceRecPipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=AddImagesToIndexResult(idMap=index_data.id_map),
+                result=AddImagesToIndexResult(idMap=index_data.id_map.to_dict()),
             )
 
         except Exception as e:
@@ -244,7 +247,7 @@ def create_pipeline_app(pipeline: FaceRecPipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=RemoveImagesFromIndexResult(idMap=index_data.id_map),
+                result=RemoveImagesFromIndexResult(idMap=index_data.id_map.to_dict()),
             )
 
         except Exception as e:
@@ -299,9 +302,12 @@ def create_pipeline_app(pipeline: FaceRecPipeline, app_config: AppConfig) -> Fas
                         score=face["det_score"],
                     )
                 )
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
@@ -32,6 +32,7 @@ class InferenceParams(BaseModel):
 class InferRequest(BaseModel):
     image: str
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 Point: TypeAlias = Annotated[List[float], Field(min_length=2, max_length=2)]
@@ -45,7 +46,7 @@ class Formula(BaseModel):
 
 class InferResult(BaseModel):
     formulas: List[Formula]
-    layoutImage: str
+    layoutImage: Optional[str] = None
     ocrImage: Optional[str] = None
 
 
@@ -90,10 +91,14 @@ def create_pipeline_app(
                         latex=latex,
                     )
                 )
-            layout_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result["layout_result"].img)
-            )
-            ocr_image = result["formula_result"].img
+            if serving_utils.should_visualize(ctx, request):
+                layout_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result["layout_result"].img)
+                )
+                ocr_image = result["formula_result"].img
+            else:
+                layout_image_base64 = None
+                ocr_image = None
             if ocr_image is not None:
                 ocr_image_base64 = serving_utils.base64_encode(
                     serving_utils.image_to_bytes(ocr_image)
@@ -33,6 +33,7 @@ class InferenceParams(BaseModel):
 class InferRequest(BaseModel):
     image: str
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 class Category(BaseModel):
@@ -43,14 +44,17 @@ class Category(BaseModel):
 
 class InferResult(BaseModel):
     categories: List[Category]
-    image: str
+    image: Optional[str] = None
 
 
 def create_pipeline_app(
     pipeline: ImageClassification, app_config: AppConfig
 ) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -83,9 +87,12 @@ def create_pipeline_app(
                 zip(result["class_ids"], cat_names, result["scores"]), None, top_k
             ):
                 categories.append(Category(id=id_, name=name, score=score))
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
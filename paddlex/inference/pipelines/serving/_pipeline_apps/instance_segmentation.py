@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pycocotools.mask as mask_util
@@ -29,6 +29,7 @@ from ..models import Response, ResultResponse
 
 class InferRequest(BaseModel):
     image: str
+    returnVisualization: Optional[bool] = None
 
 
 BoundingBox: TypeAlias = Annotated[List[float], Field(min_length=4, max_length=4)]
@@ -48,7 +49,7 @@ class Instance(BaseModel):
 
 class InferResult(BaseModel):
     instances: List[Instance]
-    image: str
+    image: Optional[str] = None
 
 
 def _rle(mask: np.ndarray) -> str:
@@ -63,6 +64,7 @@ def create_pipeline_app(
         pipeline=pipeline,
         app_config=app_config,
         app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -94,9 +96,12 @@ def create_pipeline_app(
                         mask=mask,
                     )
                 )
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
@@ -26,6 +26,7 @@ from ..models import Response, ResultResponse
 
 class InferRequest(BaseModel):
     image: str
+    returnVisualization: Optional[bool] = None
 
 
 class Category(BaseModel):
@@ -36,14 +37,17 @@ class Category(BaseModel):
 
 class InferResult(BaseModel):
     categories: List[Category]
-    image: str
+    image: Optional[str] = None
 
 
 def create_pipeline_app(
     pipeline: ImageClassification, app_config: AppConfig
 ) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -72,9 +76,12 @@ def create_pipeline_app(
                 result["class_ids"], cat_names, result["scores"]
             ):
                 categories.append(Category(id=id_, name=name, score=score))
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
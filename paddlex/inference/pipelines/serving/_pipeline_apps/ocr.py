@@ -32,6 +32,7 @@ class InferenceParams(BaseModel):
 class InferRequest(BaseModel):
     image: str
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 Point: TypeAlias = Annotated[List[int], Field(min_length=2, max_length=2)]
@@ -46,12 +47,15 @@ class Text(BaseModel):
 
 class InferResult(BaseModel):
     texts: List[Text]
-    image: str
+    image: Optional[str] = None
 
 
 def create_pipeline_app(pipeline: OCRPipeline, app_config: AppConfig) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post("/ocr", operation_id="infer", responses={422: {"model": Response}})
@@ -80,9 +84,12 @@ def create_pipeline_app(pipeline: OCRPipeline, app_config: AppConfig) -> FastAPI
                 result["dt_polys"], result["rec_text"], result["rec_score"]
             ):
                 texts.append(Text(poly=poly, text=text, score=score))
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
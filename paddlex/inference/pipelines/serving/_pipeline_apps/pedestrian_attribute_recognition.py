@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
@@ -27,6 +27,7 @@ from ..models import Response, ResultResponse
 
 class InferRequest(BaseModel):
     image: str
+    returnVisualization: Optional[bool] = None
 
 
 BoundingBox: TypeAlias = Annotated[List[float], Field(min_length=4, max_length=4)]
@@ -45,14 +46,17 @@ class Pedestrian(BaseModel):
 
 class InferResult(BaseModel):
     pedestrians: List[Pedestrian]
-    image: str
+    image: Optional[str] = None
 
 
 def create_pipeline_app(
     pipeline: PedestrianAttributeRecPipeline, app_config: AppConfig
 ) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -84,9 +88,12 @@ def create_pipeline_app(
                         score=obj["det_score"],
                     )
                 )
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
@@ -65,6 +65,7 @@ class RemoveImagesFromIndexResult(BaseModel):
 class InferRequest(BaseModel):
     image: str
     indexKey: Optional[str] = None
+    returnVisualization: Optional[bool] = None
 
 
 BoundingBox: TypeAlias = Annotated[List[float], Field(min_length=4, max_length=4)]
@@ -83,7 +84,7 @@ class DetectedObject(BaseModel):
 
 class InferResult(BaseModel):
     detectedObjects: List[DetectedObject]
-    image: str
+    image: Optional[str] = None
 
 
 # XXX: I have to implement serialization and deserialization functions myself,
@@ -155,7 +156,9 @@ def create_pipeline_app(pipeline: ShiTuV2Pipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=BuildIndexResult(indexKey=index_key, idMap=index_data.id_map),
+                result=BuildIndexResult(
+                    indexKey=index_key, idMap=index_data.id_map.to_dict()
+                ),
             )
 
         except Exception as e:
@@ -205,7 +208,7 @@ def create_pipeline_app(pipeline: ShiTuV2Pipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=AddImagesToIndexResult(idMap=index_data.id_map),
+                result=AddImagesToIndexResult(idMap=index_data.id_map.to_dict()),
             )
 
         except Exception as e:
@@ -246,7 +249,7 @@ def create_pipeline_app(pipeline: ShiTuV2Pipeline, app_config: AppConfig) -> Fas
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=RemoveImagesFromIndexResult(idMap=index_data.id_map),
+                result=RemoveImagesFromIndexResult(idMap=index_data.id_map.to_dict()),
             )
 
         except Exception as e:
@@ -301,9 +304,12 @@ def create_pipeline_app(pipeline: ShiTuV2Pipeline, app_config: AppConfig) -> Fas
                         score=obj["det_score"],
                     )
                 )
-            output_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result.img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                output_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result.img)
+                )
+            else:
+                output_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
@@ -14,7 +14,7 @@
 
 import asyncio
 import os
-from typing import Awaitable, Final, List, Literal, Optional, Tuple, Union
+from typing import Any, Awaitable, Final, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 from fastapi import FastAPI, HTTPException
@@ -24,14 +24,21 @@ from typing_extensions import Annotated, TypeAlias, assert_never
 
 from .....utils import logging
 from .... import results
+from ....components.llm import ErnieBot
 from ...ppchatocrv3 import PPChatOCRPipeline
 from ..storage import SupportsGetURL, Storage, create_storage
+from ..vector_store import VectorStoreNotFoundError, VectorStoreRegistry
 from .. import utils as serving_utils
 from ..app import AppConfig, create_app
 from ..models import Response, ResultResponse
 
 _DEFAULT_MAX_IMG_SIZE: Final[Tuple[int, int]] = (2000, 2000)
 _DEFAULT_MAX_NUM_IMGS: Final[int] = 10
+# in MiB
+_DEFAULT_MAX_VECTOR_STORE_MEMORY: Final[int] = 512
+_DEFAULT_MAX_STORED_VECTOR_STORES: Final[int] = 10000
+# in seconds
+_DEFAULT_VECTOR_STORE_TTL: Final[int] = 7 * 24 * 3600
 
 
 FileType: TypeAlias = Literal[0, 1]
@@ -48,6 +55,7 @@ class AnalyzeImagesRequest(BaseModel):
     useImgUnwrapping: bool = True
     useSealTextDet: bool = True
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 Point: TypeAlias = Annotated[List[int], Field(min_length=2, max_length=2)]
@@ -70,8 +78,8 @@ class VisionResult(BaseModel):
     texts: List[Text]
     tables: List[Table]
     inputImage: str
-    ocrImage: str
-    layoutImage: str
+    ocrImage: Optional[str] = None
+    layoutImage: Optional[str] = None
 
 
 class AnalyzeImagesResult(BaseModel):
@@ -181,6 +189,42 @@ def _postprocess_image(
     return serving_utils.base64_encode(img_bytes)
 
 
+def _postprocess_result_image(
+    result: Any,
+    request_id: str,
+    filename: str,
+    file_storage: Optional[Storage],
+) -> str:
+    # The result image is rendered here, out of the event loop
+    return _postprocess_image(
+        result.img,
+        request_id=request_id,
+        filename=filename,
+        file_storage=file_storage,
+    )
+
+
+def _register_vector_store(registry: VectorStoreRegistry, vector: str) -> str:
+    # The text returned for short documents is passed as is
+    if not ErnieBot.is_vector_store(vector):
+        return vector
+    return registry.register_bytes(ErnieBot.decode_vector_store(vector))
+
+
+def _resolve_vector_store(registry: VectorStoreRegistry, vector: str) -> Any:
+    # Serialized stores from older servers are still accepted
+    if not registry.is_handle(vector):
+        return vector
+    return registry.get(vector)
+
+
+def _vector_store_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail="The vector store is not found or has expired. Please build it again.",
+    )
+
+
 def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> FastAPI:
     app, ctx = create_app(
         pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
@@ -192,6 +236,28 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
         ctx.extra["file_storage"] = None
     ctx.extra.setdefault("max_img_size", _DEFAULT_MAX_IMG_SIZE)
     ctx.extra.setdefault("max_num_imgs", _DEFAULT_MAX_NUM_IMGS)
+    # The vector stores are kept by the server, and the clients pass the handles.
+    # The least recently used ones beyond the memory limit are spilled to the
+    # storage, or dropped if no storage is configured. The ones beyond the count
+    # limit of the storage or unused for the TTL are deleted.
+    extra_config = ctx.config.extra or {}
+    if "vector_store_storage" in extra_config:
+        vector_store_storage = create_storage(extra_config["vector_store_storage"])
+    else:
+        vector_store_storage = None
+    max_vector_store_memory = extra_config.get(
+        "max_vector_store_memory", _DEFAULT_MAX_VECTOR_STORE_MEMORY
+    )
+    ctx.extra["vector_store_registry"] = VectorStoreRegistry(
+        ErnieBot.serialize_vector_store,
+        ErnieBot.deserialize_vector_store,
+        max_memory=int(max_vector_store_memory * 1024 * 1024),
+        storage=vector_store_storage,
+        max_stored=extra_config.get(
+            "max_stored_vector_stores", _DEFAULT_MAX_STORED_VECTOR_STORES
+        ),
+        ttl=extra_config.get("vector_store_ttl", _DEFAULT_VECTOR_STORE_TTL),
+    )
 
     @app.post(
         "/chatocr-vision",
@@ -249,6 +315,7 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
                 use_seal_text_det_model=request.useSealTextDet,
             )
 
+            visualize = serving_utils.should_visualize(ctx, request)
             vision_results: List[VisionResult] = []
             for i, (img, item) in enumerate(zip(images, result[0])):
                 pp_img_futures: List[Awaitable] = []
@@ -260,22 +327,23 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
                     file_storage=ctx.extra["file_storage"],
                 )
                 pp_img_futures.append(future)
-                future = serving_utils.call_async(
-                    _postprocess_image,
-                    item["ocr_result"].img,
-                    request_id=request_id,
-                    filename=f"ocr_image_{i}.jpg",
-                    file_storage=ctx.extra["file_storage"],
-                )
-                pp_img_futures.append(future)
-                future = serving_utils.call_async(
-                    _postprocess_image,
-                    item["layout_result"].img,
-                    request_id=request_id,
-                    filename=f"layout_image_{i}.jpg",
-                    file_storage=ctx.extra["file_storage"],
-                )
-                pp_img_futures.append(future)
+                if visualize:
+                    future = serving_utils.call_async(
+                        _postprocess_result_image,
+                        item["ocr_result"],
+                        request_id=request_id,
+                        filename=f"ocr_image_{i}.jpg",
+                        file_storage=ctx.extra["file_storage"],
+                    )
+                    pp_img_futures.append(future)
+                    future = serving_utils.call_async(
+                        _postprocess_result_image,
+                        item["layout_result"],
+                        request_id=request_id,
+                        filename=f"layout_image_{i}.jpg",
+                        file_storage=ctx.extra["file_storage"],
+                    )
+                    pp_img_futures.append(future)
                 texts: List[Text] = []
                 for poly, text, score in zip(
                     item["ocr_result"]["dt_polys"],
@@ -287,7 +355,8 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
                     Table(bbox=r["layout_bbox"], html=r["html"])
                     for r in item["table_result"]
                 ]
-                input_img, ocr_img, layout_img = await asyncio.gather(*pp_img_futures)
+                input_img, *vis_imgs = await asyncio.gather(*pp_img_futures)
+                ocr_img, layout_img = vis_imgs if visualize else (None, None)
                 vision_result = VisionResult(
                     texts=texts,
                     tables=tables,
@@ -335,12 +404,17 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
             result = await serving_utils.call_async(
                 pipeline.pipeline.build_vector, **kwargs
             )
+            vector_store = await serving_utils.call_async(
+                _register_vector_store,
+                ctx.extra["vector_store_registry"],
+                result["vector"],
+            )
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
                 errorCode=0,
                 errorMsg="Success",
-                result=BuildVectorStoreResult(vectorStore=result["vector"]),
+                result=BuildVectorStoreResult(vectorStore=vector_store),
             )
 
         except Exception as e:
@@ -358,9 +432,15 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
         pipeline = ctx.pipeline
 
         try:
+            vector_store = await serving_utils.call_async(
+                _resolve_vector_store,
+                ctx.extra["vector_store_registry"],
+                request.vectorStore,
+            )
+
             kwargs = {
                 "key_list": request.keys,
-                "vector": results.VectorResult({"vector": request.vectorStore}),
+                "vector": results.VectorResult({"vector": vector_store}),
             }
             if request.llmName is not None:
                 kwargs["llm_name"] = request.llmName
@@ -378,6 +458,8 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
                 result=RetrieveKnowledgeResult(retrievalResult=result["retrieval"]),
             )
 
+        except VectorStoreNotFoundError:
+            raise _vector_store_not_found()
         except Exception as e:
             logging.exception(e)
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -394,12 +476,21 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
         pipeline = ctx.pipeline
 
         try:
+            if request.vectorStore is not None:
+                vector_store = await serving_utils.call_async(
+                    _resolve_vector_store,
+                    ctx.extra["vector_store_registry"],
+                    request.vectorStore,
+                )
+            else:
+                vector_store = None
+
             kwargs = {
                 "key_list": request.keys,
                 "visual_info": results.VisualInfoResult(request.visionInfo),
             }
-            if request.vectorStore is not None:
-                kwargs["vector"] = results.VectorResult({"vector": request.vectorStore})
+            if vector_store is not None:
+                kwargs["vector"] = results.VectorResult({"vector": vector_store})
             if request.retrievalResult is not None:
                 kwargs["retrieval_result"] = results.RetrievalResult(
                     {"retrieval": request.retrievalResult}
@@ -438,6 +529,8 @@ def create_pipeline_app(pipeline: PPChatOCRPipeline, app_config: AppConfig) -> F
                 result=chat_result,
             )
 
+        except VectorStoreNotFoundError:
+            raise _vector_store_not_found()
         except Exception as e:
             logging.exception(e)
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -32,6 +32,7 @@ class InferenceParams(BaseModel):
 class InferRequest(BaseModel):
     image: str
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 Point: TypeAlias = Annotated[List[int], Field(min_length=2, max_length=2)]
@@ -46,8 +47,8 @@ class Text(BaseModel):
 
 class InferResult(BaseModel):
     texts: List[Text]
-    layoutImage: str
-    ocrImage: str
+    layoutImage: Optional[str] = None
+    ocrImage: Optional[str] = None
 
 
 def create_pipeline_app(pipeline: SealOCRPipeline, app_config: AppConfig) -> FastAPI:
@@ -85,12 +86,16 @@ def create_pipeline_app(pipeline: SealOCRPipeline, app_config: AppConfig) -> Fas
                 result["ocr_result"]["rec_score"],
             ):
                 texts.append(Text(poly=poly, text=text, score=score))
-            layout_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result["layout_result"].img)
-            )
-            ocr_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result["ocr_result"].img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                layout_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result["layout_result"].img)
+                )
+                ocr_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result["ocr_result"].img)
+                )
+            else:
+                layout_image_base64 = None
+                ocr_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
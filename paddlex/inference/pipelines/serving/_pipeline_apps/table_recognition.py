@@ -32,6 +32,7 @@ class InferenceParams(BaseModel):
 class InferRequest(BaseModel):
     image: str
     inferenceParams: Optional[InferenceParams] = None
+    returnVisualization: Optional[bool] = None
 
 
 Point: TypeAlias = Annotated[List[int], Field(min_length=2, max_length=2)]
@@ -45,13 +46,16 @@ class Table(BaseModel):
 
 class InferResult(BaseModel):
     tables: List[Table]
-    layoutImage: str
-    ocrImage: str
+    layoutImage: Optional[str] = None
+    ocrImage: Optional[str] = None
 
 
 def create_pipeline_app(pipeline: TableRecPipeline, app_config: AppConfig) -> FastAPI:
     app, ctx = create_app(
-        pipeline=pipeline, app_config=app_config, app_aiohttp_session=True
+        pipeline=pipeline,
+        app_config=app_config,
+        app_aiohttp_session=True,
+        app_batching=True,
     )
 
     @app.post(
@@ -85,12 +89,16 @@ def create_pipeline_app(pipeline: TableRecPipeline, app_config: AppConfig) -> Fa
                         html=item["html"],
                     )
                 )
-            layout_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result["layout_result"].img)
-            )
-            ocr_image_base64 = serving_utils.base64_encode(
-                serving_utils.image_to_bytes(result["ocr_result"].img)
-            )
+            if serving_utils.should_visualize(ctx, request):
+                layout_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result["layout_result"].img)
+                )
+                ocr_image_base64 = serving_utils.base64_encode(
+                    serving_utils.image_to_bytes(result["ocr_result"].img)
+                )
+            else:
+                layout_image_base64 = None
+                ocr_image_base64 = None
 
             return ResultResponse(
                 logId=serving_utils.generate_log_id(),
@@ -23,19 +23,24 @@ from typing import (
     Generic,
     List,
     Optional,
+    Set,
     Tuple,
     TypeVar,
 )
 
 import aiohttp
 import fastapi
+import numpy as np
+import pandas as pd
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from starlette.exceptions import HTTPException
-from typing_extensions import Final, ParamSpec
+from typing_extensions import Annotated, Final, ParamSpec
 
+from ....utils import logging
+from ...utils.pp_option import PaddlePredictorOption
 from ..base import BasePipeline
 from .models import Response
 from .utils import call_async, generate_log_id
@@ -47,32 +52,191 @@ _P = ParamSpec("_P")
 _R = TypeVar("_R")
 
 
+class _DynamicBatcher(object):
+    def __init__(
+        self,
+        wrapper: "PipelineWrapper",
+        max_batch_size: int,
+        max_queue_delay: float,
+        max_concurrency: int = 1,
+    ) -> None:
+        super().__init__()
+        self._wrapper = wrapper
+        self._max_batch_size = max_batch_size
+        self._max_queue_delay = max_queue_delay
+        self._max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, input_: Any) -> List[Any]:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run_forever())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((input_, future))
+        return await future
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Keep up to `max_concurrency` batches in flight, e.g. one per replica
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        while True:
+            await semaphore.acquire()
+            items = [await self._queue.get()]
+            deadline = loop.time() + self._max_queue_delay
+            while len(items) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                items.append(item)
+            task = asyncio.create_task(self._run_batch(items))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+
+    async def _run_batch(self, items: List[Tuple[Any, asyncio.Future]]) -> None:
+        inputs = [input_ for input_, _ in items]
+
+        def _infer(pipeline: BasePipeline) -> List[Any]:
+            output = list(pipeline(inputs))
+            if len(output) != len(inputs):
+                raise RuntimeError(
+                    f"Expected {len(inputs)} results, but got {len(output)}."
+                )
+            return output
+
+        try:
+            output = await self._wrapper.dispatch(_infer)
+        except Exception as e:
+            if len(items) == 1:
+                _, future = items[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # Retry the inputs one by one, so that only the bad ones fail
+            logging.warning(
+                "Failed to infer a batch of %d inputs (%s), which are retried one by one.",
+                len(items),
+                e,
+            )
+            await asyncio.gather(*(self._run_batch([item]) for item in items))
+        else:
+            for (_, future), res in zip(items, output):
+                if not future.done():
+                    future.set_result([res])
+
+
+class _PipelineReplica(object):
+    def __init__(self, pipeline: BasePipeline) -> None:
+        super().__init__()
+        self.pipeline = pipeline
+        self.lock = asyncio.Lock()
+        self.num_pending = 0
+
+
 class PipelineWrapper(Generic[_PipelineT]):
-    def __init__(self, pipeline: _PipelineT) -> None:
+    def __init__(
+        self,
+        pipeline: _PipelineT,
+        *,
+        replicas: Optional[List[_PipelineT]] = None,
+        max_batch_size: int = 1,
+        max_queue_delay: float = 0,
+    ) -> None:
         super().__init__()
         self._pipeline = pipeline
-        self._lock = asyncio.Lock()
+        # The first replica is the primary pipeline, which also serves `call()`
+        self._replicas = [_PipelineReplica(p) for p in [pipeline, *(replicas or [])]]
+        if max_batch_size > 1:
+            self._batcher: Optional[_DynamicBatcher] = _DynamicBatcher(
+                self,
+                max_batch_size,
+                max_queue_delay,
+                max_concurrency=len(self._replicas),
+            )
+        else:
+            self._batcher = None
 
     @property
     def pipeline(self) -> _PipelineT:
         return self._pipeline
 
+    @property
+    def num_replicas(self) -> int:
+        return len(self._replicas)
+
     async def infer(self, *args: Any, **kwargs: Any) -> List[Any]:
-        def _infer() -> List[Any]:
-            output = list(self._pipeline(*args, **kwargs))
+        # Only a single input that yields exactly one result can be batched
+        # with inputs from other requests.
+        if (
+            self._batcher
+            and len(args) == 1
+            and not kwargs
+            and isinstance(args[0], (np.ndarray, pd.DataFrame))
+        ):
+            return await self._batcher.submit(args[0])
+
+        def _infer(pipeline: _PipelineT) -> List[Any]:
+            output = list(pipeline(*args, **kwargs))
             return output
 
-        return await self.call(_infer)
+        return await self.dispatch(_infer)
 
     async def call(
         self, func: Callable[_P, _R], *args: _P.args, **kwargs: _P.kwargs
     ) -> _R:
-        async with self._lock:
-            return await call_async(func, *args, **kwargs)
+        return await self._run_on_replica(self._replicas[0], func, *args, **kwargs)
+
+    async def dispatch(self, func: Callable[[_PipelineT], _R]) -> _R:
+        """Run `func(pipeline)` on the least loaded replica."""
+        replica = min(self._replicas, key=lambda r: r.num_pending)
+        return await self._run_on_replica(replica, func, replica.pipeline)
+
+    def close(self) -> None:
+        if self._batcher:
+            self._batcher.close()
+
+    async def _run_on_replica(
+        self,
+        replica: _PipelineReplica,
+        func: Callable[..., _R],
+        *args: Any,
+        **kwargs: Any,
+    ) -> _R:
+        replica.num_pending += 1
+        try:
+            async with replica.lock:
+                return await call_async(func, *args, **kwargs)
+        finally:
+            replica.num_pending -= 1
 
 
 class AppConfig(BaseModel):
     extra: Optional[Dict[str, Any]] = None
+    # Requests that arrive within `max_queue_delay` seconds are coalesced into
+    # one pipeline call of at most `max_batch_size` inputs.
+    max_batch_size: Annotated[int, Field(gt=0)] = 1
+    max_queue_delay: Annotated[float, Field(ge=0)] = 0.005
+    # Each replica holds its own copy of the models and serves one call at a
+    # time, using `cpu_threads` threads for CPU inference if set.
+    num_replicas: Annotated[int, Field(gt=0)] = 1
+    cpu_threads: Optional[Annotated[int, Field(gt=0)]] = None
+    # Whether to render and return the result images, unless a request asks
+    # otherwise by `returnVisualization`.
+    visualize: bool = True
+    # Creates a new pipeline for each additional replica.
+    pipeline_factory: Optional[Callable[[], Any]] = Field(default=None, exclude=True)
 
 
 class AppContext(Generic[_PipelineT]):
@@ -114,20 +278,63 @@ def create_app_config(pipeline_config: Dict[str, Any], **kwargs: Any) -> AppConf
     return AppConfig.model_validate(app_config)
 
 
+def _set_cpu_threads(obj: Any, cpu_threads: int) -> None:
+    # Walk through the (sub-)pipelines to reach every predictor
+    if isinstance(obj, BasePipeline):
+        for attr in vars(obj).values():
+            _set_cpu_threads(attr, cpu_threads)
+    else:
+        pp_option = getattr(obj, "pp_option", None)
+        if isinstance(pp_option, PaddlePredictorOption):
+            pp_option.cpu_threads = cpu_threads
+
+
+def _create_replicas(pipeline: _PipelineT, app_config: AppConfig) -> List[_PipelineT]:
+    replicas: List[_PipelineT] = []
+    if app_config.num_replicas > 1:
+        if app_config.pipeline_factory is None:
+            logging.warning(
+                "`num_replicas` is ignored because no pipeline factory is provided."
+            )
+        else:
+            for _ in range(app_config.num_replicas - 1):
+                replicas.append(app_config.pipeline_factory())
+    if app_config.cpu_threads is not None:
+        for p in [pipeline, *replicas]:
+            _set_cpu_threads(p, app_config.cpu_threads)
+    return replicas
+
+
 def create_app(
-    *, pipeline: _PipelineT, app_config: AppConfig, app_aiohttp_session: bool = True
+    *,
+    pipeline: _PipelineT,
+    app_config: AppConfig,
+    app_aiohttp_session: bool = True,
+    app_batching: bool = False,
 ) -> Tuple[fastapi.FastAPI, AppContext[_PipelineT]]:
     @contextlib.asynccontextmanager
     async def _app_lifespan(app: fastapi.FastAPI) -> AsyncGenerator[None, None]:
-        ctx.pipeline = PipelineWrapper[_PipelineT](pipeline)
-        if app_aiohttp_session:
-            async with aiohttp.ClientSession(
-                cookie_jar=aiohttp.DummyCookieJar()
-            ) as aiohttp_session:
-                ctx.aiohttp_session = aiohttp_session
-                yield
+        replicas = await call_async(_create_replicas, pipeline, app_config)
+        if app_batching:
+            ctx.pipeline = PipelineWrapper[_PipelineT](
+                pipeline,
+                replicas=replicas,
+                max_batch_size=app_config.max_batch_size,
+                max_queue_delay=app_config.max_queue_delay,
+            )
         else:
-            yield
+            ctx.pipeline = PipelineWrapper[_PipelineT](pipeline, replicas=replicas)
+        try:
+            if app_aiohttp_session:
+                async with aiohttp.ClientSession(
+                    cookie_jar=aiohttp.DummyCookieJar()
+                ) as aiohttp_session:
+                    ctx.aiohttp_session = aiohttp_session
+                    yield
+            else:
+                yield
+        finally:
+            ctx.pipeline.close()
 
     app = fastapi.FastAPI(lifespan=_app_lifespan)
     ctx = AppContext[_PipelineT](config=app_config)
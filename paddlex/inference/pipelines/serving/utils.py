@@ -19,24 +19,47 @@ import os
 import re
 import uuid
 from functools import partial
-from typing import Awaitable, Callable, List, Literal, Optional, TypeVar, Final, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+    Final,
+    Tuple,
+)
 from urllib.parse import parse_qs, urlparse
 
 import aiohttp
 import cv2
-import fitz
 import numpy as np
 import pandas as pd
 import yarl
 from PIL import Image
 from typing_extensions import ParamSpec, assert_never
 
+from ....utils.flags import PDF_READER_NUM_WORKERS
+from ...utils.io import PDFReader
+
+if TYPE_CHECKING:
+    from .app import AppContext
+
 FileType = Literal["IMAGE", "PDF"]
 
 _P = ParamSpec("_P")
 _R = TypeVar("_R")
 
 
+def should_visualize(ctx: "AppContext", request: Any) -> bool:
+    """Whether to return the result images, as asked by the request or configured."""
+    if request.returnVisualization is None:
+        return ctx.config.visualize
+    return request.returnVisualization
+
+
 def generate_log_id() -> str:
     return str(uuid.uuid4())
 
@@ -136,26 +159,17 @@ def read_pdf(
 ) -> List[np.ndarray]:
     images: List[np.ndarray] = []
     img_size = None
-    with fitz.open("pdf", bytes_) as doc:
-        for page in doc:
-            if max_num_imgs is not None and len(images) >= max_num_imgs:
-                break
-            # TODO: Do not always use zoom=2.0
-            zoom = 2.0
-            deg = 0
-            mat = fitz.Matrix(zoom, zoom).prerotate(deg)
-            pixmap = page.get_pixmap(matrix=mat, alpha=False)
-            image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(
-                pixmap.h, pixmap.w, pixmap.n
-            )
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-            if resize:
-                if img_size is None:
-                    img_size = (image.shape[1], image.shape[0])
-                else:
-                    if (image.shape[1], image.shape[0]) != img_size:
-                        image = cv2.resize(image, img_size)
-            images.append(image)
+    page_range = None if max_num_imgs is None else (0, max_num_imgs)
+    # TODO: Do not always use zoom=2.0
+    reader = PDFReader(num_workers=PDF_READER_NUM_WORKERS)
+    for image in reader.read(bytes_, page_range=page_range):
+        if resize:
+            if img_size is None:
+                img_size = (image.shape[1], image.shape[0])
+            else:
+                if (image.shape[1], image.shape[0]) != img_size:
+                    image = cv2.resize(image, img_size)
+        images.append(image)
     return images
 
 
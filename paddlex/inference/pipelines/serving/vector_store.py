@@ -0,0 +1,208 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from typing_extensions import Final
+
+from ....utils import logging
+from .storage import Storage
+
+VECTOR_STORE_HANDLE_PREFIX: Final[str] = "pdx-vs-"
+
+_STORAGE_KEY_PREFIX: Final[str] = "vector_stores"
+
+
+class VectorStoreNotFoundError(KeyError):
+    pass
+
+
+class VectorStoreRegistry(object):
+    """
+    Keep the vector stores built by the server, and give out opaque handles for
+    them, so that clients pass the handles instead of the serialized stores.
+
+    The deserialized stores are kept in an LRU cache of at most `max_memory`
+    bytes, counted by their serialized sizes. The least recently used stores are
+    spilled to `storage` beyond the limit, and loaded back on the next use. Without
+    `storage`, they are dropped. At most `max_stored` stores are kept in `storage`,
+    and a store not used for `ttl` seconds expires. The stores evicted from
+    `storage` or expired are deleted from it.
+    """
+
+    def __init__(
+        self,
+        serialize: Callable[[Any], bytes],
+        deserialize: Callable[[bytes], Any],
+        *,
+        max_memory: int = 512 * 1024 * 1024,
+        storage: Optional[Storage] = None,
+        max_stored: Optional[int] = 10000,
+        ttl: Optional[float] = 7 * 24 * 3600,
+    ) -> None:
+        super().__init__()
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._max_memory = max_memory
+        self._storage = storage
+        self._max_stored = max_stored
+        self._ttl = ttl
+        # handle -> (store, size)
+        self._stores: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._memory = 0
+        # the evicted stores being written to the storage
+        self._spilling: Dict[str, Any] = {}
+        # the stores saved in the storage, which are not written again, in LRU order
+        self._stored: "OrderedDict[str, None]" = OrderedDict()
+        # handle -> the time of last use, of all live stores in LRU order
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_handle(s: Any) -> bool:
+        return isinstance(s, str) and s.startswith(VECTOR_STORE_HANDLE_PREFIX)
+
+    @property
+    def memory(self) -> int:
+        return self._memory
+
+    @property
+    def num_stored(self) -> int:
+        return len(self._stored)
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def register(self, store: Any, size: Optional[int] = None) -> str:
+        """add a store, and return the handle of it"""
+        if size is None:
+            size = len(self._serialize(store))
+        handle = f"{VECTOR_STORE_HANDLE_PREFIX}{uuid.uuid4().hex}"
+        self._put(handle, store, size)
+        return handle
+
+    def register_bytes(self, store_bytes: bytes) -> str:
+        """add a serialized store, and return the handle of it"""
+        return self.register(self._deserialize(store_bytes), size=len(store_bytes))
+
+    def get(self, handle: str) -> Any:
+        with self._lock:
+            expired = self._expire()
+            if handle not in self._last_used:
+                store = None
+            else:
+                self._touch(handle)
+                item = self._stores.get(handle)
+                if item is not None:
+                    self._stores.move_to_end(handle)
+                    store = item[0]
+                else:
+                    store = self._spilling.get(handle)
+        self._delete_stored(expired)
+        if store is not None:
+            return store
+        if self._storage is None or handle not in self._stored:
+            raise VectorStoreNotFoundError(handle)
+        try:
+            store_bytes = self._storage.get(self._get_storage_key(handle))
+        except Exception as e:
+            raise VectorStoreNotFoundError(handle) from e
+        store = self._deserialize(store_bytes)
+        self._put(handle, store, len(store_bytes))
+        return store
+
+    def _put(self, handle: str, store: Any, size: int) -> None:
+        spilled = []
+        with self._lock:
+            expired = self._expire()
+            if handle in self._stores:
+                self._memory -= self._stores.pop(handle)[1]
+            self._stores[handle] = (store, size)
+            self._memory += size
+            self._touch(handle)
+            # always keep the latest store, even if it alone exceeds the limit
+            while self._memory > self._max_memory and len(self._stores) > 1:
+                evicted_handle, (evicted_store, evicted_size) = self._stores.popitem(
+                    last=False
+                )
+                self._memory -= evicted_size
+                spilled.append((evicted_handle, evicted_store))
+                self._spilling[evicted_handle] = evicted_store
+        self._delete_stored(expired)
+        for evicted_handle, evicted_store in spilled:
+            try:
+                self._spill(evicted_handle, evicted_store)
+            finally:
+                with self._lock:
+                    self._spilling.pop(evicted_handle, None)
+
+    def _spill(self, handle: str, store: Any) -> None:
+        if self._storage is None:
+            logging.warning(
+                f"Vector store {handle} is dropped, as the memory limit is reached and no storage is configured."
+            )
+            with self._lock:
+                self._last_used.pop(handle, None)
+            return
+        with self._lock:
+            if handle in self._stored or handle not in self._last_used:
+                return
+        self._storage.set(self._get_storage_key(handle), self._serialize(store))
+        evicted = []
+        with self._lock:
+            self._stored[handle] = None
+            while self._max_stored is not None and len(self._stored) > self._max_stored:
+                evicted_handle, _ = self._stored.popitem(last=False)
+                if evicted_handle not in self._stores:
+                    self._last_used.pop(evicted_handle, None)
+                evicted.append(evicted_handle)
+        self._delete_stored(evicted)
+
+    def _touch(self, handle: str) -> None:
+        self._last_used[handle] = time.monotonic()
+        self._last_used.move_to_end(handle)
+        if handle in self._stored:
+            self._stored.move_to_end(handle)
+
+    def _expire(self) -> List[str]:
+        """drop the stores not used for `ttl` seconds, and return the stored ones"""
+        if self._ttl is None:
+            return []
+        deadline = time.monotonic() - self._ttl
+        expired = []
+        while self._last_used:
+            handle, last_used = next(iter(self._last_used.items()))
+            if last_used >= deadline:
+                break
+            del self._last_used[handle]
+            if handle in self._stores:
+                self._memory -= self._stores.pop(handle)[1]
+            if handle in self._stored:
+                del self._stored[handle]
+                expired.append(handle)
+        return expired
+
+    def _delete_stored(self, handles: List[str]) -> None:
+        for handle in handles:
+            try:
+                self._storage.delete(self._get_storage_key(handle))
+            except Exception as e:
+                logging.warning(f"Failed to delete vector store {handle}: {e}")
+
+    def _get_storage_key(self, handle: str) -> str:
+        return f"{_STORAGE_KEY_PREFIX}/{handle}"
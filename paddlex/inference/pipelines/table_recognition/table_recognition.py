@@ -17,7 +17,7 @@ from .utils import *
 from ..base import BasePipeline
 from ..ocr import OCRPipeline
 from ....utils import logging
-from ...components import CropByBoxes
+from ...components import CropByBoxes, SpatialIndex
 from ...results import OCRResult, TableResult, StructureTableResult
 
 
@@ -76,23 +76,31 @@ class _TableRecPipeline(BasePipeline):
     def predict(self, inputs):
         raise NotImplementedError("The method `predict` has not been implemented yet.")
 
-    def get_related_ocr_result(self, box, ocr_res):
-        dt_polys_list = []
-        rec_text_list = []
-        score_list = []
-        unmatched_ocr_res = {"dt_polys": [], "rec_text": [], "rec_score": []}
+    def get_related_ocr_result(self, boxes, ocr_res):
+        """get the ocr results overlapping each of boxes, and the rest of ocr_res"""
+        related_ids = SpatialIndex(ocr_res["dt_polys"]).query_overlap(boxes)
+        related_ocr_res = []
+        matched = np.zeros(len(ocr_res["dt_polys"]), dtype=bool)
+        for ids in related_ids:
+            matched[ids] = True
+            related_ocr_res.append(
+                (
+                    [ocr_res["dt_polys"][i] for i in ids],
+                    [ocr_res["rec_text"][i] for i in ids],
+                    [ocr_res["rec_score"][i] for i in ids],
+                )
+            )
+        unmatched_ids = np.nonzero(~matched)[0]
+        unmatched_ocr_res = {
+            "dt_polys": [ocr_res["dt_polys"][i] for i in unmatched_ids],
+            "rec_text": [ocr_res["rec_text"][i] for i in unmatched_ids],
+            "rec_score": [ocr_res["rec_score"][i] for i in unmatched_ids],
+        }
         unmatched_ocr_res["input_path"] = ocr_res["input_path"]
-        for i, text_box in enumerate(ocr_res["dt_polys"]):
-            text_box_area = convert_4point2rect(text_box)
-            if is_inside(text_box_area, box):
-                dt_polys_list.append(text_box)
-                rec_text_list.append(ocr_res["rec_text"][i])
-                score_list.append(ocr_res["rec_score"][i])
-            else:
-                unmatched_ocr_res["dt_polys"].append(text_box)
-                unmatched_ocr_res["rec_text"].append(ocr_res["rec_text"][i])
-                unmatched_ocr_res["rec_score"].append(ocr_res["rec_score"][i])
-        return (dt_polys_list, rec_text_list, score_list), unmatched_ocr_res
+        # keep the decoded image, so that it is not read from `input_path` again
+        if "ori_img" in ocr_res:
+            unmatched_ocr_res["ori_img"] = ocr_res["ori_img"]
+        return related_ocr_res, unmatched_ocr_res
 
     def get_table_result(self, input_imgs):
         table_res_list = []
@@ -118,6 +126,7 @@ class _TableRecPipeline(BasePipeline):
                 StructureTableResult(
                     {
                         "input_path": input_img["input_path"],
+                        "ori_img": input_img["ori_img"],
                         "layout_bbox": [int(x) for x in input_img["box"]],
                         "bbox": ori_bbox_list,
                         "img_idx": table_index,
@@ -159,9 +168,10 @@ class TableRecPipeline(_TableRecPipeline):
 
     def predict(self, input, **kwargs):
         self.set_predictor(**kwargs)
-        for layout_pred, ocr_pred in zip(
-            self.layout_predictor(input), self.ocr_pipeline(input)
-        ):
+        for layout_pred in self.layout_predictor(input):
+            # reuse the decoded image instead of reading the input again
+            ocr_pred = next(self.ocr_pipeline(layout_pred["ori_img"]))
+            ocr_pred["input_path"] = layout_pred["input_path"]
             single_img_res = {
                 "input_path": "",
                 "layout_result": {},
@@ -177,10 +187,12 @@ class TableRecPipeline(_TableRecPipeline):
                 subs_of_img = list(self._crop_by_boxes(layout_pred))
                 # get cropped images with label "table"
                 for sub in subs_of_img:
-                    box = sub["box"]
                     if sub["label"].lower() == "table":
                         table_subs.append(sub)
-                        _, ocr_res = self.get_related_ocr_result(box, ocr_res)
+            if len(table_subs) > 0:
+                _, ocr_res = self.get_related_ocr_result(
+                    [sub["box"] for sub in table_subs], ocr_res
+                )
             table_res, all_table_ocr_res = self.get_table_result(table_subs)
             for table_ocr_res in all_table_ocr_res:
                 ocr_res["dt_polys"].extend(table_ocr_res["dt_polys"])
@@ -270,6 +270,53 @@ def compute_iou(rec1, rec2):
         return (intersect / (sum_area - intersect)) * 1.0
 
 
+def distance_matrix(boxes_1, boxes_2):
+    """
+    compute the distances between every pair of boxes, the same as `distance()`
+
+    Args:
+        boxes_1 (np.ndarray): first rectangle boxes in shape (N, 4)
+        boxes_2 (np.ndarray): second rectangle boxes in shape (M, 4)
+
+    Returns:
+        np.ndarray: the distances in shape (N, M)
+    """
+    boxes_1 = boxes_1[:, None, :]
+    boxes_2 = boxes_2[None, :, :]
+    abs_diff = np.abs(boxes_2 - boxes_1)
+    dis_2 = abs_diff[..., 0] + abs_diff[..., 1]
+    dis_3 = abs_diff[..., 2] + abs_diff[..., 3]
+    dis = dis_2 + abs_diff[..., 2] + abs_diff[..., 3]
+    return dis + np.minimum(dis_2, dis_3)
+
+
+def compute_iou_matrix(recs_1, recs_2):
+    """
+    computing IoU between every pair of rectangles, the same as `compute_iou()`
+    Args:
+        recs_1 (np.ndarray): rectangles in shape (N, 4)
+        recs_2 (np.ndarray): rectangles in shape (M, 4)
+    Returns:
+        np.ndarray: Intersection over Union in shape (N, M)
+    """
+    S_rec1 = (recs_1[:, 2] - recs_1[:, 0]) * (recs_1[:, 3] - recs_1[:, 1])
+    S_rec2 = (recs_2[:, 2] - recs_2[:, 0]) * (recs_2[:, 3] - recs_2[:, 1])
+    sum_area = S_rec1[:, None] + S_rec2[None, :]
+
+    left_line = np.maximum(recs_1[:, None, 0], recs_2[None, :, 0])
+    right_line = np.minimum(recs_1[:, None, 2], recs_2[None, :, 2])
+    top_line = np.maximum(recs_1[:, None, 1], recs_2[None, :, 1])
+    bottom_line = np.minimum(recs_1[:, None, 3], recs_2[None, :, 3])
+
+    has_intersect = (left_line < right_line) & (top_line < bottom_line)
+    intersect = np.where(
+        has_intersect, (right_line - left_line) * (bottom_line - top_line), 0
+    )
+    union = np.where(has_intersect, sum_area - intersect, 1)
+    # the ratio is computed in the dtype of the boxes, and widened afterwards
+    return np.where(has_intersect, intersect / union, 0).astype(np.float64)
+
+
 def convert_4point2rect(bbox):
     """
     Convert 4 point coordinate to rectangle coordinate
@@ -287,6 +334,20 @@ def convert_4point2rect(bbox):
     return np.array([x1, y1, x2, y2], dtype=np.float32)
 
 
+def convert_4point2rects(bboxes):
+    """
+    Convert 4 point coordinates to rectangle coordinates, the same as `convert_4point2rect()`
+    Args:
+        bboxes (list): list of boxes of 4 points, eg. [[x1, y1, x2, y2,...]] or [[[x1,y1],[x2,y2],...]]
+    Returns:
+        np.ndarray: rectangles in shape (N, 4)
+    """
+    points = np.array(bboxes).reshape(len(bboxes), -1, 2)
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1).astype(
+        np.float32
+    )
+
+
 def get_ori_coordinate_for_table(x, y, table_bbox):
     """
     get the original coordinate from Cropped image to Original image.
@@ -371,26 +432,21 @@ class TableMatch(object):
             dict: matched dict, key is table index, value is ocr index
         """
         matched = {}
-        for i, ocr_box in enumerate(np.array(ocr_boxes)):
-            ocr_box = convert_4point2rect(ocr_box)
-            distances = []
-            for j, table_box in enumerate(table_boxes):
-                table_box = convert_4point2rect(table_box)
-                distances.append(
-                    (
-                        distance(table_box, ocr_box),
-                        1.0 - compute_iou(table_box, ocr_box),
-                    )
-                )  # compute iou and l1 distance
-            sorted_distances = distances.copy()
-            # select det box by iou and l1 distance
-            sorted_distances = sorted(
-                sorted_distances, key=lambda item: (item[1], item[0])
-            )
-            if distances.index(sorted_distances[0]) not in matched.keys():
-                matched[distances.index(sorted_distances[0])] = [i]
+        if len(ocr_boxes) == 0 or len(table_boxes) == 0:
+            return matched
+        ocr_rects = convert_4point2rects(ocr_boxes)
+        table_rects = convert_4point2rects(table_boxes)
+        # compute iou and l1 distance, in shape (num of ocr boxes, num of table boxes)
+        distances = distance_matrix(ocr_rects, table_rects)
+        ious = 1.0 - compute_iou_matrix(ocr_rects, table_rects)
+        # select det box by iou and l1 distance, the first one if tied
+        min_ious = ious.min(axis=1, keepdims=True)
+        distances = np.where(ious == min_ious, distances, np.inf)
+        for i, j in enumerate(distances.argmin(axis=1).tolist()):
+            if j not in matched:
+                matched[j] = [i]
             else:
-                matched[distances.index(sorted_distances[0])].append(i)
+                matched[j].append(i)
         return matched
 
     def get_html_result(self, matched_index, ocr_contents, pred_structures):
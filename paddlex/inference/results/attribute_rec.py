@@ -75,7 +75,7 @@ class AttributeRecResult(CVResult):
 
     def _to_img(self):
         """apply"""
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         boxes = [
             {
                 "coordinate": box["coordinate"],
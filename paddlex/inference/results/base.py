@@ -20,6 +20,10 @@ from .utils.mixin import JsonMixin, ImgMixin, StrMixin
 
 
 class BaseResult(dict, StrMixin, JsonMixin):
+    # the keys of data that are only kept for reuse, e.g. the decoded image, and
+    # are neither printed nor saved
+    _HIDDEN_KEYS = ("ori_img",)
+
     def __init__(self, data):
         super().__init__(data)
         self._show_funcs = []
@@ -34,6 +38,9 @@ class BaseResult(dict, StrMixin, JsonMixin):
             else:
                 func()
 
+    def __repr__(self):
+        return repr({k: v for k, v in self.items() if k not in self._HIDDEN_KEYS})
+
 
 class CVResult(BaseResult, ImgMixin):
     def __init__(self, data):
@@ -41,3 +48,14 @@ class CVResult(BaseResult, ImgMixin):
         ImgMixin.__init__(self, "pillow")
         self._img_reader = ImageReader(backend="pillow")
         self._img_writer = ImageWriter(backend="pillow")
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        # the img rendered from the old data, if any, is out of date
+        self._img = self._NOT_RENDERED
+
+    def _read_input_img(self):
+        # reuse the decoded image if it is carried, instead of decoding it again
+        if "ori_img" in self:
+            return self._img_reader.read(self["ori_img"])
+        return self._img_reader.read(self["input_path"])
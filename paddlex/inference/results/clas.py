@@ -30,7 +30,7 @@ class TopkResult(CVResult):
         labels = self.get("label_names", self["class_ids"])
         label_str = f"{labels[0]} {self['scores'][0]:.2f}"
 
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         image_size = image.size
         draw = ImageDraw.Draw(image)
         min_font_size = int(image_size[0] * 0.02)
@@ -85,7 +85,7 @@ class TopkResult(CVResult):
 class MLClassResult(TopkResult):
     def _to_img(self):
         """Draw label on image"""
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         label_names = self["label_names"]
         scores = self["scores"]
         image = image.convert("RGB")
@@ -81,6 +81,6 @@ class DetResult(CVResult):
     def _to_img(self):
         """apply"""
         boxes = self["boxes"]
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         image = draw_box(image, boxes)
         return image
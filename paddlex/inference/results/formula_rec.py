@@ -45,7 +45,7 @@ class FormulaRecResult(CVResult):
             )
             return None
 
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         rec_formula = str(self["rec_text"])
         image = np.array(image.convert("RGB"))
         xywh = crop_white_area(image)
@@ -96,7 +96,7 @@ class FormulaResult(CVResult):
 
         boxes = self["dt_polys"]
         formulas = self["rec_formula"]
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         h, w = image.height, image.width
         img_left = image.copy()
         img_right = np.ones((h, w, 3), dtype=np.uint8) * 255
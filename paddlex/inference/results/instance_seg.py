@@ -134,7 +134,7 @@ class InstanceSegResult(CVResult):
 
     def _to_img(self):
         """apply"""
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         ori_img_size = list(image.size)[::-1]
         boxes = self["boxes"]
         masks = self["masks"]
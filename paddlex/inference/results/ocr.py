@@ -14,6 +14,7 @@
 
 import math
 import random
+from functools import lru_cache
 import numpy as np
 import cv2
 import PIL
@@ -59,7 +60,7 @@ class OCRResult(CVResult):
         boxes = self["dt_polys"]
         txts = self["rec_text"]
         scores = self["rec_score"]
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         h, w = image.height, image.width
         img_left = image.copy()
         img_right = np.ones((h, w, 3), dtype=np.uint8) * 255
@@ -85,12 +86,15 @@ class OCRResult(CVResult):
                     box[:2, 1] = np.mean(box[:, 1])
                     box[2:, 1] = np.mean(box[:, 1]) + min(20, height)
                 draw_left.polygon(box, fill=color)
-                img_right_text = draw_box_txt_fine(
+                # only the region around the box is rendered and composited
+                text_roi, (x1, y1, x2, y2) = draw_box_txt_roi(
                     (w, h), box, txt, PINGFANG_FONT_FILE_PATH
                 )
                 pts = np.array(box, np.int32).reshape((-1, 1, 2))
-                cv2.polylines(img_right_text, [pts], True, color, 1)
-                img_right = cv2.bitwise_and(img_right, img_right_text)
+                pts -= np.array([x1, y1], dtype=np.int32)
+                cv2.polylines(text_roi, [pts], True, color, 1)
+                img_right_roi = img_right[y1:y2, x1:x2]
+                np.bitwise_and(img_right_roi, text_roi, out=img_right_roi)
             except:
                 continue
 
@@ -103,6 +107,18 @@ class OCRResult(CVResult):
 
 def draw_box_txt_fine(img_size, box, txt, font_path):
     """draw box text"""
+    w, h = img_size
+    text_roi, (x1, y1, x2, y2) = draw_box_txt_roi(img_size, box, txt, font_path)
+    img_right_text = np.full((h, w, 3), 255, dtype=np.uint8)
+    img_right_text[y1:y2, x1:x2] = text_roi
+    return img_right_text
+
+
+def draw_box_txt_roi(img_size, box, txt, font_path):
+    """
+    draw box text like `draw_box_txt_fine`, but only in the region of the
+    image the text is warped into, and return the region and its (x1, y1, x2, y2)
+    """
     box_height = int(
         math.sqrt((box[0][0] - box[3][0]) ** 2 + (box[0][1] - box[3][1]) ** 2)
     )
@@ -131,21 +147,72 @@ def draw_box_txt_fine(img_size, box, txt, font_path):
     M = cv2.getPerspectiveTransform(pts1, pts2)
 
     img_text = np.array(img_text, dtype=np.uint8)
+    w, h = img_size
+    roi = _get_warp_roi(M, img_text.shape[1], img_text.shape[0], pts2, img_size)
+    if roi is None:
+        # the whole image may be covered, e.g. for a degenerate box
+        x1, y1, x2, y2 = 0, 0, w, h
+    else:
+        x1, y1, x2, y2 = roi
+    # The warp is done for the top-left part of the image which covers the region
+    # only. Its origin, and its blocks of 64 x 16 pixels in which OpenCV computes
+    # the coordinates, are kept the same as those of the whole image, so that the
+    # coordinates are rounded the same as well.
+    warp_w = min(-(-x2 // 64) * 64, w)
+    warp_h = min(max(y2, 16), h)
     img_right_text = cv2.warpPerspective(
         img_text,
         M,
-        img_size,
+        (warp_w, warp_h),
         flags=cv2.INTER_NEAREST,
         borderMode=cv2.BORDER_CONSTANT,
         borderValue=(255, 255, 255),
     )
-    return img_right_text
+    text_roi = img_right_text[y1:y2, x1:x2]
+    return text_roi, (x1, y1, x2, y2)
+
+
+def _get_warp_roi(M, src_w, src_h, box, img_size):
+    """get the region of the image covered by the warped source and the box"""
+    if not np.all(np.isfinite(M)) or abs(np.linalg.det(M)) < 1e-9:
+        return None
+    # the source pixels cover [-0.5, size - 0.5] with the nearest interpolation
+    corners = np.array(
+        [
+            [-0.5, -0.5, 1],
+            [src_w - 0.5, -0.5, 1],
+            [src_w - 0.5, src_h - 0.5, 1],
+            [-0.5, src_h - 0.5, 1],
+        ]
+    )
+    warped = corners @ M.T
+    # the source is not mapped into a bounded region if it crosses the horizon
+    if np.any(warped[:, 2] <= 1e-9):
+        return None
+    warped = warped[:, :2] / warped[:, 2:]
+    points = np.concatenate([warped, box.reshape(-1, 2)])
+    if not np.all(np.isfinite(points)):
+        return None
+    # one more pixel on each side for the rounding, and for the box outline
+    x1, y1 = np.floor(points.min(axis=0)).astype(np.int64) - 2
+    x2, y2 = np.ceil(points.max(axis=0)).astype(np.int64) + 3
+    w, h = img_size
+    x1, y1 = max(int(x1), 0), max(int(y1), 0)
+    x2, y2 = min(int(x2), w), min(int(y2), h)
+    if x1 >= x2 or y1 >= y2:
+        x1, y1, x2, y2 = 0, 0, 1, 1
+    return x1, y1, x2, y2
+
+
+@lru_cache(maxsize=256)
+def _load_font(font_path, font_size):
+    return ImageFont.truetype(font_path, font_size, encoding="utf-8")
 
 
 def create_font(txt, sz, font_path):
     """create font"""
     font_size = int(sz[1] * 0.8)
-    font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
+    font = _load_font(font_path, font_size)
     if int(PIL.__version__.split(".")[0]) < 10:
         length = font.getsize(txt)[0]
     else:
@@ -153,5 +220,5 @@ def create_font(txt, sz, font_path):
 
     if length > sz[0]:
         font_size = int(font_size * sz[0] / length)
-        font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-    return font
+    # the fonts are loaded once per size, and shared
+    return _load_font(font_path, font_size)
@@ -29,7 +29,7 @@ class TableRecResult(CVResult):
         super().__init__(data)
 
     def _to_img(self):
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         bbox_res = self["bbox"]
         if len(bbox_res) > 0 and len(bbox_res[0]) == 4:
             vis_img = self.draw_rectangle(image, bbox_res)
@@ -40,7 +40,7 @@ class TableRecResult(CVResult):
     def draw_rectangle(self, image, boxes):
         """draw_rectangle"""
         boxes = np.array(boxes)
-        img_show = image.copy()
+        img_show = np.array(image)
         for box in boxes.astype(int):
             x1, y1, x2, y2 = box
             cv2.rectangle(img_show, (x1, y1), (x2, y2), (255, 0, 0), 2)
@@ -48,10 +48,12 @@ class TableRecResult(CVResult):
 
     def draw_bbox(self, image, boxes):
         """draw_bbox"""
-        for box in boxes:
-            box = np.reshape(np.array(box), [-1, 1, 2]).astype(np.int64)
-            image = cv2.polylines(np.array(image), [box], True, (255, 0, 0), 2)
-        return image
+        # the image is converted once, and all the boxes are drawn in one call
+        image = np.array(image)
+        boxes = [
+            np.reshape(np.array(box), [-1, 1, 2]).astype(np.int32) for box in boxes
+        ]
+        return cv2.polylines(image, boxes, True, (255, 0, 0), 2)
 
 
 class StructureTableResult(TableRecResult, HtmlMixin, XlsxMixin):
@@ -25,7 +25,7 @@ from .base import CVResult
 class TextRecResult(CVResult):
     def _to_img(self):
         """Draw label on image"""
-        image = self._img_reader.read(self["input_path"])
+        image = self._read_input_img()
         rec_text = self["rec_text"]
         rec_score = self["rec_score"]
         image = image.convert("RGB")
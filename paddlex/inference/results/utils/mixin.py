@@ -83,7 +83,10 @@ class JsonMixin:
             elif isinstance(obj, Path):
                 return obj.as_posix()
             elif isinstance(obj, dict):
-                return type(obj)({k: _format_data(v) for k, v in obj.items()})
+                hidden_keys = getattr(obj, "_HIDDEN_KEYS", ())
+                return type(obj)(
+                    {k: _format_data(v) for k, v in obj.items() if k not in hidden_keys}
+                )
             elif isinstance(obj, (list, tuple)):
                 return [_format_data(i) for i in obj]
             else:
@@ -132,9 +135,12 @@ class Base64Mixin:
 
 
 class ImgMixin:
+    _NOT_RENDERED = object()
+
     def __init__(self, backend="pillow", *args, **kwargs):
         self._img_writer = ImageWriter(backend=backend, *args, **kwargs)
         self._show_funcs.append(self.save_to_img)
+        self._img = self._NOT_RENDERED
 
     @abstractmethod
     def _to_img(self):
@@ -142,11 +148,19 @@ class ImgMixin:
 
     @property
     def img(self):
-        image = self._to_img()
-        # The img must be a PIL.Image obj
-        if isinstance(image, np.ndarray):
-            return Image.fromarray(image)
-        return image
+        """The visualized result as a PIL.Image obj. It is rendered on the first
+        access only, as it often costs more than the prediction, and the later
+        accesses return the same obj, so it is shared and must be treated as
+        read-only; copy it before drawing on it. Setting an item of the result
+        renders it again on the next access.
+        """
+        if getattr(self, "_img", self._NOT_RENDERED) is self._NOT_RENDERED:
+            image = self._to_img()
+            # The img must be a PIL.Image obj
+            if isinstance(image, np.ndarray):
+                image = Image.fromarray(image)
+            self._img = image
+        return self._img
 
     def save_to_img(self, save_path, *args, **kwargs):
         if not str(save_path).lower().endswith((".jpg", ".png")):
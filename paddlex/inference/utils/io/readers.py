@@ -14,7 +14,15 @@
 
 
 import enum
+import uuid
+import atexit
 import itertools
+import threading
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
 import cv2
 import fitz
 from PIL import Image, ImageOps
@@ -22,6 +30,8 @@ import pandas as pd
 import numpy as np
 import yaml
 
+from ....utils.cache import in_memory_file_manager
+
 __all__ = [
     "ReaderType",
     "ImageReader",
@@ -89,8 +99,11 @@ class PDFReader(_BaseReader):
     def __init__(self, backend="fitz", **bk_args):
         super().__init__(backend, **bk_args)
 
-    def read(self, in_path):
-        return self._backend.read_file(str(in_path))
+    def read(self, in_path, page_range=None):
+        """yield the pages of the pdf file (path or bytes) as BGR images"""
+        if not isinstance(in_path, bytes):
+            in_path = str(in_path)
+        return self._backend.read_file(in_path, page_range=page_range)
 
     def _init_backend(self, bk_type, bk_args):
         return PDFReaderBackend(**bk_args)
@@ -106,7 +119,11 @@ class ImageReader(_BaseReader):
         super().__init__(backend=backend, **bk_args)
 
     def read(self, in_path):
-        """read the image file from path"""
+        """read the image file from path, or convert the decoded (BGR) image"""
+        if isinstance(in_path, np.ndarray):
+            return self._backend.read_obj(in_path)
+        if in_memory_file_manager.is_in_memory(in_path):
+            return self._backend.read_obj(in_memory_file_manager.get(in_path))
         arr = self._backend.read_file(str(in_path))
         return arr
 
@@ -196,6 +213,10 @@ class _BaseReaderBackend(object):
         """read file from path"""
         raise NotImplementedError
 
+    def read_obj(self, obj):
+        """read in-memory object"""
+        raise NotImplementedError
+
 
 class _ImageReaderBackend(_BaseReaderBackend):
     """_ImageReaderBackend"""
@@ -214,6 +235,19 @@ class OpenCVImageReaderBackend(_ImageReaderBackend):
         """read image file from path by OpenCV"""
         return cv2.imread(in_path, flags=self.flags)
 
+    def read_obj(self, obj):
+        """read BGR(A) or grayscale `np.ndarray` as if it were decoded by OpenCV"""
+        if self.flags == cv2.IMREAD_GRAYSCALE:
+            if obj.ndim == 3:
+                code = cv2.COLOR_BGRA2GRAY if obj.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+                return cv2.cvtColor(obj, code)
+        elif self.flags == cv2.IMREAD_COLOR:
+            if obj.ndim == 2:
+                return cv2.cvtColor(obj, cv2.COLOR_GRAY2BGR)
+            elif obj.shape[2] == 4:
+                return cv2.cvtColor(obj, cv2.COLOR_BGRA2BGR)
+        return obj.copy()
+
 
 class PILImageReaderBackend(_ImageReaderBackend):
     """PILImageReaderBackend"""
@@ -225,23 +259,178 @@ class PILImageReaderBackend(_ImageReaderBackend):
         """read image file from path by PIL"""
         return ImageOps.exif_transpose(Image.open(in_path))
 
+    def read_obj(self, obj):
+        """read BGR(A) or grayscale `np.ndarray` as PIL image"""
+        if obj.ndim == 3:
+            code = cv2.COLOR_BGRA2RGBA if obj.shape[2] == 4 else cv2.COLOR_BGR2RGB
+            obj = cv2.cvtColor(obj, code)
+        else:
+            obj = obj.copy()
+        return Image.fromarray(obj)
+
+
+def _open_pdf(src):
+    if isinstance(src, bytes):
+        return fitz.open("pdf", src)
+    return fitz.open(src)
+
+
+def _render_pdf_page(page, mat):
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    # view the samples of pixmap without copy, and convert them to BGR
+    samples = getattr(pix, "samples_mv", None) or pix.samples
+    img = np.frombuffer(samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+    if pix.n == 1:
+        return img[:, :, 0].copy()
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+# the documents opened in a worker process, `key -> doc` in LRU order
+_worker_pdf_docs = OrderedDict()
+_WORKER_MAX_PDF_DOCS = 4
+
+
+def _render_pdf_page_in_worker(key, src, page_idx, mat):
+    """render a page in a worker, where `src` is a path or the name and size of the
+    shared memory holding the content of the pdf"""
+    doc = _worker_pdf_docs.get(key, None)
+    if doc is None:
+        if isinstance(src, tuple):
+            name, size = src
+            shm = SharedMemory(name=name)
+            try:
+                src = bytes(shm.buf[:size])
+            finally:
+                shm.close()
+        doc = _worker_pdf_docs[key] = _open_pdf(src)
+        # the pages of different documents may be rendered in turn, e.g. in serving
+        while len(_worker_pdf_docs) > _WORKER_MAX_PDF_DOCS:
+            _worker_pdf_docs.popitem(last=False)[1].close()
+    else:
+        _worker_pdf_docs.move_to_end(key)
+    return _render_pdf_page(doc[page_idx], fitz.Matrix(*mat))
+
+
+_pdf_executors = {}
+_pdf_executors_lock = threading.Lock()
+
+
+def _get_pdf_executor(num_workers):
+    """get the process pool of `num_workers` shared by all pdf readers"""
+    with _pdf_executors_lock:
+        executor = _pdf_executors.get(num_workers, None)
+        if executor is None:
+            # the workers are spawned instead of forked, as the current process may
+            # hold paddle predictors and threads that are unsafe to fork
+            executor = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pdf_executors[num_workers] = executor
+        return executor
+
+
+@atexit.register
+def _shutdown_pdf_executors():
+    with _pdf_executors_lock:
+        for executor in _pdf_executors.values():
+            executor.shutdown(wait=False)
+        _pdf_executors.clear()
+
 
 class PDFReaderBackend(_BaseReaderBackend):
 
-    def __init__(self, rotate=0, zoom_x=2.0, zoom_y=2.0):
+    def __init__(self, rotate=0, zoom_x=2.0, zoom_y=2.0, dpi=None, num_workers=1):
+        """
+        Args:
+            rotate (int, optional): Degrees to rotate the pages. Default: 0.
+            zoom_x (float, optional): Horizontal zoom factor. Default: 2.0.
+            zoom_y (float, optional): Vertical zoom factor. Default: 2.0.
+            dpi (int|dict|None, optional): DPI to render the pages, or a dict that
+                maps the page index to its DPI. It takes precedence over the zoom
+                factors for the pages it covers. Default: None.
+            num_workers (int, optional): Number of processes to render the pages in
+                parallel, which are spawned once and shared by all readers. As with
+                any spawned process, the main module must be guarded by
+                `if __name__ == "__main__":`. Default: 1, rendering in the current
+                process.
+        """
         super().__init__()
-        self.mat = fitz.Matrix(zoom_x, zoom_y).prerotate(rotate)
+        self.rotate = rotate
+        self.zoom_x = zoom_x
+        self.zoom_y = zoom_y
+        self.dpi = dpi
+        self.num_workers = num_workers
+
+    def read_file(self, in_path, page_range=None):
+        """
+        Yield the pages lazily, so that only the pages in use are kept in memory.
+
+        Args:
+            in_path (str|bytes): Path or content of the pdf file.
+            page_range (tuple|None, optional): The `(start, end)` indexes of pages
+                to read, where `end` is exclusive and may be None. Default: None,
+                reading all pages.
+        """
+        with _open_pdf(in_path) as doc:
+            page_ids = self._get_page_ids(doc.page_count, page_range)
+            if self.num_workers <= 1 or len(page_ids) <= 1:
+                for page_idx in page_ids:
+                    yield _render_pdf_page(doc[page_idx], self._get_matrix(page_idx))
+                return
+        yield from self._read_parallel(in_path, page_ids)
+
+    def _read_parallel(self, in_path, page_ids):
+        executor = _get_pdf_executor(self.num_workers)
+        # the workers reopen the document when the key changes
+        key = uuid.uuid4().hex
+        shm = None
+        if isinstance(in_path, bytes):
+            # share the content with the workers instead of sending it with every page
+            shm = SharedMemory(create=True, size=max(len(in_path), 1))
+            shm.buf[: len(in_path)] = in_path
+            src = (shm.name, len(in_path))
+        else:
+            src = in_path
+        # bound the rendered pages waiting for being consumed
+        max_pending = 2 * self.num_workers
+        futures = deque()
+        try:
+            for page_idx in page_ids:
+                mat = tuple(self._get_matrix(page_idx))
+                futures.append(
+                    executor.submit(_render_pdf_page_in_worker, key, src, page_idx, mat)
+                )
+                if len(futures) >= max_pending:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            if shm is not None:
+                # wait for the pages being rendered from the shared memory
+                for future in futures:
+                    if not future.cancelled():
+                        future.exception()
+                shm.close()
+                shm.unlink()
+
+    def _get_matrix(self, page_idx):
+        dpi = self.dpi.get(page_idx) if isinstance(self.dpi, dict) else self.dpi
+        if dpi is None:
+            zoom_x, zoom_y = self.zoom_x, self.zoom_y
+        else:
+            zoom_x = zoom_y = dpi / 72
+        return fitz.Matrix(zoom_x, zoom_y).prerotate(self.rotate)
 
-    def read_file(self, in_path):
-        images = []
-        for page in fitz.open(in_path):
-            pix = page.get_pixmap(matrix=self.mat, alpha=False)
-            getpngdata = pix.tobytes(output="png")
-            # decode as np.uint8
-            image_array = np.frombuffer(getpngdata, dtype=np.uint8)
-            img_cv = cv2.imdecode(image_array, cv2.IMREAD_ANYCOLOR)
-            images.append(img_cv)
-        return images
+    @staticmethod
+    def _get_page_ids(num_pages, page_range):
+        if page_range is None:
+            return list(range(num_pages))
+        start, end = page_range
+        end = num_pages if end is None else min(end, num_pages)
+        return list(range(max(start, 0), end))
 
 
 class _VideoReaderBackend(_BaseReaderBackend):
@@ -313,6 +502,8 @@ class CSVReader(_BaseReader):
 
     def read(self, in_path):
         """read the image file from path"""
+        if in_memory_file_manager.is_in_memory(in_path):
+            return self._backend.read_obj(in_memory_file_manager.get(in_path))
         arr = self._backend.read_file(str(in_path))
         return arr
 
@@ -344,6 +535,10 @@ class PandasCSVReaderBackend(_CSVReaderBackend):
         """read image file from path by OpenCV"""
         return pd.read_csv(in_path)
 
+    def read_obj(self, obj):
+        """read in-memory `pd.DataFrame`"""
+        return obj.copy()
+
 
 class YAMLReaderBackend(_BaseReaderBackend):
 
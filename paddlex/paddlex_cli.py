@@ -14,6 +14,7 @@
 
 import os
 import argparse
+import copy
 import subprocess
 import sys
 import tempfile
@@ -154,10 +155,20 @@ def serve(pipeline, *, device, use_hpip, serial_number, update_license, host, po
 
     hpi_params = _get_hpi_params(serial_number, update_license)
     pipeline_config = load_pipeline_config(pipeline)
-    pipeline = create_pipeline_from_config(
-        pipeline_config, device=device, use_hpip=use_hpip, hpi_params=hpi_params
+
+    def _create_pipeline():
+        # `create_pipeline_from_config` modifies the config in place
+        return create_pipeline_from_config(
+            copy.deepcopy(pipeline_config),
+            device=device,
+            use_hpip=use_hpip,
+            hpi_params=hpi_params,
+        )
+
+    pipeline = _create_pipeline()
+    app = create_pipeline_app(
+        pipeline, pipeline_config, pipeline_factory=_create_pipeline
     )
-    app = create_pipeline_app(pipeline, pipeline_config)
     run_server(app, host=host, port=port, debug=False)
 
 
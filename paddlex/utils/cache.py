@@ -22,6 +22,11 @@ import pickle
 import hashlib
 import tempfile
 import atexit
+import shutil
+import threading
+from collections import OrderedDict, deque
+import uuid
+import weakref
 import filelock
 
 from . import logging
@@ -31,7 +36,16 @@ DEFAULT_CACHE_DIR = osp.abspath(osp.join(os.path.expanduser("~"), ".paddlex"))
 CACHE_DIR = os.environ.get("PADDLE_PDX_CACHE_HOME", DEFAULT_CACHE_DIR)
 FUNC_CACHE_DIR = osp.join(CACHE_DIR, "func_ret")
 FILE_LOCK_DIR = osp.join(CACHE_DIR, "locks")
-TEMP_DIR = osp.join(CACHE_DIR, "temp")
+# Point `PADDLE_PDX_TEMP_DIR` to a tmpfs mount (e.g. /dev/shm/paddlex) to keep
+# temp files off the disk.
+TEMP_DIR = os.environ.get("PADDLE_PDX_TEMP_DIR", osp.join(CACHE_DIR, "temp"))
+TEMP_MAX_FILES = os.environ.get("PADDLE_PDX_TEMP_MAX_FILES", 1000)
+TEMP_MAX_FILES = int(TEMP_MAX_FILES) if TEMP_MAX_FILES else None
+TEMP_MAX_BYTES = os.environ.get("PADDLE_PDX_TEMP_MAX_BYTES", None)
+TEMP_MAX_BYTES = int(TEMP_MAX_BYTES) if TEMP_MAX_BYTES else None
+EMBEDDING_CACHE_DIR = os.environ.get(
+    "PADDLE_PDX_EMBEDDING_CACHE_DIR", osp.join(CACHE_DIR, "embeddings")
+)
 
 
 def create_cache_dir(*args, **kwargs):
@@ -107,25 +121,153 @@ def persist(cond=None):
     return _deco
 
 
+class TempFilePath(str):
+    """The path of a temp file created by `TempFileManager.create_temp_path`.
+
+    The file is released, i.e. deleted, once the last reference to the path object
+    is gone, e.g. when the results of the file are consumed and dropped. Copies of
+    the path, e.g. pickled for other processes, are plain strings and do not hold
+    the file.
+    """
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+    def __del__(self):
+        manager = getattr(self, "manager", None)
+        if manager is not None:
+            manager.release(str(self))
+
+
 class TempFileManager:
-    def __init__(self):
-        self.temp_files = []
-        Path(TEMP_DIR).mkdir(parents=True, exist_ok=True)
+    """Manage temporary files in a bounded store.
+
+    The files are deleted when released, or at interpreter exit. Once the
+    count/size limits are exceeded, the least recently created files are evicted,
+    except those still in use, i.e. open (e.g. being written in
+    `temp_file_context`) or referred to by a live `TempFilePath`. If only files in
+    use are left, the limits are exceeded with a warning.
+    """
+
+    def __init__(self, temp_dir=TEMP_DIR, max_files=None, max_bytes=None):
+        self.temp_dir = temp_dir
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        # name -> [temp_file, num_bytes, referred], in the order of creation
+        self._files = OrderedDict()
+        self._num_bytes = 0
+        self._num_evicted = 0
+        self._lock = threading.Lock()
+        # the names released while the lock was held, e.g. by a path collected in
+        # a locked section, which are removed on the next locked call
+        self._released = deque()
+        Path(self.temp_dir).mkdir(parents=True, exist_ok=True)
         atexit.register(self.cleanup)
 
     def create_temp_file(self, **kwargs):
-        temp_file = tempfile.NamedTemporaryFile(delete=False, dir=TEMP_DIR, **kwargs)
-        self.temp_files.append(temp_file)
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False, dir=self.temp_dir, **kwargs
+        )
+        with self._lock:
+            self._remove_released()
+            self._files[temp_file.name] = [temp_file, 0, False]
+            self._evict()
         return temp_file
 
-    def cleanup(self):
-        for temp_file in self.temp_files:
+    def create_temp_path(self, file_name):
+        """create an empty temp file named `file_name`, and return its `TempFilePath`"""
+        # a dir per file, so that the file keeps its name, e.g. for saving results
+        name = os.path.join(tempfile.mkdtemp(dir=self.temp_dir), file_name)
+        open(name, "wb").close()
+        path = TempFilePath(name)
+        path.manager = self
+        with self._lock:
+            self._remove_released()
+            self._files[name] = [None, 0, True]
+            self._evict()
+        return path
+
+    def update_size(self, name):
+        """record the current size of the file and apply the size limit"""
+        name = str(name)
+        with self._lock:
+            self._remove_released()
+            record = self._files.get(name, None)
+            if record is None:
+                return
+            try:
+                num_bytes = os.path.getsize(name)
+            except OSError:
+                num_bytes = 0
+            self._num_bytes += num_bytes - record[1]
+            record[1] = num_bytes
+            self._evict()
+
+    def release(self, name):
+        """delete the file, once the lock is free if it is held"""
+        self._released.append(str(name))
+        if self._lock.acquire(blocking=False):
             try:
+                self._remove_released()
+            finally:
+                self._lock.release()
+
+    def cleanup(self):
+        with self._lock:
+            self._released.clear()
+            for name in list(self._files.keys()):
+                self._remove(name)
+
+    @property
+    def metrics(self):
+        with self._lock:
+            self._remove_released()
+            return {
+                "live_files": len(self._files),
+                "live_bytes": self._num_bytes,
+                "evicted_files": self._num_evicted,
+            }
+
+    def _remove_released(self):
+        while self._released:
+            name = self._released.popleft()
+            if name in self._files:
+                self._remove(name)
+
+    def _evict(self):
+        def _over_limit():
+            if self.max_files is not None and len(self._files) > self.max_files:
+                return True
+            if self.max_bytes is not None and self._num_bytes > self.max_bytes:
+                return True
+            return False
+
+        for name in list(self._files.keys()):
+            if not _over_limit():
+                return
+            temp_file, _, referred = self._files[name]
+            # the files still in use are never deleted
+            if referred or (temp_file is not None and not temp_file.closed):
+                continue
+            self._remove(name)
+            self._num_evicted += 1
+        if _over_limit():
+            logging.warning(
+                f"The {len(self._files)} temp files of {self._num_bytes} bytes exceed the limits (max_files={self.max_files}, max_bytes={self.max_bytes}), as the files left are still in use."
+            )
+
+    def _remove(self, name):
+        temp_file, num_bytes, referred = self._files.pop(name)
+        self._num_bytes -= num_bytes
+        try:
+            if temp_file is not None:
                 temp_file.close()
-                os.remove(temp_file.name)
-            except FileNotFoundError as e:
-                pass
-        self.temp_files = []
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+        if referred:
+            # the dir of the file created by `create_temp_path`
+            shutil.rmtree(os.path.dirname(name), ignore_errors=True)
 
     class TempFileContextManager:
         def __init__(self, manager, **kwargs):
@@ -140,9 +282,43 @@ class TempFileManager:
         def __exit__(self, exc_type, exc_value, traceback):
             if self.temp_file:
                 self.temp_file.close()
+                self.manager.update_size(self.temp_file.name)
 
     def temp_file_context(self, **kwargs):
         return self.TempFileContextManager(self, **kwargs)
 
 
-temp_file_manager = TempFileManager()
+temp_file_manager = TempFileManager(max_files=TEMP_MAX_FILES, max_bytes=TEMP_MAX_BYTES)
+
+
+class InMemoryFileManager:
+    """Hand out synthetic file paths for in-memory objects.
+
+    The objects are referenced weakly, so a synthetic path stays resolvable
+    only as long as the caller (or the pipeline data) keeps the object alive.
+    """
+
+    PREFIX = "pdx_in_memory_"
+
+    def __init__(self):
+        self._objs = weakref.WeakValueDictionary()
+
+    def register(self, obj, suffix=""):
+        path = f"{self.PREFIX}{uuid.uuid4().hex}{suffix}"
+        self._objs[path] = obj
+        return path
+
+    def is_in_memory(self, path):
+        # a real file whose name happens to start with the prefix is not in memory
+        return str(path) in self._objs
+
+    def get(self, path):
+        obj = self._objs.get(str(path), None)
+        if obj is None:
+            raise FileNotFoundError(
+                f"The in-memory input ({path}) has been released or was never registered."
+            )
+        return obj
+
+
+in_memory_file_manager = InMemoryFileManager()
@@ -25,6 +25,9 @@ __all__ = [
     "INFER_BENCHMARK_WARMUP",
     "INFER_BENCHMARK_OUTPUT",
     "INFER_BENCHMARK_DATA_SIZE",
+    "INFER_PIPELINED",
+    "INFER_PIPELINED_QUEUE_SIZE",
+    "PDF_READER_NUM_WORKERS",
     "FLAGS_json_format_model",
 ]
 
@@ -59,3 +62,14 @@ INFER_BENCHMARK_ITER = get_flag_from_env_var("PADDLE_PDX_INFER_BENCHMARK_ITER",
 INFER_BENCHMARK_DATA_SIZE = get_flag_from_env_var(
     "PADDLE_PDX_INFER_BENCHMARK_DATA_SIZE", 1024
 )
+
+# Pipelined Inference
+INFER_PIPELINED = get_flag_from_env_var("PADDLE_PDX_INFER_PIPELINED", False)
+INFER_PIPELINED_QUEUE_SIZE = get_flag_from_env_var(
+    "PADDLE_PDX_INFER_PIPELINED_QUEUE_SIZE", 2, int
+)
+
+# PDF
+PDF_READER_NUM_WORKERS = get_flag_from_env_var(
+    "PADDLE_PDX_PDF_READER_NUM_WORKERS", 1, int
+)
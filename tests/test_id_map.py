@@ -0,0 +1,93 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from paddlex.inference.components.retrieval.faiss import (
+    FaissIndexer,
+    IndexData,
+)
+from paddlex.inference.components.retrieval.id_map import IdMap
+from paddlex.inference.utils.io import YAMLWriter
+
+LABELS = [f"类别_{i % 7}" for i in range(50)]
+
+
+def _make_index_data(labels=LABELS, dim=8):
+    rng = np.random.default_rng(0)
+    features = rng.standard_normal((len(labels), dim)).astype(np.float32)
+    features /= np.linalg.norm(features, axis=1, keepdims=True)
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+    index.add_with_ids(features, np.arange(len(labels)))
+    id_map = IdMap.from_labels(np.arange(len(labels)), labels)
+    index_info = {"id_map": id_map, "metric_type": "IP", "index_type": "Flat"}
+    return IndexData(index, index_info), features
+
+
+def test_yaml_to_binary_round_trip(tmp_path):
+    data, _ = _make_index_data()
+    # an index saved by the older versions, with the id_map in YAML
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    faiss.write_index(data.index, (legacy_dir / "vector.index").as_posix())
+    YAMLWriter().write(
+        (legacy_dir / "id_map.yaml").as_posix(),
+        {
+            "index_type": "Flat",
+            "metric_type": "IP",
+            "id_map": dict(enumerate(LABELS)),
+        },
+        default_flow_style=False,
+        allow_unicode=True,
+    )
+    index, id_map, metric_type, index_type = IndexData.load(legacy_dir.as_posix())
+    assert id_map.to_dict() == dict(enumerate(LABELS))
+
+    binary_dir = tmp_path / "binary"
+    IndexData(
+        index, {"id_map": id_map, "metric_type": metric_type, "index_type": index_type}
+    ).save(binary_dir)
+    assert not (binary_dir / "id_map.yaml").exists()
+    for mmap in (False, True):
+        _, loaded, metric_type, index_type = IndexData.load(
+            binary_dir.as_posix(), mmap=mmap
+        )
+        assert loaded.to_dict() == dict(enumerate(LABELS))
+        assert (metric_type, index_type) == ("IP", "Flat")
+
+
+def test_remove_keeps_non_consecutive_ids(tmp_path):
+    id_map = IdMap.from_labels(np.arange(50), LABELS).remove(np.array([0, 3, 10]))
+    id_map.save(tmp_path / "id_map")
+    for id_map in (id_map, IdMap.load(tmp_path / "id_map")):
+        assert len(id_map) == 47
+        assert 3 not in id_map and 4 in id_map
+        assert id_map[4] == LABELS[4] and id_map[49] == LABELS[49]
+        labels = id_map.get_labels(np.array([[3, 4], [49, -1]]))
+        assert labels.tolist() == [[None, LABELS[4]], [LABELS[49], None]]
+    appended = id_map.append(np.arange(50, 53), ["新"] * 3)
+    assert appended[51] == "新" and appended.max_id == 52
+
+
+def test_id_0_is_found():
+    id_map = IdMap.from_labels(np.arange(50), LABELS)
+    assert 0 in id_map and id_map[0] == LABELS[0]
+    data, features = _make_index_data()
+    indexer = FaissIndexer(data, return_k=3, score_thres=0.5)
+    pred = indexer.apply(features[:1])[0]
+    assert pred["label"][0] == LABELS[0]
+    assert len(pred["label"]) == len(pred["score"]) == 3
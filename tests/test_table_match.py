@@ -0,0 +1,72 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from paddlex.inference.pipelines.table_recognition.utils import (
+    TableMatch,
+    compute_iou,
+    convert_4point2rect,
+    distance,
+)
+
+
+def _match_by_loop(table_boxes, ocr_boxes):
+    """the per-pair loop `TableMatch.metch_table_and_ocr` used before vectorization"""
+    matched = {}
+    for i, ocr_box in enumerate(np.array(ocr_boxes)):
+        ocr_box = convert_4point2rect(ocr_box)
+        distances = []
+        for j, table_box in enumerate(table_boxes):
+            table_box = convert_4point2rect(table_box)
+            distances.append(
+                (
+                    distance(table_box, ocr_box),
+                    1.0 - compute_iou(table_box, ocr_box),
+                )
+            )
+        sorted_distances = sorted(distances, key=lambda item: (item[1], item[0]))
+        j = distances.index(sorted_distances[0])
+        matched.setdefault(j, []).append(i)
+    return matched
+
+
+def _random_boxes(rng, num, integer):
+    xy = rng.uniform(0, 500, (num, 2))
+    wh = rng.uniform(1, 80, (num, 2))
+    rects = np.concatenate([xy, xy + wh], axis=1)
+    if integer:
+        rects = np.round(rects)
+    return [[x1, y1, x2, y1, x2, y2, x1, y2] for x1, y1, x2, y2 in rects.tolist()]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_match_same_as_loop(seed):
+    rng = np.random.default_rng(seed)
+    # integer coordinates give exact ties of iou and distance
+    integer = seed % 2 == 0
+    table_boxes = _random_boxes(rng, rng.integers(1, 40), integer)
+    ocr_boxes = _random_boxes(rng, rng.integers(1, 60), integer)
+    if seed % 5 == 0 and len(table_boxes) > 1:
+        # duplicated cells, of which the first one must be matched
+        table_boxes[1] = table_boxes[0]
+    matched = TableMatch().metch_table_and_ocr(table_boxes, ocr_boxes)
+    assert matched == _match_by_loop(table_boxes, ocr_boxes)
+
+
+def test_match_empty():
+    boxes = [[0, 0, 1, 0, 1, 1, 0, 1]]
+    assert TableMatch().metch_table_and_ocr([], boxes) == {}
+    assert TableMatch().metch_table_and_ocr(boxes, []) == {}